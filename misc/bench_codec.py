@@ -0,0 +1,259 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import argparse
+import base64
+import sys
+import time
+import zlib
+from functools import partial
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+from zmqrpc import BatchCommand, ICommand, SlotsCommand, StructCommand
+from zmqrpc.command import json_unzip, json_zip
+from zmqrpc.command.json_io import json_dump
+
+
+class BenchCommand(ICommand):
+
+    def __init__(self, payload: Optional[object] = None):
+        super().__init__()
+
+        self.__payload = payload
+
+    @property
+    def payload(self) -> object:
+        return self.__payload
+
+    def set_command_state(self, state: dict) -> None:
+        self.__payload = state['payload']
+
+    def get_command_state(self) -> dict:
+        return dict(payload=self.payload)
+
+
+class BenchSlotsCommand(SlotsCommand):
+
+    param1: str = ''
+    param2: str = ''
+
+
+class BenchTelemetryCommand(SlotsCommand):
+
+    time: float = 0.0
+    sensor: int = 0
+    value: float = 0.0
+    status: int = 0
+
+
+class BenchStructCommand(StructCommand):
+
+    struct_format = '<dIdB'
+
+    time: float = 0.0
+    sensor: int = 0
+    value: float = 0.0
+    status: int = 0
+
+
+class BenchBatchCommand(BatchCommand):
+
+    schema = (('time', 'd'), ('sensor', 'H'), ('value', 'd'))
+
+
+def _get_args(args) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Measures the wire size and the encode/decode time of '
+        'command messages.'
+    )
+
+    parser.add_argument(
+        '--codecs',
+        nargs='*',
+        default=(),
+        help='Extra registered codecs to measure, e.g. "marshal+zlib"',
+    )
+
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=1.0,
+        help='Seconds to spend measuring each case',
+    )
+
+    return parser.parse_args(args)
+
+
+def _legacy_zip(j: object) -> str:
+    # The text format used before binary frames were introduced.
+    return base64.b64encode(
+        zlib.compress(json_dump(j).encode('utf-8'))
+    ).decode('ascii')
+
+
+def _without_flags(message: Sequence[bytes]) -> Tuple[bytes, ...]:
+    # A one byte header makes the receiver decode like before the header
+    # flags existed, calling the object hook for every nested object.
+    return (message[0][:1],) + tuple(message[1:])
+
+
+def _deep_payload(depth: int, width: int) -> object:
+    if depth == 0:
+        return dict(name='leaf', value=1.5)
+
+    return [
+        dict(level=depth, child=_deep_payload(depth - 1, width))
+        for _ in range(width)
+    ]
+
+
+def _wire_size(message: Union[str, Sequence[bytes]]) -> int:
+    # ZMTP adds a flags byte plus a 1 byte (short) or 8 bytes (long) size
+    # to every frame.
+    frames = (message.encode('utf-8'),) \
+        if isinstance(message, str) else message
+
+    return sum(
+        len(frame) + (2 if len(frame) < 256 else 9)
+        for frame in frames
+    )
+
+
+def _time_per_message(func: Callable[[], object], duration: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    end = start + duration
+
+    while True:
+        func()
+        count += 1
+        now = time.perf_counter()
+        if now >= end:
+            break
+
+    return (now - start) / count * 1e6
+
+
+def _commands() -> Tuple[Tuple[str, ICommand], ...]:
+    samples = [
+        dict(time=1700000000 + i * 0.01, sensor=i % 16, value=i * 0.5)
+        for i in range(20000)
+    ]
+
+    return (
+        (
+            'small',
+            BenchCommand(payload=dict(param1='value1', param2='value2')),
+        ),
+        (
+            'slots',
+            BenchSlotsCommand(param1='value1', param2='value2'),
+        ),
+        (
+            'telemetry',
+            BenchTelemetryCommand(1700000000.25, 17, 21.5, 1),
+        ),
+        (
+            'struct',
+            BenchStructCommand(1700000000.25, 17, 21.5, 1),
+        ),
+        (
+            'medium',
+            BenchCommand(payload={
+                'key{0}'.format(i): 'value {0}'.format(i)
+                for i in range(100)
+            }),
+        ),
+        (
+            'deep',
+            BenchCommand(payload=_deep_payload(depth=6, width=4)),
+        ),
+        (
+            'large',
+            BenchCommand(payload=[
+                dict(index=i, name='record {0}'.format(i), value=i * 0.5)
+                for i in range(20000)
+            ]),
+        ),
+        (
+            'records',
+            BenchCommand(payload=samples),
+        ),
+        (
+            'batch',
+            BenchBatchCommand.from_records(samples),
+        ),
+    )
+
+
+def _codecs(
+        codec_names: Sequence[str]) \
+        -> Tuple[Tuple[str, Callable, Callable], ...]:
+    return tuple(
+        (codec_name, partial(json_zip, codec=codec_name), json_unzip)
+        for codec_name in codec_names
+    ) + (
+        ('base64 text', _legacy_zip, json_unzip),
+        (
+            'binary zlib',
+            partial(json_zip, compression_threshold=0),
+            json_unzip,
+        ),
+        ('binary adaptive', json_zip, json_unzip),
+        (
+            'binary hooks',
+            lambda command: _without_flags(json_zip(command)),
+            json_unzip,
+        ),
+    )
+
+
+def main(args: Optional[Tuple[str]] = None) -> int:
+    p_args = _get_args(args)
+
+    print('{0:<10} {1:<16} {2:>12} {3:>12} {4:>12}'.format(
+        'command', 'codec', 'wire bytes', 'encode us', 'decode us',
+    ))
+
+    for command_name, command in _commands():
+        # Struct commands are packed the same way whatever the codec.
+        if isinstance(command, StructCommand):
+            codecs = (('struct', json_zip, json_unzip),)
+        elif isinstance(command, BatchCommand):
+            # Text messages cannot carry the column buffers.
+            codecs = tuple(
+                codec
+                for codec in _codecs(p_args.codecs)
+                if codec[0] != 'base64 text'
+            )
+        else:
+            codecs = _codecs(p_args.codecs)
+
+        for codec_name, encode, decode in codecs:
+            message = encode(command)
+
+            print('{0:<10} {1:<16} {2:>12} {3:>12.1f} {4:>12.1f}'.format(
+                command_name,
+                codec_name,
+                _wire_size(message),
+                _time_per_message(
+                    lambda: encode(command),
+                    p_args.duration,
+                ),
+                _time_per_message(
+                    lambda: decode(message),
+                    p_args.duration,
+                ),
+            ))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
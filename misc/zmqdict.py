@@ -0,0 +1,241 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import argparse
+import collections
+import sys
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import zmq
+
+from zmqrpc.base import frame_buffer
+from zmqrpc.command import codec_registry, register_zlib_dictionary
+
+# zlib only looks back this far, a longer dictionary is never used.
+MAX_DICTIONARY_SIZE = 32768
+
+
+def _get_args(args) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Captures command messages from a PUB socket and trains '
+        'a zlib dictionary for them.'
+    )
+
+    subparsers = parser.add_subparsers(dest='action')
+    # add_subparsers only takes required from Python 3.7 on.
+    subparsers.required = True
+
+    capture = subparsers.add_parser(
+        'capture',
+        help='Writes the bodies of received messages to a samples file',
+    )
+    capture.add_argument(
+        '--sub',
+        nargs='+',
+        required=True,
+        help='The PUB endpoints',
+    )
+    capture.add_argument(
+        '--count',
+        type=int,
+        default=10000,
+        help='Number of messages to capture',
+    )
+    capture.add_argument(
+        '--output',
+        required=True,
+        help='The samples file',
+    )
+
+    train = subparsers.add_parser(
+        'train',
+        help='Trains a dictionary from a samples file',
+    )
+    train.add_argument(
+        '--samples',
+        required=True,
+        help='The samples file written by capture',
+    )
+    train.add_argument(
+        '--output',
+        required=True,
+        help='The dictionary file',
+    )
+    train.add_argument(
+        '--size',
+        type=int,
+        default=MAX_DICTIONARY_SIZE,
+        help='Maximum dictionary size in bytes',
+    )
+    train.add_argument(
+        '--fragment',
+        type=int,
+        default=8,
+        help='Length of the fragments counted across samples',
+    )
+
+    return parser.parse_args(args)
+
+
+def _write_samples(path: str, samples: Sequence[bytes]) -> None:
+    with open(path, 'wb') as f:
+        for sample in samples:
+            f.write(len(sample).to_bytes(4, 'big'))
+            f.write(sample)
+
+
+def _read_samples(path: str) -> List[bytes]:
+    samples = []
+
+    with open(path, 'rb') as f:
+        while True:
+            size = f.read(4)
+            if not size:
+                break
+
+            samples.append(f.read(int.from_bytes(size, 'big')))
+
+    return samples
+
+
+def _capture(p_args: argparse.Namespace) -> int:
+    context = zmq.Context()
+
+    sub_socket = context.socket(zmq.SUB)
+    sub_socket.setsockopt(zmq.SUBSCRIBE, b'')
+    for sub in p_args.sub:
+        sub_socket.connect(sub)
+        print('Connected to {0}'.format(sub))
+
+    samples = []
+    while len(samples) < p_args.count:
+        frames = sub_socket.recv_multipart()
+
+        # Text messages are heartbeats or legacy commands.
+        if len(frames) < 2:
+            continue
+
+        # Keep the uncompressed bodies; stream compressed bodies cannot be
+        # decompressed out of their stream.
+        try:
+            codec = codec_registry.get_format(frame_buffer(frames[0])[0])
+            samples.append(codec.compressor.decompress(frames[1]))
+        except Exception as e:
+            print('Skipped message: {0}'.format(e))
+
+    sub_socket.close()
+    context.term()
+
+    _write_samples(p_args.output, samples)
+
+    print('Captured {0} messages to {1}'.format(len(samples), p_args.output))
+
+    return 0
+
+
+def train_dictionary(
+        samples: Sequence[bytes],
+        size: int = MAX_DICTIONARY_SIZE,
+        fragment: int = 8) -> bytes:
+    '''
+    Builds a dictionary of the fragments found in the most samples. zlib
+    encodes references to the end of the dictionary in the fewest bits, so
+    the most common fragments go last.
+    '''
+
+    counts = collections.Counter()
+    for sample in samples:
+        counts.update({
+            sample[i:i + fragment]
+            for i in range(len(sample) - fragment + 1)
+        })
+
+    fragments: List[bytes] = []
+    dictionary = b''
+    for piece, count in counts.most_common():
+        if count < 2 or len(dictionary) + len(piece) > size:
+            break
+
+        # Overlapping fragments of the same text are chained together.
+        if piece in dictionary:
+            continue
+
+        fragments.append(piece)
+        dictionary = b''.join(reversed(fragments))
+
+    return dictionary
+
+
+def _throughput(
+        func: Callable[[bytes], bytes],
+        samples: Sequence[bytes]) -> Tuple[int, float]:
+    start = time.perf_counter()
+    size = sum(len(func(sample)) for sample in samples)
+    elapsed = time.perf_counter() - start
+
+    return size, sum(len(sample) for sample in samples) / elapsed / 1e6
+
+
+def _train(p_args: argparse.Namespace) -> int:
+    samples = _read_samples(p_args.samples)
+
+    if not samples:
+        print('No samples found in {0}'.format(p_args.samples))
+        return 1
+
+    # Train on half of the samples and measure on the other half.
+    training, testing = samples[::2], samples[1::2] or samples
+
+    start = time.perf_counter()
+    zdict = train_dictionary(training, p_args.size, p_args.fragment)
+    print('Trained a {0} bytes dictionary in {1:.1f} s'.format(
+        len(zdict),
+        time.perf_counter() - start,
+    ))
+
+    with open(p_args.output, 'wb') as f:
+        f.write(zdict)
+
+    raw_size = sum(len(sample) for sample in testing)
+
+    print('{0:<16} {1:>12} {2:>8} {3:>12}'.format(
+        'compression', 'bytes', 'ratio', 'MB/s',
+    ))
+
+    zlib_compressor = codec_registry.find_compressor('zlib')
+    zdict_compressor = register_zlib_dictionary(zdict)
+
+    for name, func in (
+            ('zlib', zlib_compressor.compress),
+            ('zdict', zdict_compressor.compress),
+            ('zlib stream', zlib_compressor.compress_stream()),
+            ('zdict stream', zdict_compressor.compress_stream())):
+        size, speed = _throughput(func, testing)
+        print('{0:<16} {1:>12} {2:>8.2f} {3:>12.1f}'.format(
+            name,
+            size,
+            raw_size / size,
+            speed,
+        ))
+
+    return 0
+
+
+def main(args: Optional[Tuple[str]] = None) -> int:
+    p_args = _get_args(args)
+
+    if p_args.action == 'capture':
+        return _capture(p_args)
+
+    return _train(p_args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -59,10 +59,20 @@ def main(args: Optional[Tuple[str]] = None) -> int:
         while True:
             # Process all parts of the message
             try:
-                message_lines = sub_socket.recv_string().splitlines()
+                frames = sub_socket.recv_multipart()
             except Exception as e:
                 print('Error occurred with exception {0}'.format(e))
-            for line in message_lines:
+                continue
+
+            # Binary messages are multipart. Only text messages are printable.
+            if len(frames) > 1:
+                print('>binary message of {0} frames, {1} bytes'.format(
+                    len(frames),
+                    sum(len(frame) for frame in frames),
+                ))
+                continue
+
+            for line in frames[0].decode('utf-8').splitlines():
                 print('>' + line)
     except Exception as e:
         print('Connection error {0}'.format(e))
@@ -0,0 +1,15 @@
+
+
+from .PayloadCommand import PayloadCommand
+
+
+class CountingCommand(PayloadCommand):
+
+    immutable = True
+
+    state_calls = 0
+
+    def get_command_state(self) -> dict:
+        self.state_calls += 1
+
+        return super().get_command_state()
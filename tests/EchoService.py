@@ -0,0 +1,21 @@
+
+
+from typing import Optional
+
+from zmqrpc import IService
+
+from .PayloadCommand import PayloadCommand
+from .State import State
+
+
+class EchoService(IService):
+
+    def __init__(self, state: Optional[State] = None):
+        super().__init__()
+
+        self.__state = state or State()
+
+    def __call__(self, command: PayloadCommand) -> Optional[object]:
+        self.__state.last_payload = command.payload
+
+        return command.payload
@@ -0,0 +1,25 @@
+
+
+from typing import Optional
+
+from zmqrpc import ICommand
+
+
+class PayloadCommand(ICommand):
+
+    def __init__(self, payload: Optional[object] = None):
+        super().__init__()
+
+        self.__payload = payload
+
+    @property
+    def payload(self) -> object:
+        return self.__payload
+
+    def set_command_state(self, state: dict) -> None:
+        self.__payload = state['payload']
+
+    def get_command_state(self) -> dict:
+        return dict(
+            payload=self.payload,
+        )
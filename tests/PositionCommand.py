@@ -0,0 +1,9 @@
+
+
+from zmqrpc import SlotsCommand
+
+
+class PositionCommand(SlotsCommand):
+
+    x: int
+    y: int = 0
@@ -0,0 +1,12 @@
+
+
+from zmqrpc import StructCommand
+
+
+class ReadingCommand(StructCommand):
+
+    struct_format = '<ddi'
+
+    time: float
+    value: float
+    count: int
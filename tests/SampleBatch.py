@@ -0,0 +1,8 @@
+
+
+from zmqrpc import BatchCommand
+
+
+class SampleBatch(BatchCommand):
+
+    schema = (('time', 'd'), ('sensor', 'H'), ('value', 'f'))
@@ -0,0 +1,20 @@
+
+
+from typing import Dict, Optional
+
+from zmqrpc import BatchService
+
+from .State import State
+
+
+class SampleBatchService(BatchService):
+
+    def __init__(self, state: Optional[State] = None):
+        super().__init__()
+
+        self.__state = state or State()
+
+    def process_record(self, record: Dict[str, object]) -> Optional[object]:
+        self.__state.last_sensor = record['sensor']
+
+        return record['value'] * 2
@@ -4,3 +4,5 @@ class State:
 
     def __init__(self):
         self.last_param1 = None
+        self.last_payload = None
+        self.last_sensor = None
@@ -0,0 +1,11 @@
+
+
+from typing import Optional
+
+from zmqrpc import ICommand, IService
+
+
+class StateService(IService):
+
+    def __call__(self, command: ICommand) -> Optional[object]:
+        return list(command.get_command_state())
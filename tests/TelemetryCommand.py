@@ -0,0 +1,12 @@
+
+
+from zmqrpc import StructCommand
+
+
+class TelemetryCommand(StructCommand):
+
+    struct_format = '<dIf'
+
+    time: float = 0.0
+    sensor: int = 0
+    value: float = 0.0
@@ -0,0 +1,21 @@
+
+
+from typing import Optional
+
+from zmqrpc import IService
+
+from .State import State
+from .TelemetryCommand import TelemetryCommand
+
+
+class TelemetryService(IService):
+
+    def __init__(self, state: Optional[State] = None):
+        super().__init__()
+
+        self.__state = state or State()
+
+    def __call__(self, command: TelemetryCommand) -> Optional[object]:
+        self.__state.last_sensor = command.sensor
+
+        return command.value * 2
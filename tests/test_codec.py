@@ -0,0 +1,842 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import array
+import base64
+import gc
+import os
+import signal
+import sys
+import time
+import tracemalloc
+import zlib
+
+import pytest
+
+from zmqrpc import (
+    BatchCommand,
+    BatchService,
+    ICommand,
+    SlotsCommand,
+    StructCommand,
+)
+from zmqrpc.command import (
+    BlobStore,
+    CommandPool,
+    LazyCommand,
+    MissingBlobsError,
+    SharedMemoryReader,
+    SharedMemoryWriter,
+    StreamCompressor,
+    StreamDecompressor,
+    codec_registry,
+    json_unzip,
+    json_zip,
+    read_blob_digests,
+    register_zlib_dictionary,
+)
+from zmqrpc.command.json_io import (
+    FLAG_BLOBS,
+    FLAG_CHUNKED,
+    FLAG_FLAT,
+    FLAG_SHARED_MEMORY,
+    FLAG_STREAM,
+    FORMAT_JSON,
+    FORMAT_JSON_ZLIB,
+    FORMAT_STRUCT,
+    json_dump,
+    read_header,
+)
+from zmqrpc.command.SharedMemoryWriter import HANDLE
+
+from .Command import Command
+from .PayloadCommand import PayloadCommand
+from .SampleBatch import SampleBatch
+from .TelemetryCommand import TelemetryCommand
+
+
+class UncompressedCommand(Command):
+
+    compression_level = 0
+
+
+class MoveCommand(SlotsCommand):
+
+    x: int
+    y: int = 0
+
+
+class MoveToCommand(MoveCommand):
+
+    target: str = 'origin'
+
+
+def test_binary_round_trip(logger):
+    logger.info('Test if a command survives the binary frames codec')
+
+    message = json_zip(Command(param1='value1', param2='value2'))
+
+    assert len(message) == 2
+    assert isinstance(message[0], bytes)
+    assert isinstance(message[1], bytes)
+
+    command = json_unzip(message)
+
+    assert isinstance(command, Command)
+    assert command.param1 == 'value1'
+    assert command.param2 == 'value2'
+
+
+def test_legacy_text_message(logger):
+    logger.info('Test if base64 text messages of older clients still decode')
+
+    # Older clients identify commands by their class name.
+    message = base64.b64encode(
+        zlib.compress(
+            b'{"_icmd_": ["Command", {"param1": "old", "param2": "client"}]}'
+        )
+    ).decode('ascii')
+
+    command = json_unzip(message)
+
+    assert isinstance(command, Command)
+    assert command.param1 == 'old'
+    assert command.param2 == 'client'
+
+
+def test_unknown_format_tag(logger):
+    logger.info('Test if an unknown format tag is rejected')
+
+    _, body = json_zip(Command(param1='value1', param2='value2'))
+
+    is_success = None
+    try:
+        json_unzip((b'\xff', body))
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
+
+
+def test_size_adaptive_compression(logger):
+    logger.info('Test if only large enough messages are compressed')
+
+    small = Command(param1='value1', param2='value2')
+    large = Command(param1='value1' * 1000, param2='value2')
+
+    assert json_zip(small)[0][0] == FORMAT_JSON
+    assert json_zip(large)[0][0] == FORMAT_JSON_ZLIB
+    assert json_zip(small, compression_threshold=0)[0][0] == FORMAT_JSON_ZLIB
+
+    command = json_unzip(json_zip(small))
+    assert command.param1 == 'value1'
+
+    command = json_unzip(json_zip(large))
+    assert command.param1 == 'value1' * 1000
+
+
+def test_compression_level_per_command(logger):
+    logger.info('Test if a command can disable its compression')
+
+    command = UncompressedCommand(param1='value1' * 1000, param2='value2')
+
+    assert isinstance(command, ICommand)
+    assert json_zip(command)[0][0] == FORMAT_JSON
+    assert json_unzip(json_zip(command)).param1 == 'value1' * 1000
+
+
+def test_registered_codecs(logger):
+    logger.info('Test if a command survives every registered codec')
+
+    command = Command(param1='value1' * 1000, param2='value2')
+
+    for codec_name in codec_registry.codec_names:
+        codec = codec_registry.get_codec(codec_name)
+        message = json_zip(command, codec=codec_name)
+
+        assert message[0][0] == codec.format_tag or \
+            codec.compressor.name == 'none'
+
+        decoded = json_unzip(message)
+
+        assert isinstance(decoded, Command)
+        assert decoded.param1 == 'value1' * 1000
+        assert decoded.param2 == 'value2'
+
+    # marshal is left out of the defaults.
+    assert 'json+zlib' in codec_registry.safe_codec_names
+    assert not any(
+        codec_name.startswith('marshal')
+        for codec_name in codec_registry.safe_codec_names
+    )
+
+
+def test_out_of_band_buffers(logger):
+    logger.info('Test if buffer objects travel as separate frames')
+
+    numbers = array.array('d', [1.5, 2.5, 3.5])
+
+    message = json_zip(PayloadCommand(payload=dict(
+        raw=b'\x00\x01\x02' * 1000,
+        mutable=bytearray(b'abc'),
+        view=memoryview(numbers),
+    )))
+
+    assert len(message) == 5
+
+    payload = json_unzip(message).payload
+
+    assert payload['raw'] == b'\x00\x01\x02' * 1000
+    assert isinstance(payload['mutable'], bytearray)
+    assert payload['mutable'] == b'abc'
+    assert payload['view'].format == 'd'
+    assert payload['view'].tolist() == [1.5, 2.5, 3.5]
+
+
+def test_out_of_band_arrays(logger):
+    logger.info('Test if numpy arrays are rebuilt over the received frames')
+
+    numpy = pytest.importorskip('numpy')
+
+    matrix = numpy.arange(12, dtype='<f4').reshape(3, 4)
+
+    for codec_name in ('json+zlib', 'marshal+none'):
+        message = json_zip(
+            PayloadCommand(payload=[matrix, matrix.T]),
+            codec=codec_name,
+        )
+
+        first, second = json_unzip(message).payload
+
+        assert first.dtype == matrix.dtype
+        assert first.shape == (3, 4)
+        assert numpy.array_equal(first, matrix)
+        assert numpy.array_equal(second, matrix.T)
+
+        # Zero copy: the first array shares the memory of its frame.
+        assert numpy.shares_memory(first, numpy.frombuffer(
+            message[2], dtype=numpy.uint8))
+
+
+def test_command_ids(logger):
+    logger.info(
+        'Test if commands with the same name in different modules get '
+        'distinct ids and if id collisions are detected'
+    )
+
+    class Twin(PayloadCommand):
+        pass
+
+    def _other_module() -> type:
+        class Twin(PayloadCommand):
+            pass
+
+        return Twin
+
+    OtherTwin = _other_module()
+
+    assert Twin.command_id != OtherTwin.command_id
+    assert str(Twin.command_id) in json_dump(Twin())
+
+    assert type(json_unzip(json_zip(Twin(payload=1)))) is Twin
+    assert type(json_unzip(json_zip(OtherTwin(payload=2)))) is OtherTwin
+
+    # Spawned processes import the main script as __mp_main__, so both
+    # name the same command and clash
+    type('MainTwin', (PayloadCommand,), dict(__module__='__main__'))
+
+    is_success = None
+    try:
+        type('MainTwin', (PayloadCommand,), dict(__module__='__mp_main__'))
+        is_success = False
+    except RuntimeError as e:
+        is_success = 'same id' in str(e)
+
+    assert is_success
+
+    is_success = None
+    try:
+        class Clash(PayloadCommand):
+            command_id = Twin.command_id
+
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
+
+
+def test_slots_command(logger):
+    logger.info('Test if slots commands generate their state functions')
+
+    command = MoveToCommand(1, target='home')
+
+    assert not hasattr(command, '__dict__')
+    assert command.get_command_state() == (1, 0, 'home')
+
+    for codec_name in ('json+zlib', 'marshal+none'):
+        decoded = json_unzip(json_zip(command, codec=codec_name))
+
+        assert type(decoded) is MoveToCommand
+        assert (decoded.x, decoded.y, decoded.target) == (1, 0, 'home')
+
+    decoded = json_unzip(json_zip(MoveCommand(x=2, y=3)))
+    assert (decoded.x, decoded.y) == (2, 3)
+
+
+def test_command_pool(logger):
+    logger.info('Test if a command pool saves allocations while decoding')
+
+    messages = [json_zip(MoveCommand(x=i, y=-i)) for i in range(100)]
+
+    def decode(command_pool):
+        decoded = []
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+        for message in messages:
+            command = json_unzip(message, command_pool=command_pool)
+            decoded.append((command, command.x, command.y))
+
+            if command_pool is not None:
+                command_pool.release(command)
+
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        # Decoded commands are kept alive, so every command allocated while
+        # decoding shows up in the second snapshot.
+        allocations = sum(
+            stat.count_diff
+            for stat in after.compare_to(before, 'filename')
+            if stat.traceback[0].filename ==
+            sys.modules['zmqrpc.command.CommandPool'].__file__
+        )
+
+        assert [(x, y) for _, x, y in decoded] == \
+            [(i, -i) for i in range(len(messages))]
+
+        return allocations, len({id(command) for command, _, _ in decoded})
+
+    assert decode(None) == (len(messages), len(messages))
+
+    command_pool = CommandPool()
+    command_pool.register(MoveCommand, 4)
+
+    allocations, command_count = decode(command_pool)
+
+    assert allocations <= 2
+    assert command_count == 1
+    assert (command_pool.hits, command_pool.misses) == (99, 1)
+    assert len(command_pool) == 1
+
+    # Commands of other classes are not pooled.
+    command = json_unzip(
+        json_zip(MoveToCommand(x=1)),
+        command_pool=command_pool,
+    )
+    command_pool.release(command)
+
+    assert command.target == 'origin'
+    assert len(command_pool) == 1
+
+
+def test_flat_messages(logger):
+    logger.info('Test if only messages without nested commands are flat')
+
+    flat = PayloadCommand(payload=dict(nested=[dict(a=1), dict(b=2)]))
+    nested = PayloadCommand(payload=[Command(param1='inner', param2='')])
+    with_buffer = PayloadCommand(payload=b'raw')
+
+    for codec_name in ('json+zlib', 'marshal+none'):
+        message = json_zip(flat, codec=codec_name)
+        assert message[0][1] & FLAG_FLAT
+        assert json_unzip(message).payload == flat.payload
+
+        message = json_zip(nested, codec=codec_name)
+        assert not message[0][1] & FLAG_FLAT
+        assert json_unzip(message).payload[0].param1 == 'inner'
+
+        message = json_zip(with_buffer, codec=codec_name)
+        assert not message[0][1] & FLAG_FLAT
+        assert json_unzip(message).payload == b'raw'
+
+        # Headers without flags come from older peers.
+        message = json_zip(flat, codec=codec_name)
+        assert json_unzip((message[0][:1], message[1])).payload == \
+            flat.payload
+
+    assert json_zip(dict(plain=True))[0][1] & FLAG_FLAT
+    assert json_unzip(json_zip(dict(plain=True))) == dict(plain=True)
+
+
+def test_zlib_dictionary(logger):
+    logger.info('Test if a preset dictionary shrinks small messages')
+
+    zdict = json_dump(Command(param1='status', param2='host'))
+    compressor = register_zlib_dictionary(zdict.encode('utf-8'), 0x0E, 'z14')
+    command = Command(param1='status', param2='host1')
+
+    message = json_zip(command, compression_threshold=0, codec='json+z14')
+
+    assert message[0][0] == codec_registry.get_codec('json+z14').format_tag
+    assert len(message[1]) < len(json_zip(command)[1])
+    assert json_unzip(message).param2 == 'host1'
+
+    # zlib rejects a body compressed with a different dictionary.
+    other = zlib.compressobj(zdict=b'other dictionary')
+    body = other.compress(b'{"param1": "status"}') + other.flush()
+
+    is_success = None
+    try:
+        compressor.decompress(body)
+        is_success = False
+    except zlib.error:
+        is_success = True
+
+    assert is_success
+
+
+def test_compression_stream(logger):
+    logger.info('Test if compression streams restart for late subscribers')
+
+    stream = StreamCompressor(compressor='zlib', reset_interval=3)
+    messages = [
+        stream.compress(json_zip(Command(param1=str(i), param2='value2')))
+        for i in range(6)
+    ]
+
+    assert all(message[0][1] & FLAG_STREAM for message in messages)
+
+    subscriber = StreamDecompressor()
+    commands = [
+        json_unzip(subscriber.decompress(message))
+        for message in messages
+    ]
+    assert [command.param1 for command in commands] == \
+        [str(i) for i in range(6)]
+
+    # A late subscriber waits for the next stream, a gap breaks the stream.
+    subscriber = StreamDecompressor()
+    for message, is_valid in zip(
+            messages[1:] + [messages[3], messages[5]],
+            (False, False, True, True, True, True, False)):
+        try:
+            command = json_unzip(subscriber.decompress(message))
+            assert is_valid
+        except RuntimeError:
+            assert not is_valid
+
+    assert command.param1 == '3'
+
+
+def test_chunked_compression(logger):
+    logger.info('Test if large bodies are compressed in parallel chunks')
+
+    payload = dict(
+        records=['record {0}'.format(i) for i in range(10000)],
+        raw=b'raw',
+    )
+
+    for codec_name in ('json+zlib', 'marshal+bz2', 'json+none'):
+        message = json_zip(
+            PayloadCommand(payload=payload),
+            codec=codec_name,
+            chunk_size=4096,
+        )
+
+        if codec_name == 'json+none':
+            assert not message[0][1] & FLAG_CHUNKED
+            assert len(message) == 3
+        else:
+            _, _, _, count = read_header(message[0])
+            assert message[0][1] & FLAG_CHUNKED
+            assert count > 1
+            assert len(message) == 1 + count + 1
+
+        assert json_unzip(message).payload == payload
+
+    if not hasattr(os, 'fork'):
+        return
+
+    # A forked child gets its own thread pool for the chunks
+    pid = os.fork()
+    if pid == 0:
+        try:
+            message = json_zip(
+                PayloadCommand(payload=payload),
+                chunk_size=4096,
+            )
+            os._exit(0 if json_unzip(message).payload == payload else 1)
+        finally:
+            os._exit(1)
+
+    deadline = time.monotonic() + 10
+    while True:
+        child_pid, status = os.waitpid(pid, os.WNOHANG)
+        if child_pid != 0 or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+
+    if child_pid == 0:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    assert child_pid == pid
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def test_max_body_size(logger):
+    logger.info('Test if bodies that decompress too much are rejected')
+
+    command = PayloadCommand(payload='a' * 1000000)
+
+    messages = [
+        json_zip(command, codec=codec_name)
+        for codec_name in ('json+zlib', 'json+bz2', 'json+lzma', 'json+none')
+    ] + [
+        json_zip(command, chunk_size=100000),
+        base64.b64encode(
+            zlib.compress(json_dump(command).encode('utf-8'))
+        ).decode('ascii'),
+    ]
+
+    for message in messages:
+        assert json_unzip(message, max_body_size=2000000).payload == \
+            command.payload
+
+        is_success = None
+        try:
+            json_unzip(message, max_body_size=100000)
+            is_success = False
+        except RuntimeError as e:
+            is_success = 'exceeds 100000 bytes' in str(e.__cause__)
+
+        assert is_success
+
+    # Chunked bodies are bounded as a whole, up to the exact size.
+    message = json_zip(command, chunk_size=100000)
+    _, _, _, count = read_header(message[0])
+    size = sum(len(zlib.decompress(frame)) for frame in message[1:1 + count])
+
+    assert json_unzip(message, max_body_size=size).payload == command.payload
+
+    is_success = []
+    for max_body_size in (size - 1, 100000 * (count - 1)):
+        try:
+            json_unzip(message, max_body_size=max_body_size)
+            is_success.append(False)
+        except RuntimeError as e:
+            is_success.append('exceeds' in str(e.__cause__))
+
+    # The chunk count comes from the header and has to match the frames.
+    forged_message = (
+        bytes(message[0])[:-4] + (count + 50).to_bytes(4, 'big'),
+        *message[1:],
+    )
+    try:
+        json_unzip(forged_message, max_body_size=size)
+        is_success.append(False)
+    except RuntimeError as e:
+        is_success.append('chunks' in str(e.__cause__))
+
+    assert is_success == [True, True, True]
+
+
+def test_lazy_command(logger):
+    logger.info('Test if the command id is read without decoding the body')
+
+    message = json_zip(PayloadCommand(payload='a' * 100000))
+
+    lazy_command = LazyCommand(message)
+
+    assert lazy_command.command_id == PayloadCommand.command_id
+    assert lazy_command.command_class is PayloadCommand
+    assert not lazy_command.is_decoded
+
+    assert lazy_command.command.payload == 'a' * 100000
+    assert lazy_command.is_decoded
+
+    # A header that lies about the command is caught once decoded.
+    header = bytearray(message[0])
+    header[2:6] = Command.command_id.to_bytes(4, 'big')
+
+    lazy_command = LazyCommand((bytes(header),) + message[1:])
+    assert lazy_command.command_class is Command
+
+    is_success = None
+    try:
+        lazy_command.command
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
+
+
+def test_struct_command(logger):
+    logger.info('Test if struct commands travel as their packed fields')
+
+    command = TelemetryCommand(1.5, 7, value=2.5)
+
+    for codec_name in ('json+zlib', 'marshal+none'):
+        message = json_zip(
+            command,
+            compression_threshold=0,
+            codec=codec_name,
+        )
+
+        assert message[0][0] == FORMAT_STRUCT
+        assert read_header(message[0])[2] == TelemetryCommand.command_id
+        assert len(message[1]) == TelemetryCommand._struct.size
+
+        decoded = json_unzip(message)
+
+        assert type(decoded) is TelemetryCommand
+        assert decoded.get_command_state() == (1.5, 7, 2.5)
+
+    # The fields still have a JSON form, e.g. for older peers.
+    assert json_dump(command) == \
+        '{"_icmd_": [%d, [1.5, 7, 2.5]]}' % TelemetryCommand.command_id
+
+    # Only struct commands decode from the struct format.
+    header, _ = json_zip(command)
+    body = json_zip(Command(param1='value1', param2='value2'))[1]
+
+    is_success = None
+    try:
+        json_unzip((
+            header[:2] + Command.command_id.to_bytes(4, 'big'),
+            body,
+        ))
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
+
+    # The format has to pack one item per field.
+    is_success = None
+    try:
+        class Mismatch(StructCommand):
+            struct_format = '<dd'
+
+            x: float
+
+        is_success = False
+    except TypeError:
+        is_success = True
+
+    assert is_success
+
+
+def test_batch_command(logger):
+    logger.info('Test if batch commands send every column as one buffer')
+
+    records = [
+        dict(time=i * 0.5, sensor=i % 4, value=float(i))
+        for i in range(1000)
+    ]
+
+    command = SampleBatch.from_records(records)
+
+    for codec_name in ('json+zlib', 'marshal+none'):
+        message = json_zip(command, codec=codec_name)
+
+        assert len(message) == 2 + len(SampleBatch.schema)
+        assert len(message[2]) == 1000 * 8
+
+        decoded = json_unzip(message)
+
+        assert len(decoded) == 1000
+        assert decoded['sensor'].format == 'H'
+        assert decoded['value'].tolist() == [float(i) for i in range(1000)]
+        assert list(decoded.records()) == records
+
+    assert len(json_unzip(json_zip(SampleBatch()))) == 0
+
+    is_success = None
+    try:
+        type('LongBatch', (BatchCommand,), dict(schema=(('count', 'l'),)))
+        is_success = False
+    except TypeError:
+        is_success = True
+
+    assert is_success
+
+    # A batch service has to process either columns or records
+    for create in (
+            lambda: BatchService(),
+            lambda: type('IdleService', (BatchService,), {})):
+        is_success = None
+        try:
+            create()
+            is_success = False
+        except TypeError:
+            is_success = True
+
+        assert is_success
+
+    is_success = None
+    try:
+        SampleBatch(dict(time=[1.0, 2.0], sensor=[1]))
+        is_success = False
+    except ValueError:
+        is_success = True
+
+    assert is_success
+
+
+def test_batch_command_arrays(logger):
+    logger.info('Test if batch commands keep NumPy columns as arrays')
+
+    numpy = pytest.importorskip('numpy')
+
+    command = SampleBatch(dict(
+        time=numpy.linspace(0, 1, 100),
+        sensor=numpy.arange(100),
+        value=numpy.ones(100),
+    ))
+
+    assert command['sensor'].dtype == numpy.dtype('H')
+
+    decoded = json_unzip(json_zip(command))
+
+    assert decoded['value'].dtype == numpy.dtype('f')
+    assert numpy.array_equal(decoded['sensor'], numpy.arange(100))
+    assert decoded['time'].sum() == pytest.approx(50.0)
+
+
+def test_blob_store(logger, tmp_path):
+    logger.info('Test if large buffers travel as digests of stored blobs')
+
+    table = bytes(range(256)) * 1024
+    command = PayloadCommand(payload=dict(table=table, small=b'small'))
+
+    sender_store = BlobStore(directory=str(tmp_path))
+    message = json_zip(command, blob_store=sender_store, blob_threshold=1024)
+
+    assert message[0][1] & FLAG_BLOBS
+    assert sum(len(frame) for frame in message) < 1024
+    assert len(sender_store) == 1
+
+    digests = read_blob_digests(message)
+    assert len(digests) == 1
+
+    # A receiver without the blob is told which blobs it misses.
+    receiver_store = BlobStore()
+
+    is_success = None
+    try:
+        json_unzip(message, blob_store=receiver_store)
+        is_success = False
+    except MissingBlobsError as e:
+        is_success = e.digests == digests
+
+    assert is_success
+
+    receiver_store.put(table)
+    assert json_unzip(message, blob_store=receiver_store).payload == \
+        command.payload
+
+    # Processes on the same host find the blob in the shared directory.
+    assert json_unzip(
+        message,
+        blob_store=BlobStore(directory=str(tmp_path)),
+    ).payload == command.payload
+
+    # Blobs are evicted beyond the size of the store.
+    store = BlobStore(max_size=3 * 1024)
+    for i in range(4):
+        store.put(bytes([i]) * 1024)
+
+    assert len(store) == 3
+    assert store.size == 3 * 1024
+
+    # So are their files in a shared directory.
+    directory = tmp_path / 'evicted'
+    store = BlobStore(max_size=3 * 1024, directory=str(directory))
+    digests = [store.put(bytes([i]) * 1024) for i in range(4)]
+
+    assert digests[0] not in store
+    assert all(digest in store for digest in digests[1:])
+    assert len(os.listdir(str(directory))) == 3
+
+
+@pytest.mark.parametrize('shm_directory', ['/dev/shm', '/nonexistent'])
+def test_shared_memory(logger, monkeypatch, shm_directory):
+    logger.info('Test if large buffers are handed over in shared memory')
+
+    pytest.importorskip('multiprocessing.shared_memory')
+
+    # Without the directory segments are attached through SharedMemory.
+    monkeypatch.setattr(
+        sys.modules['zmqrpc.command.SharedMemoryReader'],
+        '_SHM_DIRECTORY',
+        shm_directory,
+    )
+
+    numbers = array.array('d', range(100000))
+    command = PayloadCommand(payload=dict(
+        numbers=memoryview(numbers),
+        small=b'small',
+    ))
+
+    writer = SharedMemoryWriter()
+    message = json_zip(
+        command,
+        shared_memory=writer,
+        shared_memory_threshold=1024,
+    )
+
+    assert message[0][1] & FLAG_SHARED_MEMORY
+    assert sum(len(frame) for frame in message) < 1024
+    assert len(writer) == 1
+
+    reader = SharedMemoryReader()
+    payload = json_unzip(message, shared_memory=reader).payload
+
+    # The receiver keeps its mapping after the sender released the segment.
+    writer.release()
+
+    assert payload['numbers'].readonly
+    assert payload['numbers'].tolist() == numbers.tolist()
+    assert payload['small'] == b'small'
+
+    reader.collect()
+    del payload
+    gc.collect()
+    reader.collect()
+
+    assert len(writer) == 0
+    assert not any(
+        name.startswith('psm_') for name in os.listdir('/dev/shm')
+    )
+
+    is_success = None
+    try:
+        json_unzip(message)
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
+
+    # Handles naming anything but a segment are refused.
+    for name in (b'../../etc/passwd', b'psm_../x', b'psm_0/../../x'):
+        is_success = None
+        try:
+            reader.get(memoryview(HANDLE.pack(20) + name))
+            is_success = False
+        except RuntimeError:
+            is_success = True
+
+        assert is_success
@@ -26,6 +26,8 @@ from zmqrpc import (
 )
 
 from .Command import Command
+from .EchoService import EchoService
+from .PayloadCommand import PayloadCommand
 from .Service import Service
 from .State import State
 
@@ -356,3 +358,52 @@ def test_rpc1_req_rep_with_rep_req_buffered_proxy(
     close_socket_delay()
 
     assert call_state.last_param1 == 'value1-2viaproxy'
+
+
+def test_out_of_band_buffers_with_rep_req_proxy(
+        logger,
+        close_socket_delay,
+        two_sec_delay):
+    logger.info(
+        'Test if buffers in commands travel through a rep/req proxy'
+    )
+
+    call_state = State()
+
+    client = ZmqRpcClient(zmq_req_endpoints=['tcp://localhost:53000'])
+
+    proxy_rep_req_thread = ZmqProxyRep2ReqThread(
+        zmq_rep_bind_address='tcp://*:53000',
+        zmq_req_connect_addresses=['tcp://localhost:53001'],
+    )
+    proxy_rep_req_thread.start()
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:53001',
+    )
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(state=call_state),
+    )
+    server_thread.start()
+
+    two_sec_delay()
+
+    frame = bytes(range(256)) * 4096
+
+    response = client.execute_remote(
+        command=PayloadCommand(payload=dict(frame=frame)),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+    proxy_rep_req_thread.stop()
+    proxy_rep_req_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert response[0] is None
+    assert call_state.last_payload == dict(frame=frame)
@@ -11,13 +11,41 @@ Edited on Oct 2020
 '''
 
 
-from zmqrpc import ICommand, ShutdownServer, ZmqRpcClient, ZmqRpcServerThread
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+import pytest
+
+from zmqrpc import (
+    AsyncZmqRpcClient,
+    ICommand,
+    PipelinedRpcClient,
+    ShutdownServer,
+    ThreadSafeRpcClient,
+    ZmqRpcClient,
+    ZmqRpcServer,
+    ZmqRpcServerThread,
+)
+from zmqrpc.client import MessageCache
+from zmqrpc.command import codec_registry, json_unzip, json_zip
 
 from .Command import Command
+from .CountingCommand import CountingCommand
+from .EchoService import EchoService
 from .InvalidCommandConstructor import InvalidCommandConstructor
+from .PayloadCommand import PayloadCommand
+from .PositionCommand import PositionCommand
+from .ReadingCommand import ReadingCommand
+from .SampleBatch import SampleBatch
+from .SampleBatchService import SampleBatchService
 from .Service import Service
 from .ServiceWithException import ServiceWithException
 from .State import State
+from .StateService import StateService
+from .TelemetryCommand import TelemetryCommand
+from .TelemetryService import TelemetryService
 
 
 def test_valid_rpc_registration(logger, close_socket_delay):
@@ -396,3 +424,1112 @@ def test_pub_sub_timeout_per_socket_using_heartbeat_function(
     close_socket_delay()
 
     assert call_state.last_param1 == 'testxx-value4'
+
+
+def test_rpc_min_responses(logger, close_socket_delay):
+    logger.info(
+        'Test if commands return after the first responses of replicated '
+        'servers and drop the late ones'
+    )
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000', 'tcp://localhost:55001'],
+    )
+
+    server_threads = []
+    for port in (55000, 55001):
+        server_thread = ZmqRpcServerThread(
+            zmq_rep_bind_address='tcp://*:{0}'.format(port),
+        )
+        server_thread.register_service(
+            command_class=Command,
+            service=Service(state=State()),
+        )
+        server_threads.append(server_thread)
+
+    # The second server starts late and answers the first command after
+    # the client returned.
+    server_threads[0].start()
+
+    first_response = client.execute_remote(
+        command=Command(param1='first', param2='b'),
+        time_out_in_sec=3,
+        min_responses=1,
+    )
+
+    server_threads[1].start()
+
+    response = client.execute_remote(
+        command=Command(param1='second', param2='b'),
+        time_out_in_sec=3,
+    )
+
+    completed = list(client.execute_remote_as_completed(
+        command=Command(param1='third', param2='b'),
+        time_out_in_sec=3,
+    ))
+
+    for server_thread in server_threads:
+        server_thread.stop()
+        server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert first_response == ('first:b', None)
+    assert response == ('second:b', 'second:b')
+    assert sorted(completed) == [(0, 'third:b'), (1, 'third:b')]
+
+
+def test_rpc_load_balancing(logger, close_socket_delay):
+    logger.info(
+        'Test if commands are spread over the healthy replicated servers'
+    )
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=[
+            'tcp://localhost:55000',
+            'tcp://localhost:55001',
+            'tcp://localhost:55002',
+        ],
+        load_balancing='round_robin',
+    )
+
+    call_states = [State(), State()]
+
+    # Nothing listens on the last endpoint.
+    server_threads = []
+    for port, call_state in zip((55000, 55001), call_states):
+        server_thread = ZmqRpcServerThread(
+            zmq_rep_bind_address='tcp://*:{0}'.format(port),
+        )
+        server_thread.register_service(
+            command_class=Command,
+            service=Service(state=call_state),
+        )
+        server_thread.start()
+        server_threads.append(server_thread)
+
+    responses = []
+    for param1 in ('a', 'b', 'c', 'd', 'e'):
+        try:
+            responses.append(client.execute_remote(
+                command=Command(param1=param1, param2='b'),
+                time_out_in_sec=0.5 if param1 == 'c' else 3,
+            ))
+        except Exception:
+            responses.append(None)
+
+    # The failed endpoint is left out for a while.
+    is_healthy = client.load_balancer.is_healthy(2)
+
+    for server_thread in server_threads:
+        server_thread.stop()
+        server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert responses == [('a:b',), ('b:b',), None, ('d:b',), ('e:b',)]
+    assert [call_state.last_param1 for call_state in call_states] == \
+        ['d', 'e']
+    assert not is_healthy
+
+
+def test_rpc_codec_negotiation(logger, close_socket_delay):
+    logger.info(
+        'Test if the client negotiates a codec accepted by the server and '
+        'if the server rejects other codecs'
+    )
+
+    call_state = State()
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        codec='marshal+zlib',
+    )
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:55000',
+        codecs=('json+lzma',),
+    )
+    server_thread.register_service(
+        command_class=Command,
+        service=Service(state=call_state),
+    )
+    server_thread.start()
+
+    is_success = None
+    try:
+        client.execute_remote(
+            command=Command(param1='value1', param2='value2'),
+            time_out_in_sec=3,
+        )
+        is_success = False
+        logger.error('Server accepted a codec it does not support')
+    except Exception:
+        is_success = True
+
+    codec = client.negotiate_codec(
+        preferred_codecs=('marshal+zlib', 'json+lzma'),
+        time_out_in_sec=3,
+    )
+
+    response = client.execute_remote(
+        command=Command(param1='value1' * 1000, param2='value2'),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert is_success
+    assert codec == 'json+lzma'
+    assert response[0] == '{0}:value2'.format('value1' * 1000)
+
+
+def test_rpc_marshal_opt_in(logger):
+    logger.info('Test if servers only accept marshal when listed in codecs')
+
+    status_codes = []
+    for codecs in (None, ('marshal+none',)):
+        server = ZmqRpcServer(codecs=codecs)
+        server.register_service(
+            command_class=Command,
+            service=Service(state=State()),
+        )
+
+        response = server.handle_incoming_message(json_zip(
+            Command(param1='value1', param2='value2'),
+            codec='marshal+none',
+        ))
+        status_codes.append(ZmqRpcServer.STATUS_FRAME.unpack(response[0])[0])
+
+    assert status_codes[0] != ZmqRpcServer.STATUS_CODE_OK
+    assert status_codes[1] == ZmqRpcServer.STATUS_CODE_OK
+
+
+def test_rpc_slots_command(logger, close_socket_delay):
+    logger.info('Test if slots commands with required fields are served')
+
+    client = ZmqRpcClient(zmq_req_endpoints=['tcp://localhost:55000'])
+
+    server_thread = ZmqRpcServerThread(zmq_rep_bind_address='tcp://*:55000')
+    server_thread.register_service(
+        command_class=PositionCommand,
+        service=StateService(),
+    )
+    server_thread.start()
+
+    response = client.execute_remote(
+        command=PositionCommand(3, y=4),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert response[0] == [3, 4]
+
+
+def test_rpc_struct_command(logger, close_socket_delay):
+    logger.info(
+        'Test if struct commands are served next to the commands of a codec'
+    )
+
+    call_state = State()
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        codec='json+lzma',
+    )
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:55000',
+        codecs=('json+lzma',),
+    )
+    server_thread.register_service(
+        command_class=Command,
+        service=Service(state=call_state),
+    )
+    server_thread.register_service(
+        command_class=TelemetryCommand,
+        service=TelemetryService(state=call_state),
+    )
+    server_thread.start()
+
+    responses = [
+        client.execute_remote(
+            command=TelemetryCommand(time=1.5, sensor=3, value=4.0),
+            time_out_in_sec=3,
+        ),
+        client.execute_remote(
+            command=Command(param1='value1', param2='value2'),
+            time_out_in_sec=3,
+        ),
+    ]
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert call_state.last_sensor == 3
+    assert call_state.last_param1 == 'value1'
+    assert responses[0][0] == 8.0
+    assert responses[1][0] == 'value1:value2'
+
+
+def test_rpc_struct_command_without_defaults(logger, close_socket_delay):
+    logger.info('Test if struct commands without field defaults are served')
+
+    client = ZmqRpcClient(zmq_req_endpoints=['tcp://localhost:55000'])
+
+    server_thread = ZmqRpcServerThread(zmq_rep_bind_address='tcp://*:55000')
+    server_thread.register_service(
+        command_class=ReadingCommand,
+        service=StateService(),
+    )
+    server_thread.start()
+
+    response = client.execute_remote(
+        command=ReadingCommand(time=1.5, value=2.5, count=3),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert response[0] == [1.5, 2.5, 3]
+
+
+def test_rpc_batch_command(logger, close_socket_delay):
+    logger.info('Test if a record by record service handles batch commands')
+
+    call_state = State()
+
+    client = ZmqRpcClient(zmq_req_endpoints=['tcp://localhost:55000'])
+
+    server_thread = ZmqRpcServerThread(zmq_rep_bind_address='tcp://*:55000')
+    server_thread.register_service(
+        command_class=SampleBatch,
+        service=SampleBatchService(state=call_state),
+    )
+    server_thread.start()
+
+    response = client.execute_remote(
+        command=SampleBatch(dict(
+            time=[0.0, 0.5, 1.0],
+            sensor=[1, 2, 3],
+            value=[1.5, 2.5, 3.5],
+        )),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert call_state.last_sensor == 3
+    assert response[0] == [3.0, 5.0, 7.0]
+
+
+def test_rpc_blobs(logger, close_socket_delay):
+    logger.info(
+        'Test if servers ask for missing blobs and clients send them again '
+        'once a server lost them'
+    )
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        blob_threshold=1024,
+    )
+
+    table = bytes(range(256)) * 1024
+    responses = []
+    is_success = None
+
+    for _ in range(2):
+        server_thread = ZmqRpcServerThread(
+            zmq_rep_bind_address='tcp://*:55000',
+            blob_cache_size=1024 * 1024,
+        )
+        server_thread.register_service(
+            command_class=PayloadCommand,
+            service=EchoService(),
+        )
+        server_thread.start()
+
+        if responses:
+            # The new server misses the blob the client already sent.
+            try:
+                client.execute_remote(
+                    command=PayloadCommand(payload=table),
+                    time_out_in_sec=3,
+                )
+                is_success = False
+            except Exception as e:
+                is_success = 'missing blobs' in str(e)
+
+        for name in ('first', 'second'):
+            responses.append(client.execute_remote(
+                command=PayloadCommand(payload=dict(table=table, name=name)),
+                time_out_in_sec=3,
+            ))
+
+        server_thread.stop()
+        server_thread.join()
+
+        # Cleaning up sockets takes some time
+        close_socket_delay()
+
+    client.destroy()
+
+    assert is_success
+    assert len(client.blob_store) == 1
+    assert [response[0] for response in responses] == [
+        dict(table=table, name=name)
+        for name in ('first', 'second') * 2
+    ]
+
+
+def test_rpc_shared_memory(logger, close_socket_delay):
+    logger.info('Test if commands pass large buffers in shared memory')
+
+    pytest.importorskip('multiprocessing.shared_memory')
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        shared_memory_threshold=1024,
+    )
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:55000',
+        shared_memory=True,
+    )
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    frame = bytes(range(256)) * 4096
+
+    responses = [
+        client.execute_remote(
+            command=PayloadCommand(payload=dict(frame=frame, index=index)),
+            time_out_in_sec=3,
+        )
+        for index in range(2)
+    ]
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert [response[0] for response in responses] == [
+        dict(frame=frame, index=index)
+        for index in range(2)
+    ]
+
+
+def test_rpc_transfer(logger, close_socket_delay):
+    logger.info('Test if large commands and responses travel in chunks')
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        transfer_chunk_size=64 * 1024,
+    )
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:55000',
+        transfer_chunk_size=64 * 1024,
+        transfer_window=128 * 1024,
+        transfer_spill_size=512 * 1024,
+    )
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    frame = bytes(range(256)) * 4096
+
+    sizes = (100, 300 * 1024, len(frame))
+
+    responses = [
+        client.execute_remote(
+            command=PayloadCommand(payload=dict(frame=frame[:size])),
+            time_out_in_sec=5,
+        )
+        for size in sizes
+    ]
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert [response[0] for response in responses] == [
+        dict(frame=frame[:size])
+        for size in sizes
+    ]
+
+
+def test_rpc_transfer_limits(logger, close_socket_delay):
+    logger.info(
+        'Test if servers only accept transfers when enabled and up to '
+        'transfer_max_size'
+    )
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        transfer_chunk_size=64 * 1024,
+    )
+
+    frame = bytes(range(256)) * 1024 * 4
+
+    exceptions = []
+    for transfer_chunk_size in (0, 64 * 1024):
+        server_thread = ZmqRpcServerThread(
+            zmq_rep_bind_address='tcp://*:55000',
+            transfer_chunk_size=transfer_chunk_size,
+            transfer_max_size=512 * 1024,
+        )
+        server_thread.register_service(
+            command_class=PayloadCommand,
+            service=EchoService(),
+        )
+        server_thread.start()
+
+        for size in (300 * 1024, len(frame)):
+            try:
+                client.execute_remote(
+                    command=PayloadCommand(payload=dict(frame=frame[:size])),
+                    time_out_in_sec=5,
+                )
+                exceptions.append(None)
+            except Exception as e:
+                exceptions.append(str(e))
+
+        server_thread.stop()
+        server_thread.join()
+
+        # Cleaning up sockets takes some time
+        close_socket_delay()
+
+    client.destroy()
+
+    assert 'transfers are not enabled' in exceptions[0]
+    assert 'transfers are not enabled' in exceptions[1]
+    assert exceptions[2] is None
+    assert 'exceeds 524288 bytes' in exceptions[3]
+
+
+def test_rpc_pipelined_client(logger, close_socket_delay):
+    logger.info(
+        'Test if a pipelined client keeps many requests in flight on a '
+        'ROUTER socket that also serves REQ clients'
+    )
+
+    call_state = State()
+
+    client = PipelinedRpcClient(
+        zmq_dealer_endpoint='tcp://localhost:55000',
+        max_in_flight=8,
+    )
+    req_client = ZmqRpcClient(zmq_req_endpoints=['tcp://localhost:55000'])
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:55000',
+        transfer_chunk_size=64 * 1024,
+        router=True,
+    )
+    server_thread.register_service(
+        command_class=Command,
+        service=Service(state=call_state),
+    )
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    futures = [
+        client.submit(
+            command=Command(param1='value%d' % i, param2='value2'),
+            time_out_in_sec=3,
+        )
+        for i in range(20)
+    ]
+    in_flight = client.in_flight
+
+    frame = bytes(range(256)) * 1024
+    transfer_future = client.submit(
+        command=PayloadCommand(payload=dict(frame=frame)),
+        time_out_in_sec=3,
+    )
+
+    responses = [future.result() for future in futures]
+    transfer_response = transfer_future.result()
+
+    req_response = req_client.execute_remote(
+        command=Command(param1='req', param2='value2'),
+        time_out_in_sec=3,
+    )
+    client_response = client.execute_remote(
+        command=Command(param1='dealer', param2='value2'),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+
+    # Requests without a reply fail when they expire.
+    timeout_future = client.submit(
+        command=Command(param1='value1', param2='value2'),
+        time_out_in_sec=0.2,
+    )
+    timeout_exception = timeout_future.exception()
+
+    client.destroy()
+    req_client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert 0 < in_flight <= 8
+    assert responses == ['value%d:value2' % i for i in range(20)]
+    assert transfer_response == dict(frame=frame)
+    assert req_response[0] == 'req:value2'
+    assert client_response == 'dealer:value2'
+    assert isinstance(timeout_exception, TimeoutError)
+    assert client.in_flight == 0
+
+
+def test_rpc_async_client(logger, close_socket_delay):
+    logger.info(
+        'Test if concurrent coroutines share the connection of an asyncio '
+        'client, with deadlines and cancellation'
+    )
+
+    call_state = State()
+
+    client = AsyncZmqRpcClient(
+        zmq_dealer_endpoint='tcp://localhost:55000',
+        max_in_flight=8,
+    )
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:55000',
+        transfer_chunk_size=64 * 1024,
+        router=True,
+    )
+    server_thread.register_service(
+        command_class=Command,
+        service=Service(state=call_state),
+    )
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    frame = bytes(range(256)) * 1024
+
+    def run_in_new_loop(coroutine):
+        # asyncio.run needs Python 3.7. Every call runs on another loop, which
+        # the client has to support as well.
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    async def execute_concurrently():
+        return await asyncio.gather(
+            client.execute_remote(
+                command=PayloadCommand(payload=dict(frame=frame)),
+                time_out_in_sec=3,
+            ),
+            *(
+                client.execute_remote(
+                    command=Command(param1='value%d' % i, param2='value2'),
+                    time_out_in_sec=3,
+                )
+                for i in range(20)
+            ),
+        )
+
+    transfer_response, *responses = run_in_new_loop(execute_concurrently())
+
+    server_thread.stop()
+    server_thread.join()
+
+    async def execute_without_server():
+        try:
+            await client.execute_remote(
+                command=Command(param1='value1', param2='value2'),
+                time_out_in_sec=0.2,
+            )
+        except TimeoutError as e:
+            timeout_exception = e
+
+        task = asyncio.ensure_future(client.execute_remote(
+            command=Command(param1='value1', param2='value2'),
+            time_out_in_sec=3,
+        ))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        return timeout_exception, task.cancelled(), client.in_flight
+
+    timeout_exception, cancelled, in_flight = run_in_new_loop(
+        execute_without_server()
+    )
+
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert transfer_response == dict(frame=frame)
+    assert responses == ['value%d:value2' % i for i in range(20)]
+    assert isinstance(timeout_exception, TimeoutError)
+    assert cancelled
+    assert in_flight == 0
+
+
+def test_rpc_thread_safe_client(logger, close_socket_delay):
+    logger.info(
+        'Test if many threads share the connection of a thread-safe client'
+    )
+
+    call_state = State()
+
+    client = ThreadSafeRpcClient(
+        zmq_dealer_endpoint='tcp://localhost:55000',
+        max_in_flight=4,
+    )
+
+    server_thread = ZmqRpcServerThread(
+        zmq_rep_bind_address='tcp://*:55000',
+        router=True,
+    )
+    server_thread.register_service(
+        command_class=Command,
+        service=Service(state=call_state),
+    )
+    server_thread.start()
+
+    def execute(i):
+        return [
+            client.execute_remote(
+                command=Command(param1='value%d' % i, param2='value%d' % j),
+                time_out_in_sec=3,
+            )
+            for j in range(10)
+        ]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(execute, range(8)))
+
+    # Short lived threads leave no sockets behind.
+    fd_counts = []
+    for _ in range(2):
+        threads = [Thread(target=execute, args=(0,)) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if os.path.isdir('/proc/self/fd'):
+            fd_counts.append(len(os.listdir('/proc/self/fd')))
+
+    server_thread.stop()
+    server_thread.join()
+
+    # Requests without a reply fail when they expire.
+    timeout_exception = client.submit(
+        command=Command(param1='value1', param2='value2'),
+        time_out_in_sec=0.2,
+    ).exception()
+
+    client.destroy()
+
+    try:
+        client.submit(command=Command(param1='value1', param2='value2'))
+    except RuntimeError as e:
+        destroyed_exception = e
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert responses == [
+        ['value%d:value%d' % (i, j) for j in range(10)]
+        for i in range(8)
+    ]
+    assert isinstance(timeout_exception, TimeoutError)
+    assert isinstance(destroyed_exception, RuntimeError)
+    assert len(set(fd_counts)) <= 1
+
+
+def test_rpc_out_of_band_buffers(logger, close_socket_delay):
+    logger.info(
+        'Test if buffers in commands and responses travel over REQ/REP'
+    )
+
+    client = ZmqRpcClient(zmq_req_endpoints=['tcp://localhost:55000'])
+
+    server_thread = ZmqRpcServerThread(zmq_rep_bind_address='tcp://*:55000')
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    frame = bytes(range(256)) * 4096
+
+    response = client.execute_remote(
+        command=PayloadCommand(payload=dict(frame=frame, name='frame')),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert response[0] == dict(frame=frame, name='frame')
+
+
+def test_rpc_binary_response(logger, close_socket_delay):
+    logger.info(
+        'Test if responses use the codec of the request and may carry '
+        'commands'
+    )
+
+    server = ZmqRpcServer()
+    server.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+
+    large = ['value {0}'.format(i) for i in range(1000)]
+
+    response = server.handle_incoming_message(json_zip(
+        PayloadCommand(payload=large),
+        codec='json+lzma',
+    ))
+    assert server.STATUS_FRAME.unpack(response[0]) == (server.STATUS_CODE_OK,)
+    assert response[1][0] == codec_registry.get_codec('json+lzma').format_tag
+    assert json_unzip(response[1:]) == large
+
+    response = server.handle_incoming_message(json_zip(Command()))
+    assert server.STATUS_FRAME.unpack(response[0]) == \
+        (server.STATUS_CODE_BAD_SERVICE,)
+    assert b'Command' in response[1]
+
+    # Unknown commands are rejected without decoding their body.
+    response = server.handle_incoming_message(
+        (json_zip(Command())[0], b'not a body'),
+    )
+    assert server.STATUS_FRAME.unpack(response[0]) == \
+        (server.STATUS_CODE_BAD_SERVICE,)
+
+    server.stop()
+
+    client = ZmqRpcClient(zmq_req_endpoints=['tcp://localhost:55000'])
+
+    server_thread = ZmqRpcServerThread(zmq_rep_bind_address='tcp://*:55000')
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    response = client.execute_remote(
+        command=PayloadCommand(payload=Command(param1='a', param2='b')),
+        time_out_in_sec=3,
+    )
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert isinstance(response[0], Command)
+    assert response[0].param1 == 'a'
+
+
+def test_rpc_message_cache(logger, close_socket_delay):
+    logger.info('Test if the client encodes repeated commands only once')
+
+    call_state = State()
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        message_cache_size=2,
+    )
+
+    server_thread = ZmqRpcServerThread(zmq_rep_bind_address='tcp://*:55000')
+    server_thread.register_service(
+        command_class=Command,
+        service=Service(state=call_state),
+    )
+    server_thread.register_service(
+        command_class=CountingCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    responses = [
+        client.execute_remote(
+            command=Command(param1=param1, param2='value2'),
+            time_out_in_sec=3,
+        )
+        for param1 in ('a', 'a', 'b', 'c', 'a')
+    ]
+
+    cache = client.message_cache
+    hits, misses = cache.hits, cache.misses
+
+    command = CountingCommand(payload='status')
+    for _ in range(3):
+        client.execute_remote(command=command, time_out_in_sec=3)
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert [response[0] for response in responses] == \
+        ['a:value2', 'a:value2', 'b:value2', 'c:value2', 'a:value2']
+
+    # 'a' was evicted by 'c' in the cache of size 2
+    assert (hits, misses) == (1, 4)
+    assert len(cache) == 2
+
+    assert command.state_calls == 1
+
+
+def test_message_cache_buffers(logger):
+    logger.info(
+        'Test if commands holding buffers with the same bytes but a '
+        'different layout get their own message'
+    )
+
+    numpy = pytest.importorskip('numpy')
+
+    cache = MessageCache(max_size=4)
+
+    ints = numpy.arange(6, dtype=numpy.int32).reshape(2, 3)
+    floats = ints.reshape(-1).view(numpy.float32)
+
+    assert ints.tobytes() == floats.tobytes()
+
+    for payload in (ints, floats):
+        decoded = json_unzip(cache.get_message(
+            PayloadCommand(payload=payload),
+            json_zip,
+        )).payload
+
+        assert decoded.dtype == payload.dtype
+        assert decoded.shape == payload.shape
+
+    for payload in (memoryview(ints), memoryview(floats)):
+        decoded = json_unzip(cache.get_message(
+            PayloadCommand(payload=payload),
+            json_zip,
+        )).payload
+
+        assert decoded.format == payload.format
+        assert decoded.shape == payload.shape
+
+    assert len(cache) == 0
+
+    cache.get_message(PayloadCommand(payload=b'raw'), json_zip)
+
+    assert len(cache) == 1
+
+
+def test_rpc_pub_sub_compression_stream(
+        logger,
+        close_socket_delay,
+        slow_joiner_delay,
+        two_sec_delay):
+    logger.info('Test if commands survive a compression stream over PUB/SUB')
+
+    call_state = State()
+
+    client = ZmqRpcClient(
+        zmq_pub_endpoint='tcp://*:54000',
+        pub_stream_compressor='zlib',
+        pub_stream_reset_interval=3,
+    )
+
+    server_thread = ZmqRpcServerThread(
+        zmq_sub_connect_addresses=['tcp://localhost:54000'],
+    )
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(state=call_state),
+    )
+    server_thread.start()
+
+    # Wait a bit to avoid slow joiner...
+    slow_joiner_delay()
+
+    payloads = []
+    for i in range(7):
+        payloads.append(dict(index=i, status='running'))
+        client.execute_remote(command=PayloadCommand(payload=payloads[-1]))
+
+    # Wait a bit to make sure message is sent...
+    two_sec_delay()
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert call_state.last_payload == payloads[-1]
+
+
+def test_rpc_command_pool(logger):
+    logger.info('Test if the server reuses the commands of pooled services')
+
+    call_state = State()
+
+    server = ZmqRpcServer()
+    server.register_service(
+        command_class=Command,
+        service=Service(state=call_state),
+        pool_size=2,
+    )
+    server.register_service(
+        command_class=TelemetryCommand,
+        service=TelemetryService(state=call_state),
+        pool_size=2,
+    )
+
+    responses = []
+    for i in range(5):
+        for command in (
+                Command(param1=str(i), param2='b'),
+                TelemetryCommand(time=i, sensor=i, value=i)):
+            response = server.handle_incoming_message(json_zip(command))
+            responses.append(json_unzip(response[1:]))
+
+    command_pool = server.command_pool
+
+    server.stop()
+
+    assert responses == [
+        response
+        for i in range(5)
+        for response in ('{0}:b'.format(i), i * 2)
+    ]
+    assert call_state.last_sensor == 4
+
+    assert (command_pool.hits, command_pool.misses) == (8, 2)
+    assert len(command_pool) == 2
+
+
+def test_rpc_max_body_size(logger):
+    logger.info('Test if the server rejects bodies that decompress too much')
+
+    server = ZmqRpcServer(max_body_size=100000)
+    server.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+
+    response = server.handle_incoming_message(json_zip(
+        PayloadCommand(payload='a' * 1000000),
+    ))
+
+    assert server.STATUS_FRAME.unpack(response[0]) == \
+        (server.STATUS_CODE_BAD_SERIALIZATION,)
+
+    response = server.handle_incoming_message(json_zip(
+        PayloadCommand(payload='a' * 1000),
+    ))
+
+    assert server.STATUS_FRAME.unpack(response[0]) == \
+        (server.STATUS_CODE_OK,)
+
+    server.stop()
+
+
+def test_rpc_client_max_body_size(logger, close_socket_delay):
+    logger.info('Test if clients reject responses that decompress too much')
+
+    client = ZmqRpcClient(
+        zmq_req_endpoints=['tcp://localhost:55000'],
+        max_body_size=100000,
+    )
+
+    server_thread = ZmqRpcServerThread(zmq_rep_bind_address='tcp://*:55000')
+    server_thread.register_service(
+        command_class=PayloadCommand,
+        service=EchoService(),
+    )
+    server_thread.start()
+
+    response = client.execute_remote(
+        command=PayloadCommand(payload='a' * 1000),
+        time_out_in_sec=3,
+    )
+
+    exception = None
+    try:
+        client.execute_remote(
+            command=PayloadCommand(payload='a' * 1000000),
+            time_out_in_sec=3,
+        )
+    except Exception as e:
+        exception = e
+
+    server_thread.stop()
+    server_thread.join()
+    client.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert response[0] == 'a' * 1000
+    assert 'Cannot decode the response' in str(exception)
@@ -11,7 +11,11 @@ Edited on Oct 2020
 '''
 
 
-from zmqrpc import ZmqReceiverThread, ZmqSender
+import time
+
+from zmqrpc import ZmqReceiver, ZmqReceiverThread, ZmqSender
+from zmqrpc.base import IncomingTransfer, OutgoingTransfer
+from zmqrpc.sender import LoadBalancer
 
 
 def test_req_rep_sockets(logger, close_socket_delay, slow_joiner_delay):
@@ -107,6 +111,58 @@ def test_req_rep_sockets_without_password(
     assert receiver_thread.get_last_received_message() == 'test'
 
 
+def test_req_rep_multiple_endpoints(logger, close_socket_delay):
+    logger.info(
+        'Test if a REQ sender waits on all endpoints at once, and no longer '
+        'than a fractional timeout'
+    )
+
+    receiver_threads = [
+        ZmqReceiverThread(zmq_rep_bind_address='tcp://*:{0}'.format(port))
+        for port in (47001, 47002)
+    ]
+    for receiver_thread in receiver_threads:
+        receiver_thread.start()
+
+    sender = ZmqSender(
+        zmq_req_endpoints=['tcp://localhost:47001', 'tcp://localhost:47002'],
+    )
+
+    responses = sender.send('test', time_out_in_sec=3)
+    sender.destroy()
+
+    # Nothing listens on the last endpoint.
+    sender = ZmqSender(
+        zmq_req_endpoints=['tcp://localhost:47001', 'tcp://localhost:47003'],
+    )
+
+    start = time.monotonic()
+    is_success = None
+    try:
+        sender.send('test', time_out_in_sec=0.2)
+        is_success = False
+    except BaseException:
+        is_success = True
+    elapsed = time.monotonic() - start
+
+    for receiver_thread in receiver_threads:
+        receiver_thread.stop()
+        receiver_thread.join()
+    sender.destroy()
+
+    # Cleaning up sockets takes some time
+    close_socket_delay()
+
+    assert len(responses) == 2
+    assert all(
+        receiver_thread.get_last_received_message() == 'test'
+        for receiver_thread in receiver_threads
+    )
+
+    assert is_success
+    assert 0.2 <= elapsed < 0.9
+
+
 def test_pub_sub_without_passwords(
         logger,
         close_socket_delay,
@@ -274,3 +330,113 @@ def test_pub_sub_timeout_per_socket(
     close_socket_delay()
 
     assert receiver_thread.get_last_received_message() == 'test4'
+
+
+def test_transfer_reassembly(logger):
+    logger.info('Test if transfers cut and reassemble multipart messages')
+
+    message = (b'header', bytes(range(256)) * 1000, b'', b'tail' * 3000)
+
+    for spill_size in (None, 1024):
+        outgoing = OutgoingTransfer(message, chunk_size=10000)
+
+        incoming = IncomingTransfer(
+            outgoing.next_message(25000),
+            spill_size=spill_size,
+        )
+        while not outgoing.is_done:
+            assert not incoming.is_done
+            incoming.add(outgoing.next_message(0))
+
+        assert incoming.is_done
+        assert incoming.sequence == outgoing.sequence == 26
+        assert [bytes(frame) for frame in incoming.message()] == \
+            list(message)
+
+    outgoing = OutgoingTransfer(message, chunk_size=10000)
+    incoming = IncomingTransfer(outgoing.next_message(0), max_size=300000)
+
+    # Messages of a transfer have to arrive in order.
+    outgoing.next_message(0)
+
+    is_success = None
+    try:
+        incoming.add(outgoing.next_message(0))
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
+
+    is_success = None
+    try:
+        IncomingTransfer(outgoing.next_message(0), max_size=1000)
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
+
+
+def test_transfer_limits(logger):
+    logger.info('Test if receivers bound the transfers they keep open')
+
+    message = (b'header', bytes(range(256)) * 1000)
+
+    receiver = ZmqReceiver(transfer_chunk_size=10000, max_transfers=2)
+
+    status_codes = []
+    for _ in range(3):
+        outgoing = OutgoingTransfer(message, chunk_size=10000)
+        response = receiver._handle_transfer(outgoing.next_message(0))
+        status_codes.append(
+            ZmqReceiver.STATUS_FRAME.unpack(response[0])[0]
+        )
+
+    assert status_codes == [
+        ZmqReceiver.STATUS_CODE_CONTINUE,
+        ZmqReceiver.STATUS_CODE_CONTINUE,
+        ZmqReceiver.STATUS_CODE_BAD_SERIALIZATION,
+    ]
+
+
+def test_load_balancer(logger):
+    logger.info('Test if load balancing policies pick healthy endpoints')
+
+    def dispatch(load_balancer, count, latencies=(0.01, 0.01, 0.01)):
+        indexes = []
+        for _ in range(count):
+            index = load_balancer.choose()
+            load_balancer.finish(index, True, latencies[index])
+            indexes.append(index)
+
+        return indexes
+
+    load_balancer = LoadBalancer(policy='round_robin', endpoint_count=3)
+    assert dispatch(load_balancer, 4) == [0, 1, 2, 0]
+
+    # A failed endpoint is left out until its backoff expires.
+    load_balancer.finish(1, False, 0.01)
+    assert not load_balancer.is_healthy(1)
+    assert dispatch(load_balancer, 4) == [2, 0, 2, 0]
+
+    load_balancer = LoadBalancer(policy='latency', endpoint_count=3)
+
+    # Every endpoint is tried once, then the fastest gets most requests.
+    indexes = dispatch(load_balancer, 1000, latencies=(0.001, 0.1, 1.0))
+    assert indexes[:3] == [0, 1, 2]
+    assert indexes.count(0) > 900
+
+    # Without any healthy endpoint the first one back is tried.
+    for index in (2, 0, 1):
+        load_balancer.finish(index, False, 0.01)
+    assert load_balancer.choose() == 2
+
+    is_success = None
+    try:
+        LoadBalancer(policy='least_outstanding', endpoint_count=3)
+        is_success = False
+    except RuntimeError:
+        is_success = True
+
+    assert is_success
@@ -1,7 +1,19 @@
 
 
-from .client import ZmqRpcClient
-from .command import ICommand, ShutdownServer
+from .client import (
+    AsyncZmqRpcClient,
+    PipelinedRpcClient,
+    ThreadSafeRpcClient,
+    ZmqRpcClient,
+)
+from .command import (
+    BatchCommand,
+    GetServerCodecs,
+    ICommand,
+    ShutdownServer,
+    SlotsCommand,
+    StructCommand,
+)
 from .proxy import (
     ZmqBufferedProxyRep2ReqThread,
     ZmqProxy,
@@ -17,15 +29,22 @@ from .proxy import (
 from .receiver import ZmqReceiver, ZmqReceiverThread
 from .sender import ZmqSender
 from .server import ZmqRpcServer, ZmqRpcServerThread
-from .service import IService
+from .service import BatchService, IService
 
 version_info = (3, 2, 2)
 
 __version__ = '.'.join(tuple(str(x) for x in version_info))
 __all__ = (
+    'AsyncZmqRpcClient',
+    'PipelinedRpcClient',
+    'ThreadSafeRpcClient',
     'ZmqRpcClient',
+    'BatchCommand',
+    'GetServerCodecs',
     'ICommand',
     'ShutdownServer',
+    'SlotsCommand',
+    'StructCommand',
     'ZmqBufferedProxyRep2ReqThread',
     'ZmqProxy',
     'ZmqProxyRep2Pub',
@@ -41,5 +60,6 @@ __all__ = (
     'ZmqSender',
     'ZmqRpcServer',
     'ZmqRpcServerThread',
+    'BatchService',
     'IService',
 )
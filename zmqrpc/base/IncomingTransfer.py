@@ -0,0 +1,130 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import mmap
+import tempfile
+import time
+from typing import Optional, Tuple
+
+from .message_io import Message, frame_buffer
+from .transfer import FLAG_LAST, read_transfer_header, unpack_lengths
+
+
+class IncomingTransfer:
+    '''
+    Reassembles the data messages of a transfer into one buffer allocated
+    when the first data message arrives. Messages larger than spill_size
+    bytes are reassembled in a temporary file mapped into memory instead.
+    The frames of the reassembled message are views of that buffer.
+    '''
+
+    def __init__(
+            self,
+            message: Message,
+            max_size: Optional[int] = None,
+            spill_size: Optional[int] = None):
+        _, _, self.__transfer_id, sequence = read_transfer_header(message[0])
+
+        if sequence != 0:
+            raise RuntimeError(
+                'transfer %016x starts with message %d' % (
+                    self.__transfer_id,
+                    sequence,
+                )
+            )
+
+        self.__lengths = unpack_lengths(message[1])
+        size = sum(self.__lengths)
+
+        if max_size is not None and size > max_size:
+            raise RuntimeError(
+                'transferred message exceeds %d bytes' % max_size
+            )
+
+        if spill_size is not None and size > spill_size:
+            with tempfile.TemporaryFile() as f:
+                f.truncate(size)
+                buffer = mmap.mmap(f.fileno(), size)
+        else:
+            buffer = bytearray(size)
+
+        self.__view = memoryview(buffer)
+        self.__offset = 0
+        self.__sequence = 0
+        self.__is_done = False
+        self.__last_used = time.monotonic()
+
+        self.__write(message, 2)
+
+    @property
+    def transfer_id(self) -> int:
+        return self.__transfer_id
+
+    @property
+    def sequence(self) -> int:
+        return self.__sequence
+
+    @property
+    def last_used(self) -> float:
+        return self.__last_used
+
+    @property
+    def is_done(self) -> bool:
+        return self.__is_done
+
+    def add(self, message: Message) -> None:
+        self.__write(message, 1)
+
+    def __write(self, message: Message, first_part: int) -> None:
+        _, flags, transfer_id, sequence = read_transfer_header(message[0])
+
+        if transfer_id != self.__transfer_id or \
+                sequence != self.__sequence or self.__is_done:
+            raise RuntimeError(
+                'unexpected message %d of transfer %016x' % (
+                    sequence,
+                    transfer_id,
+                )
+            )
+
+        for part in message[first_part:]:
+            part = frame_buffer(part).cast('B')
+            end = self.__offset + len(part)
+
+            if end > len(self.__view):
+                raise RuntimeError(
+                    'transfer %016x is larger than announced' % transfer_id
+                )
+
+            self.__view[self.__offset:end] = part
+            self.__offset = end
+
+        self.__sequence += 1
+        self.__last_used = time.monotonic()
+
+        if flags & FLAG_LAST:
+            if self.__offset != len(self.__view):
+                raise RuntimeError(
+                    'transfer %016x ended after %d of %d bytes' % (
+                        transfer_id,
+                        self.__offset,
+                        len(self.__view),
+                    )
+                )
+
+            self.__is_done = True
+
+    def message(self) -> Tuple[memoryview, ...]:
+        frames = []
+        offset = 0
+        for length in self.__lengths:
+            frames.append(self.__view[offset:offset + length])
+            offset += length
+
+        return tuple(frames)
@@ -0,0 +1,89 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import os
+import struct
+import time
+from typing import Tuple
+
+from .message_io import Frame, frame_buffer
+from .transfer import (
+    FLAG_LAST,
+    KIND_DATA,
+    TRANSFER_HEADER,
+    TRANSFER_TAG,
+    slice_frames,
+)
+
+
+class OutgoingTransfer:
+    '''
+    Cuts a binary message into data messages of whole chunks. Each data
+    message carries as many chunks as the credit granted by the receiver
+    allows, and at least one.
+    '''
+
+    def __init__(self, message: Tuple[Frame, ...], chunk_size: int):
+        if chunk_size <= 0:
+            raise RuntimeError('the chunk size has to be positive')
+
+        self.__transfer_id = int.from_bytes(os.urandom(8), 'big')
+        self.__views = tuple(
+            frame_buffer(frame).cast('B') for frame in message
+        )
+        self.__size = sum(len(view) for view in self.__views)
+        self.__chunk_size = chunk_size
+        self.__offset = 0
+        self.__sequence = 0
+        self.__last_used = time.monotonic()
+
+    @property
+    def transfer_id(self) -> int:
+        return self.__transfer_id
+
+    @property
+    def sequence(self) -> int:
+        return self.__sequence
+
+    @property
+    def last_used(self) -> float:
+        return self.__last_used
+
+    @property
+    def is_done(self) -> bool:
+        return self.__offset >= self.__size
+
+    def next_message(self, credit: int) -> Tuple[Frame, ...]:
+        size = max(credit // self.__chunk_size, 1) * self.__chunk_size
+        size = min(size, self.__size - self.__offset)
+
+        parts = slice_frames(self.__views, self.__offset, size)
+        self.__offset += size
+
+        header = TRANSFER_HEADER.pack(
+            TRANSFER_TAG,
+            KIND_DATA,
+            FLAG_LAST if self.is_done else 0,
+            self.__transfer_id,
+            self.__sequence,
+        )
+
+        if self.__sequence == 0:
+            lengths = struct.pack(
+                '!%dQ' % len(self.__views),
+                *(len(view) for view in self.__views),
+            )
+            message = (header, lengths, *parts)
+        else:
+            message = (header, *parts)
+
+        self.__sequence += 1
+        self.__last_used = time.monotonic()
+
+        return message
@@ -1,5 +1,7 @@
 
 
+import struct
+
 from ..logger import logger
 
 
@@ -11,6 +13,9 @@ class ZmqBase:
     STATUS_MSG = 'status_message'
     RESPONSE_MSG = 'response_message'
 
+    # Acknowledges a data message of a transfer that is not complete yet.
+    STATUS_CODE_CONTINUE = 100
+
     STATUS_CODE_OK = 200
     STATUS_MSG_OK = 'OK'
 
@@ -18,10 +23,16 @@ class ZmqBase:
     RPC_PARAMETERS = 'parameters'
 
     STATUS_CODE_BAD_SERIALIZATION = 400
+    STATUS_CODE_MISSING_BLOBS = 428
     STATUS_CODE_BAD_SERVICE = 451
     STATUS_CODE_EXCEPTION_RAISED = 463
     STATUS_CODE_PROXY_ERROR = 482
 
+    # Binary responses start with the status code packed in this frame. It is
+    # followed by the frames of the encoded response on success or by a frame
+    # with the error message otherwise.
+    STATUS_FRAME = struct.Struct('!H')
+
     def _debug(self, *args) -> None:
         logger.debug(*args)
 
@@ -1,3 +1,14 @@
-
-
+from .IncomingTransfer import IncomingTransfer
+from .message_io import (
+    Frame,
+    Message,
+    frame_buffer,
+    frame_bytes,
+    recv_message,
+    send_message,
+    send_routed_message,
+    split_envelope,
+)
+from .OutgoingTransfer import OutgoingTransfer
+from .transfer import MAX_TRANSFER_SIZE, MAX_TRANSFERS, TRANSFER_WINDOW
 from .ZmqBase import ZmqBase
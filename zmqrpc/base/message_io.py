@@ -0,0 +1,79 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Sequence, Tuple, Union
+
+import zmq
+
+Frame = Union[bytes, bytearray, memoryview, zmq.Frame]
+
+# A message on the wire is either a text message that travels as a single
+# frame (heartbeats, plain strings and legacy base64 commands) or a binary
+# message that travels as a multipart message of raw frames.
+Message = Union[str, Sequence[Frame]]
+
+
+def send_message(socket: zmq.Socket, message: Message) -> None:
+    if isinstance(message, str):
+        socket.send_string(message)
+        return
+
+    # Frames are handed to ZMQ without copying them; large buffers such as
+    # arrays go out straight from their own memory.
+    socket.send_multipart(message, copy=False)
+
+
+def to_message(frames: Sequence[zmq.Frame]) -> Message:
+    if len(frames) == 1:
+        return frames[0].bytes.decode('utf-8')
+
+    return tuple(frames)
+
+
+def recv_message(socket: zmq.Socket, flags: int = 0) -> Message:
+    return to_message(socket.recv_multipart(flags, copy=False))
+
+
+def split_envelope(frames: Sequence[zmq.Frame]) \
+        -> Tuple[Tuple[zmq.Frame, ...], Message]:
+    '''
+    Splits the frames received on a ROUTER or DEALER socket into the routing
+    envelope, up to and including the empty delimiter frame, and the
+    message that follows it.
+    '''
+
+    for idx, frame in enumerate(frames):
+        if not len(frame):
+            return tuple(frames[:idx + 1]), to_message(frames[idx + 1:])
+
+    raise RuntimeError('message without an envelope delimiter')
+
+
+def send_routed_message(
+        socket: zmq.Socket,
+        envelope: Sequence[Frame],
+        message: Message) -> None:
+    if isinstance(message, str):
+        message = (message.encode('utf-8'),)
+
+    socket.send_multipart((*envelope, *message), copy=False)
+
+
+def frame_bytes(frame: Frame) -> bytes:
+    if isinstance(frame, zmq.Frame):
+        return frame.bytes
+
+    return bytes(frame)
+
+
+def frame_buffer(frame: Frame) -> memoryview:
+    if isinstance(frame, zmq.Frame):
+        return frame.buffer
+
+    return memoryview(frame)
@@ -0,0 +1,118 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import struct
+from typing import List, Sequence, Tuple
+
+from .message_io import Frame, Message, frame_buffer
+
+# Large binary messages may travel as a transfer: a series of messages of
+# bounded size that the receiving side reassembles. Every message of a
+# transfer starts with a header frame whose first byte is this tag, which
+# no format tag or status frame uses.
+TRANSFER_TAG = 0xFF
+
+# tag, kind, flags, transfer id, sequence number of the message
+TRANSFER_HEADER = struct.Struct('!BBBQI')
+
+# Carries a part of the transferred message. The first one is followed by a
+# frame with the packed 8 byte lengths of the frames of the message.
+KIND_DATA = 0x01
+# Asks the sender of a transfer for its next data message.
+KIND_PULL = 0x02
+
+# The data message completes the transfer.
+FLAG_LAST = 0x01
+
+# The receiver of a transfer grants the sender this many bytes per data
+# message, in a frame following the status of an acknowledgement or the
+# header of a pull.
+CREDIT = struct.Struct('!Q')
+
+# Bytes granted per data message by default.
+TRANSFER_WINDOW = 16 * 1024 * 1024
+
+# Seconds after which an unfinished transfer is dropped.
+TRANSFER_TIMEOUT = 60
+
+# Receivers reject transfers announcing more bytes than this by default,
+# since the buffer is allocated before the data arrives.
+MAX_TRANSFER_SIZE = 256 * 1024 * 1024
+
+# Incoming transfers a receiver keeps open at once by default.
+MAX_TRANSFERS = 4
+
+
+def is_transfer(message: Message) -> bool:
+    if isinstance(message, str):
+        return False
+
+    header = frame_buffer(message[0])
+    return len(header) == TRANSFER_HEADER.size and header[0] == TRANSFER_TAG
+
+
+def read_transfer_header(frame: Frame) -> Tuple[int, int, int, int]:
+    '''
+    Returns the kind, the flags, the transfer id and the sequence number of
+    a transfer message.
+    '''
+
+    _, kind, flags, transfer_id, sequence = TRANSFER_HEADER.unpack(
+        frame_buffer(frame)
+    )
+
+    return kind, flags, transfer_id, sequence
+
+
+def make_pull(transfer_id: int, sequence: int, credit: int) \
+        -> Tuple[bytes, ...]:
+    return (
+        TRANSFER_HEADER.pack(
+            TRANSFER_TAG,
+            KIND_PULL,
+            0,
+            transfer_id,
+            sequence,
+        ),
+        CREDIT.pack(credit),
+    )
+
+
+def message_size(message: Sequence[Frame]) -> int:
+    return sum(frame_buffer(frame).nbytes for frame in message)
+
+
+def slice_frames(
+        views: Sequence[memoryview],
+        offset: int,
+        size: int) -> List[memoryview]:
+    '''
+    Returns the parts of views that cover size bytes from offset of their
+    concatenation, without copying them.
+    '''
+
+    parts = []
+    position = 0
+    for view in views:
+        start = max(offset - position, 0)
+        end = min(offset + size - position, len(view))
+        position += len(view)
+
+        if start < end:
+            parts.append(view[start:end])
+
+        if position >= offset + size:
+            break
+
+    return parts
+
+
+def unpack_lengths(frame: Frame) -> Tuple[int, ...]:
+    lengths = frame_buffer(frame)
+    return struct.unpack('!%dQ' % (len(lengths) // 8), lengths)
@@ -0,0 +1,287 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import asyncio
+import itertools
+import os
+from typing import Dict, Optional, Sequence, Tuple
+from weakref import WeakKeyDictionary
+
+import zmq
+import zmq.asyncio
+
+from ..base import (
+    TRANSFER_WINDOW,
+    Frame,
+    IncomingTransfer,
+    Message,
+    ZmqBase,
+    split_envelope,
+)
+from ..base.transfer import is_transfer, make_pull
+from ..command import (
+    COMPRESSION_THRESHOLD,
+    DEFAULT_CODEC,
+    ICommand,
+    codec_registry,
+    json_zip,
+)
+from ..sender.response_io import read_response
+from .PipelinedRpcClient import CORRELATION_ID, MAX_IN_FLIGHT
+
+
+class _Request:
+
+    __slots__ = ('future', 'transfer')
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.transfer: Optional[IncomingTransfer] = None
+
+
+class AsyncZmqRpcClient(ZmqBase):
+    '''
+    Executes commands on a ZmqRpcServer bound with router from asyncio
+    applications. execute_remote() is a coroutine; concurrent calls share
+    one DEALER socket on zmq.asyncio, tagged with a correlation id like
+    those of PipelinedRpcClient, and up to max_in_flight are in flight.
+    A task of the client receives the replies while calls are pending.
+    Cancelling a call drops its reply. Responses sent as a transfer are
+    pulled with a credit of transfer_window bytes, requests are never sent
+    as a transfer. Responses whose body decompresses to more than
+    max_body_size bytes are rejected.
+    '''
+
+    def __init__(
+            self,
+            zmq_dealer_endpoint: str,
+            username: Optional[str] = None,
+            password: Optional[str] = None,
+            compression_threshold: int = COMPRESSION_THRESHOLD,
+            codec: str = DEFAULT_CODEC,
+            max_in_flight: int = MAX_IN_FLIGHT,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            max_body_size: Optional[int] = None):
+        if max_in_flight <= 0:
+            raise RuntimeError('max_in_flight has to be positive')
+
+        self.__zmq_dealer_endpoint = zmq_dealer_endpoint
+        self.__compression_threshold = compression_threshold
+        self.__codec = codec_registry.get_codec(codec).name
+        self.__max_in_flight = max_in_flight
+        self.__transfer_window = transfer_window
+        self.__transfer_spill_size = transfer_spill_size
+        self.__max_body_size = max_body_size
+
+        self.__requests: Dict[int, _Request] = {}
+        self.__correlation_ids = itertools.count(
+            int.from_bytes(os.urandom(4), 'big')
+        )
+        # Semaphores bind to the event loop they are created on before
+        # Python 3.10, so every loop calling the client gets its own.
+        self.__slots: 'WeakKeyDictionary[asyncio.AbstractEventLoop, ' \
+            'asyncio.Semaphore]' = WeakKeyDictionary()
+        self.__receiver: Optional[asyncio.Future] = None
+        self.__receiver_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.__context = zmq.asyncio.Context()
+        self.__socket = socket = self.__context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.LINGER, 0)
+
+        if username is not None and password is not None:
+            socket.plain_username = username
+            socket.plain_password = password
+
+        self._debug('Connect DEALER socket to "%s"', zmq_dealer_endpoint)
+
+        try:
+            socket.connect(zmq_dealer_endpoint)
+        except Exception as e:
+            raise Exception(
+                'Cannot connect DEALER socket to {0}.'.format(
+                    zmq_dealer_endpoint,
+                )
+            ) from e
+
+    @property
+    def codec(self) -> str:
+        return self.__codec
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.__requests)
+
+    async def execute_remote(
+            self,
+            command: ICommand,
+            time_out_in_sec: Optional[float] = 600) -> object:
+        '''
+        Executes a command and returns the response of the server. Raises
+        TimeoutError when no response arrives in time_out_in_sec, which
+        covers the wait for a free slot when max_in_flight calls are
+        pending.
+        '''
+
+        try:
+            message = json_zip(
+                command,
+                compression_threshold=self.__compression_threshold,
+                codec=self.__codec,
+            )
+        except Exception as e:
+            raise RuntimeError(
+                'Cannot wrap parameters in json format.'
+            ) from e
+
+        loop = asyncio.get_event_loop()
+
+        slots = self.__slots.get(loop)
+        if slots is None:
+            slots = self.__slots[loop] = asyncio.Semaphore(
+                self.__max_in_flight,
+            )
+
+        try:
+            return await asyncio.wait_for(
+                self._execute(message, slots),
+                time_out_in_sec,
+            )
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(
+                'No response received on ZMQ Request to end point '
+                '{0} in time.'.format(self.__zmq_dealer_endpoint)
+            ) from e
+
+    def destroy(self) -> None:
+        if self.__receiver is not None:
+            self.__receiver.cancel()
+            self.__receiver = None
+
+        for request in self.__requests.values():
+            request.future.cancel()
+        self.__requests.clear()
+
+        self.__socket.close()
+
+    async def _execute(
+            self,
+            message: Tuple[Frame, ...],
+            slots: asyncio.Semaphore) -> object:
+        async with slots:
+            loop = asyncio.get_event_loop()
+            request = _Request(loop.create_future())
+
+            try:
+                await self._send(message, request)
+
+                if self.__receiver is None or self.__receiver.done() or \
+                        self.__receiver_loop is not loop:
+                    self.__receiver = asyncio.ensure_future(self._receive())
+                    self.__receiver_loop = loop
+
+                return await request.future
+            finally:
+                # The request is pending under the correlation id of its
+                # latest message, which differs while pulling a transfer.
+                for correlation_id, pending in tuple(self.__requests.items()):
+                    if pending is request:
+                        del self.__requests[correlation_id]
+
+                if not self.__requests and self.__receiver is not None:
+                    self.__receiver.cancel()
+                    self.__receiver = None
+
+    async def _send(
+            self,
+            message: Tuple[Frame, ...],
+            request: _Request) -> None:
+        correlation_id = next(self.__correlation_ids) & 0xFFFFFFFF
+
+        self.__requests[correlation_id] = request
+
+        await self.__socket.send_multipart(
+            (CORRELATION_ID.pack(correlation_id), b'', *message),
+            copy=False,
+        )
+
+    async def _receive(self) -> None:
+        # Runs while calls are pending.
+        try:
+            while True:
+                frames = await self.__socket.recv_multipart(copy=False)
+                await self._handle_reply(frames)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._error('Receiving replies failed: %s', e)
+
+            for request in self.__requests.values():
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+    async def _handle_reply(self, frames: Sequence[zmq.Frame]) -> None:
+        try:
+            envelope, message = split_envelope(frames)
+            correlation_id, = CORRELATION_ID.unpack(envelope[0].buffer)
+        except Exception as e:
+            self._warning('Dropped a reply without correlation id: %s', e)
+            return
+
+        # Replies of cancelled calls are dropped.
+        request = self.__requests.pop(correlation_id, None)
+        if request is None or request.future.done():
+            return
+
+        if is_transfer(message):
+            try:
+                message = await self._pull_transfer(request, message)
+            except Exception as e:
+                request.future.set_exception(RuntimeError(
+                    'Transfer of the response failed. Exception: {0}'.format(
+                        e,
+                    )
+                ))
+                return
+
+            if message is None:
+                return
+
+        is_success, response = read_response(message, self.__max_body_size)
+        if is_success:
+            request.future.set_result(response)
+        else:
+            request.future.set_exception(response)
+
+    async def _pull_transfer(
+            self,
+            request: _Request,
+            message: Message) -> Optional[Message]:
+        if request.transfer is None:
+            request.transfer = IncomingTransfer(
+                message,
+                spill_size=self.__transfer_spill_size,
+            )
+        else:
+            request.transfer.add(message)
+
+        transfer = request.transfer
+        if transfer.is_done:
+            return transfer.message()
+
+        await self._send(
+            make_pull(
+                transfer.transfer_id,
+                transfer.sequence,
+                self.__transfer_window,
+            ),
+            request,
+        )
+
+        return None
@@ -0,0 +1,120 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import marshal
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+from ..base import Frame
+from ..command import ICommand
+from ..command.buffers import is_buffer
+
+
+class MessageCache:
+    '''
+    Keeps the encoded messages of the most recently sent commands, evicting
+    the least recently used one when full.
+    Immutable commands are keyed by the command object itself, so their
+    state is never looked at again. Other commands are keyed by their class
+    and a fingerprint of their state; commands whose state holds objects
+    marshal cannot dump (nested commands...) are not cached, and neither are
+    those holding buffers other than bytes, whose format and shape marshal
+    drops.
+    '''
+
+    def __init__(self, max_size: int):
+        if max_size <= 0:
+            raise RuntimeError('the cache size has to be positive')
+
+        self.__max_size = max_size
+        self.__messages: 'OrderedDict[Hashable, Tuple[Frame, ...]]' = \
+            OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __len__(self) -> int:
+        return len(self.__messages)
+
+    def clear(self) -> None:
+        self.__messages.clear()
+
+    @staticmethod
+    def _get_key(command: ICommand) -> Optional[Hashable]:
+        try:
+            if command.immutable:
+                hash(command)
+                return command
+
+            state = command.get_command_state()
+            if _has_buffer(state):
+                return None
+
+            return type(command), marshal.dumps(state)
+        except (TypeError, ValueError):
+            return None
+
+    def get_message(
+            self,
+            command: ICommand,
+            encode: Callable[[ICommand], Tuple[Frame, ...]]) \
+            -> Tuple[Frame, ...]:
+        '''
+        Returns the cached message of command, calling encode on a miss.
+        '''
+
+        key = self._get_key(command)
+
+        if key is None:
+            return encode(command)
+
+        message = self.__messages.get(key)
+
+        if message is not None:
+            self.__hits += 1
+            self.__messages.move_to_end(key)
+            return message
+
+        self.__misses += 1
+
+        message = encode(command)
+
+        self.__messages[key] = message
+        if len(self.__messages) > self.__max_size:
+            self.__messages.popitem(last=False)
+
+        return message
+
+
+def _has_buffer(obj: object) -> bool:
+    # Bytes are dumped as they are; other buffers would lose their type.
+    if isinstance(obj, bytes):
+        return False
+
+    if is_buffer(obj):
+        return True
+
+    if isinstance(obj, dict):
+        return any(_has_buffer(value) for value in obj.values())
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return any(_has_buffer(item) for item in obj)
+
+    return False
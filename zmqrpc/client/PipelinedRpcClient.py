@@ -0,0 +1,350 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import itertools
+import os
+import struct
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional, Sequence, Tuple
+
+import zmq
+
+from ..base import (
+    TRANSFER_WINDOW,
+    IncomingTransfer,
+    Message,
+    ZmqBase,
+    send_routed_message,
+    split_envelope,
+)
+from ..base.transfer import is_transfer, make_pull
+from ..command import (
+    COMPRESSION_THRESHOLD,
+    DEFAULT_CODEC,
+    ICommand,
+    codec_registry,
+    json_zip,
+)
+from ..sender.response_io import read_response
+
+# Requests carry a correlation id in their envelope, like those of REQ
+# sockets with ZMQ_REQ_CORRELATE, and servers send it back with the reply.
+CORRELATION_ID = struct.Struct('!I')
+
+# Requests sent without waiting for their replies by default.
+MAX_IN_FLIGHT = 64
+
+
+class PipelinedFuture(Future):
+    '''
+    The future of a request sent by a PipelinedRpcClient. Replies are only
+    received while the client is used, so waiting on the future receives
+    them.
+    '''
+
+    def __init__(self, client: 'PipelinedRpcClient'):
+        super().__init__()
+        self.__client = client
+
+    def result(self, timeout: Optional[float] = None) -> object:
+        self.__client.wait(self, timeout)
+        return super().result(timeout=0)
+
+    def exception(self, timeout: Optional[float] = None) \
+            -> Optional[BaseException]:
+        self.__client.wait(self, timeout)
+        return super().exception(timeout=0)
+
+
+class _Request:
+
+    __slots__ = ('future', 'expire_time', 'transfer')
+
+    def __init__(self, future: Future, expire_time: float):
+        self.future = future
+        self.expire_time = expire_time
+        self.transfer: Optional[IncomingTransfer] = None
+
+
+class PipelinedRpcClient(ZmqBase):
+    '''
+    Executes commands on a ZmqRpcServer bound with router over a DEALER
+    socket, without waiting for a reply before sending the next request.
+    Up to max_in_flight requests are in flight; each one is tagged with a
+    correlation id so that replies are matched with their request in any
+    order.
+    submit() returns a future of the result of the command; the replies are
+    received whenever the client is used, e.g. while waiting on a future.
+    The client, and therefore its futures, must be used from one thread.
+    Responses sent as a transfer are pulled with a credit of transfer_window
+    bytes, requests are never sent as a transfer. Responses whose body
+    decompresses to more than max_body_size bytes are rejected.
+    '''
+
+    def __init__(
+            self,
+            zmq_dealer_endpoint: str,
+            username: Optional[str] = None,
+            password: Optional[str] = None,
+            compression_threshold: int = COMPRESSION_THRESHOLD,
+            codec: str = DEFAULT_CODEC,
+            max_in_flight: int = MAX_IN_FLIGHT,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            context: Optional[zmq.Context] = None,
+            max_body_size: Optional[int] = None):
+        if max_in_flight <= 0:
+            raise RuntimeError('max_in_flight has to be positive')
+
+        self.__zmq_dealer_endpoint = zmq_dealer_endpoint
+        self.__compression_threshold = compression_threshold
+        self.__codec = codec_registry.get_codec(codec).name
+        self.__max_in_flight = max_in_flight
+        self.__transfer_window = transfer_window
+        self.__transfer_spill_size = transfer_spill_size
+        self.__max_body_size = max_body_size
+
+        self.__requests: Dict[int, _Request] = {}
+        self.__correlation_ids = itertools.count(
+            int.from_bytes(os.urandom(4), 'big')
+        )
+
+        self.__context = context or zmq.Context()
+        self.__socket = socket = self.__context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.LINGER, 0)
+
+        if username is not None and password is not None:
+            socket.plain_username = username
+            socket.plain_password = password
+
+        self._debug('Connect DEALER socket to "%s"', zmq_dealer_endpoint)
+
+        try:
+            socket.connect(zmq_dealer_endpoint)
+        except Exception as e:
+            raise Exception(
+                'Cannot connect DEALER socket to {0}.'.format(
+                    zmq_dealer_endpoint,
+                )
+            ) from e
+
+    @property
+    def codec(self) -> str:
+        return self.__codec
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.__requests)
+
+    @property
+    def socket(self) -> zmq.Socket:
+        '''
+        The DEALER socket, to poll it together with other sockets. Only the
+        thread that uses the client may poll it.
+        '''
+
+        return self.__socket
+
+    @property
+    def time_left(self) -> Optional[float]:
+        '''
+        Seconds until the first request in flight expires, None without
+        requests in flight.
+        '''
+
+        if not self.__requests:
+            return None
+
+        return min(
+            request.expire_time
+            for request in self.__requests.values()
+        ) - time.monotonic()
+
+    def submit(
+            self,
+            command: ICommand,
+            time_out_in_sec: float = 600) -> PipelinedFuture:
+        '''
+        Sends a command and returns the future of its result. Waits for a
+        reply first when max_in_flight requests are in flight. The future
+        fails with TimeoutError when no reply arrives in time_out_in_sec.
+        '''
+
+        try:
+            message = json_zip(
+                command,
+                compression_threshold=self.__compression_threshold,
+                codec=self.__codec,
+            )
+        except Exception as e:
+            raise RuntimeError(
+                'Cannot wrap parameters in json format.'
+            ) from e
+
+        return self.submit_message(message, time_out_in_sec)
+
+    def submit_message(
+            self,
+            message: Message,
+            time_out_in_sec: float = 600) -> PipelinedFuture:
+        '''
+        Sends a command encoded with json_zip, like submit().
+        '''
+
+        while len(self.__requests) >= self.__max_in_flight:
+            self.process(self.time_left)
+
+        future = PipelinedFuture(self)
+        self._send(
+            message,
+            _Request(future, time.monotonic() + time_out_in_sec),
+        )
+
+        return future
+
+    def execute_remote(
+            self,
+            command: ICommand,
+            time_out_in_sec: float = 600) -> object:
+        '''
+        Executes a command and returns the response of the server, unlike
+        ZmqRpcClient not wrapped in a tuple of responses per endpoint.
+        '''
+
+        return self.submit(command, time_out_in_sec).result()
+
+    def wait(self, future: Future, timeout: Optional[float] = None) -> None:
+        '''
+        Receives replies until the future is done or timeout seconds passed.
+        '''
+
+        expire_time = None if timeout is None else \
+            time.monotonic() + timeout
+
+        while not future.done() and self.__requests:
+            time_left = self.time_left
+            if expire_time is not None:
+                time_left = min(time_left, expire_time - time.monotonic())
+                if time_left <= 0:
+                    return
+
+            self.process(time_left)
+
+    def process(self, timeout: float = 0) -> None:
+        '''
+        Receives the replies that arrive within timeout seconds and fails
+        the requests that expired.
+        '''
+
+        if self.__socket.poll(max(timeout, 0) * 1000, zmq.POLLIN):
+            while True:
+                try:
+                    frames = self.__socket.recv_multipart(
+                        zmq.NOBLOCK,
+                        copy=False,
+                    )
+                except zmq.Again:
+                    break
+
+                self._handle_reply(frames)
+
+        now = time.monotonic()
+        for correlation_id, request in tuple(self.__requests.items()):
+            if request.future.cancelled():
+                del self.__requests[correlation_id]
+            elif request.expire_time <= now:
+                del self.__requests[correlation_id]
+                request.future.set_exception(TimeoutError(
+                    'No response received on ZMQ Request to end point '
+                    '{0} in time.'.format(self.__zmq_dealer_endpoint)
+                ))
+
+    def destroy(self) -> None:
+        for request in self.__requests.values():
+            request.future.cancel()
+        self.__requests.clear()
+
+        self.__socket.close()
+
+    def _send(self, message: Message, request: _Request) -> None:
+        correlation_id = next(self.__correlation_ids) & 0xFFFFFFFF
+
+        send_routed_message(
+            self.__socket,
+            (CORRELATION_ID.pack(correlation_id), b''),
+            message,
+        )
+
+        self.__requests[correlation_id] = request
+
+    def _handle_reply(self, frames: Sequence[zmq.Frame]) -> None:
+        try:
+            envelope, message = split_envelope(frames)
+            correlation_id, = CORRELATION_ID.unpack(envelope[0].buffer)
+        except Exception as e:
+            self._warning('Dropped a reply without correlation id: %s', e)
+            return
+
+        # Replies of expired or cancelled requests are dropped.
+        request = self.__requests.pop(correlation_id, None)
+        if request is None or request.future.done():
+            return
+
+        if is_transfer(message) or request.transfer is not None:
+            try:
+                message = self._pull_transfer(request, message)
+            except Exception as e:
+                request.future.set_exception(RuntimeError(
+                    'Transfer of the response failed. Exception: {0}'.format(
+                        e,
+                    )
+                ))
+                return
+
+            if message is None:
+                return
+
+        is_success, response = read_response(message, self.__max_body_size)
+        if is_success:
+            request.future.set_result(response)
+        else:
+            request.future.set_exception(response)
+
+    def _pull_transfer(
+            self,
+            request: _Request,
+            message: Message) -> Optional[Tuple[object, ...]]:
+        # A response sent as a transfer carries its first data message; the
+        # others are pulled one by one, each with its own correlation id.
+        if not is_transfer(message):
+            return message
+
+        if request.transfer is None:
+            request.transfer = IncomingTransfer(
+                message,
+                spill_size=self.__transfer_spill_size,
+            )
+        else:
+            request.transfer.add(message)
+
+        transfer = request.transfer
+        if transfer.is_done:
+            return transfer.message()
+
+        self._send(
+            make_pull(
+                transfer.transfer_id,
+                transfer.sequence,
+                self.__transfer_window,
+            ),
+            request,
+        )
+
+        return None
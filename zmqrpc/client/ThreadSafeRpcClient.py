@@ -0,0 +1,243 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from typing import Deque, Optional, Tuple
+
+import zmq
+
+from ..base import TRANSFER_WINDOW, Message, ZmqBase
+from ..command import (
+    COMPRESSION_THRESHOLD,
+    DEFAULT_CODEC,
+    ICommand,
+    codec_registry,
+    json_zip,
+)
+from .PipelinedRpcClient import MAX_IN_FLIGHT, PipelinedRpcClient
+
+# Sent over inproc to wake the I/O thread up.
+WAKE_UP = b''
+
+
+class ThreadSafeRpcClient(ZmqBase):
+    '''
+    Executes commands on a ZmqRpcServer bound with router from any number of
+    threads. A single I/O thread owns the DEALER socket and keeps requests
+    in flight like a PipelinedRpcClient. Callers encode their command in
+    their own thread, queue it and wake the I/O thread up over one inproc
+    socket shared under a lock, then block on the future of the result.
+    The client holds the same sockets however many threads call in.
+    Responses whose body decompresses to more than max_body_size bytes are
+    rejected.
+    '''
+
+    def __init__(
+            self,
+            zmq_dealer_endpoint: str,
+            username: Optional[str] = None,
+            password: Optional[str] = None,
+            compression_threshold: int = COMPRESSION_THRESHOLD,
+            codec: str = DEFAULT_CODEC,
+            max_in_flight: int = MAX_IN_FLIGHT,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            max_body_size: Optional[int] = None):
+        self.__compression_threshold = compression_threshold
+        self.__codec = codec_registry.get_codec(codec).name
+
+        # Guards the queue, the flag and the waking socket, which callers
+        # share.
+        self.__lock = threading.Lock()
+        self.__queue: Deque[Tuple[Future, float, Message]] = deque()
+        self.__is_destroyed = False
+
+        self.__context = zmq.Context()
+        address = 'inproc://zmqrpc-client-{0}'.format(id(self))
+
+        # Moves to the I/O thread once it starts, like the DEALER socket.
+        self.__wake_up_socket = self.__context.socket(zmq.PAIR)
+        self.__wake_up_socket.setsockopt(zmq.LINGER, 0)
+        self.__wake_up_socket.bind(address)
+
+        self.__waker_socket = self.__context.socket(zmq.PAIR)
+        self.__waker_socket.setsockopt(zmq.LINGER, 0)
+        self.__waker_socket.connect(address)
+
+        self.__client = PipelinedRpcClient(
+            zmq_dealer_endpoint=zmq_dealer_endpoint,
+            username=username,
+            password=password,
+            compression_threshold=compression_threshold,
+            codec=self.__codec,
+            max_in_flight=max_in_flight,
+            transfer_window=transfer_window,
+            transfer_spill_size=transfer_spill_size,
+            context=self.__context,
+            max_body_size=max_body_size,
+        )
+
+        self.__thread = threading.Thread(target=self._run, daemon=True)
+        self.__thread.start()
+
+    @property
+    def codec(self) -> str:
+        return self.__codec
+
+    def submit(
+            self,
+            command: ICommand,
+            time_out_in_sec: float = 600) -> Future:
+        '''
+        Hands a command to the I/O thread and returns the future of its
+        result. The future fails with TimeoutError when no reply arrives in
+        time_out_in_sec. A future cancelled before the I/O thread sent its
+        command is never sent.
+        '''
+
+        try:
+            message = json_zip(
+                command,
+                compression_threshold=self.__compression_threshold,
+                codec=self.__codec,
+            )
+        except Exception as e:
+            raise RuntimeError(
+                'Cannot wrap parameters in json format.'
+            ) from e
+
+        future = Future()
+
+        with self.__lock:
+            if self.__is_destroyed or not self.__thread.is_alive():
+                raise RuntimeError(
+                    'the client is destroyed or its I/O thread stopped'
+                )
+
+            self.__queue.append(
+                (future, time.monotonic() + time_out_in_sec, message)
+            )
+
+            # The I/O thread empties the queue whenever it wakes up.
+            if len(self.__queue) == 1:
+                self._wake_up()
+
+        return future
+
+    def execute_remote(
+            self,
+            command: ICommand,
+            time_out_in_sec: float = 600) -> object:
+        '''
+        Executes a command and returns the response of the server, unlike
+        ZmqRpcClient not wrapped in a tuple of responses per endpoint.
+        '''
+
+        return self.submit(command, time_out_in_sec).result()
+
+    def destroy(self) -> None:
+        with self.__lock:
+            if self.__is_destroyed:
+                return
+
+            self.__is_destroyed = True
+            self._wake_up()
+
+        self.__thread.join()
+
+        with self.__lock:
+            self.__waker_socket.close()
+
+        self.__context.term()
+
+    def _wake_up(self) -> None:
+        # Callers hold the lock. A ZMQ socket may be used by several threads
+        # in turns, as long as a lock orders their use of it.
+        try:
+            self.__waker_socket.send(WAKE_UP, zmq.NOBLOCK)
+        except zmq.Again:
+            # The I/O thread has a wake up pending already, or it stopped.
+            pass
+
+    def _run(self) -> None:
+        poller = zmq.Poller()
+        poller.register(self.__wake_up_socket, zmq.POLLIN)
+        poller.register(self.__client.socket, zmq.POLLIN)
+
+        try:
+            while self._submit_queued():
+                time_left = self.__client.time_left
+                poller.poll(
+                    None if time_left is None else max(time_left, 0) * 1000
+                )
+                self.__client.process()
+        except Exception as e:
+            self._exception('The I/O thread failed: %s', e)
+        finally:
+            self._shutdown()
+
+    def _submit_queued(self) -> bool:
+        # Returns False once destroy() asks to stop.
+        while True:
+            try:
+                self.__wake_up_socket.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+
+        with self.__lock:
+            if self.__is_destroyed:
+                return False
+
+            queue = self.__queue
+            self.__queue = deque()
+
+        for future, expire_time, message in queue:
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                client_future = self.__client.submit_message(
+                    message,
+                    expire_time - time.monotonic(),
+                )
+            except Exception as e:
+                future.set_exception(e)
+                continue
+
+            client_future.add_done_callback(
+                partial(_copy_result, future=future)
+            )
+
+        return True
+
+    def _shutdown(self) -> None:
+        self.__client.destroy()
+        self.__wake_up_socket.close()
+
+        with self.__lock:
+            queue = self.__queue
+            self.__queue = deque()
+
+        for future, _, _ in queue:
+            future.cancel()
+
+
+def _copy_result(client_future: Future, future: Future) -> None:
+    if client_future.cancelled():
+        future.set_exception(
+            RuntimeError('the client is destroyed or its I/O thread stopped')
+        )
+    elif client_future.exception(timeout=0) is not None:
+        future.set_exception(client_future.exception(timeout=0))
+    else:
+        future.set_result(client_future.result(timeout=0))
@@ -11,10 +11,25 @@ Edited on Oct 2020
 '''
 
 
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Sequence, Set, Tuple
 
-from ..command import ICommand, json_zip
+from ..base import TRANSFER_WINDOW, Frame
+from ..command import (
+    BLOB_CACHE_SIZE,
+    COMPRESSION_THRESHOLD,
+    DEFAULT_CODEC,
+    BlobStore,
+    GetMissingBlobs,
+    GetServerCodecs,
+    ICommand,
+    SharedMemoryWriter,
+    StoreBlobs,
+    codec_registry,
+    json_zip,
+    read_blob_digests,
+)
 from ..sender import ZmqSender
+from .MessageCache import MessageCache
 
 
 class ZmqRpcClient(ZmqSender):
@@ -24,12 +39,197 @@ class ZmqRpcClient(ZmqSender):
     implemented by providing a concrete instance of the ICommand type.
     The constructor of the class requires the ZMQ endpoints to be provided
     as well as (optionally) a username/password to 'secure' the connection.
+    Encoded commands smaller than compression_threshold bytes are sent
+    uncompressed.
+    Commands are encoded with the given codec, which has to be accepted by
+    all servers. Use negotiate_codec() to agree on the best codec instead.
+    A positive message_cache_size keeps that many encoded commands, so that
+    commands sent over and over again are encoded only once.
+    A positive blob_threshold sends buffers of at least that many bytes as
+    blobs: the command carries their digest and a blob travels to a server
+    only if the server does not have it yet. The client keeps up to
+    blob_cache_size bytes of blobs; a blob_directory shares them with servers
+    on the same host. Blobs need REQ endpoints, subscribers cannot ask for
+    them.
+    A positive shared_memory_threshold passes buffers of at least that many
+    bytes to servers on the same host in shared memory segments, which are
+    released once the servers responded. Those commands are not cached, and
+    have to wait for all servers to respond.
+    load_balancing sends each command to one of the REQ endpoints, picked
+    by the given policy, so identical servers share the work. Blobs need
+    every server to see every command and cannot be load balanced.
+    Responses whose body decompresses to more than max_body_size bytes are
+    rejected.
     '''
 
+    def __init__(
+            self,
+            zmq_req_endpoints: Tuple[str, ...] = None,
+            zmq_pub_endpoint: Optional[str] = None,
+            username: Optional[str] = None,
+            password: Optional[str] = None,
+            compression_threshold: int = COMPRESSION_THRESHOLD,
+            codec: str = DEFAULT_CODEC,
+            message_cache_size: int = 0,
+            pub_stream_compressor: Optional[str] = None,
+            pub_stream_reset_interval: int = 100,
+            blob_threshold: int = 0,
+            blob_cache_size: int = BLOB_CACHE_SIZE,
+            blob_directory: Optional[str] = None,
+            shared_memory_threshold: int = 0,
+            transfer_chunk_size: int = 0,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            load_balancing: Optional[str] = None,
+            max_body_size: Optional[int] = None):
+        if blob_threshold > 0 and zmq_pub_endpoint is not None:
+            raise RuntimeError('blobs cannot be sent over a PUB socket')
+
+        if blob_threshold > 0 and load_balancing:
+            raise RuntimeError('blobs cannot be sent load balanced')
+
+        if shared_memory_threshold > 0 and zmq_pub_endpoint is not None:
+            raise RuntimeError(
+                'shared memory cannot be passed over a PUB socket'
+            )
+
+        super().__init__(
+            zmq_req_endpoints=zmq_req_endpoints,
+            zmq_pub_endpoint=zmq_pub_endpoint,
+            username=username,
+            password=password,
+            pub_stream_compressor=pub_stream_compressor,
+            pub_stream_reset_interval=pub_stream_reset_interval,
+            transfer_chunk_size=transfer_chunk_size,
+            transfer_window=transfer_window,
+            transfer_spill_size=transfer_spill_size,
+            load_balancing=load_balancing,
+            max_body_size=max_body_size,
+        )
+
+        self.__compression_threshold = compression_threshold
+        self.__codec = codec_registry.get_codec(codec).name
+        self.__message_cache = MessageCache(max_size=message_cache_size) \
+            if message_cache_size > 0 else None
+
+        self.__blob_threshold = blob_threshold
+        self.__blob_store = BlobStore(
+            max_size=blob_cache_size,
+            directory=blob_directory,
+        ) if blob_threshold > 0 else None
+        # Digests of the blobs all servers are known to have.
+        self.__sent_blobs: Set[bytes] = set()
+
+        self.__shared_memory_threshold = shared_memory_threshold
+        self.__shared_memory = SharedMemoryWriter() \
+            if shared_memory_threshold > 0 else None
+
+    @property
+    def codec(self) -> str:
+        return self.__codec
+
+    @property
+    def message_cache(self) -> Optional[MessageCache]:
+        return self.__message_cache
+
+    @property
+    def blob_store(self) -> Optional[BlobStore]:
+        return self.__blob_store
+
+    def negotiate_codec(
+            self,
+            preferred_codecs: Optional[Tuple[str, ...]] = None,
+            time_out_in_sec: Optional[float] = 60) -> str:
+        '''
+        Asks every REQ endpoint which codecs it accepts and switches to the
+        first of preferred_codecs that all of them accept. The codecs of safe
+        serializers, fastest first, are preferred by default.
+        Returns the name of the selected codec.
+        '''
+
+        message = json_zip(GetServerCodecs())
+
+        responses = self.send(
+            message=message,
+            time_out_in_sec=time_out_in_sec,
+        )
+
+        if not responses:
+            raise RuntimeError('Codec negotiation needs REQ endpoints.')
+
+        for codec in preferred_codecs or codec_registry.safe_codec_names:
+            if all(codec in response for response in responses):
+                self.__codec = codec_registry.get_codec(codec).name
+                break
+        else:
+            self.__codec = DEFAULT_CODEC
+
+        self._debug('negotiated codec: "%s"', self.__codec)
+
+        # Cached messages were encoded with the previous codec.
+        if self.__message_cache is not None:
+            self.__message_cache.clear()
+
+        return self.__codec
+
+    def _encode(self, command: ICommand) -> Tuple[Frame, ...]:
+        return json_zip(
+            command,
+            compression_threshold=self.__compression_threshold,
+            codec=self.__codec,
+            blob_store=self.__blob_store,
+            blob_threshold=self.__blob_threshold,
+            shared_memory=self.__shared_memory,
+            shared_memory_threshold=self.__shared_memory_threshold,
+        )
+
+    def _send_blobs(
+            self,
+            digests: Sequence[bytes],
+            time_out_in_sec: Optional[float]) -> None:
+        # Ask the servers which blobs they miss and send only those.
+        responses = self.send(
+            message=json_zip(GetMissingBlobs(
+                digests=[digest.hex() for digest in digests],
+            )),
+            time_out_in_sec=time_out_in_sec,
+        )
+
+        missing = sorted({
+            digest
+            for response in responses
+            for digest in response
+        })
+
+        if missing:
+            blobs = []
+            for digest in missing:
+                blob = self.__blob_store.get(bytes.fromhex(digest))
+                if blob is None:
+                    raise RuntimeError(
+                        'blob %s is no longer in the blob store' % digest
+                    )
+                blobs.append(blob)
+
+            self._debug('sending %d blobs', len(blobs))
+
+            self.send(
+                message=json_zip(StoreBlobs(blobs=blobs)),
+                time_out_in_sec=time_out_in_sec,
+            )
+
+        self.__sent_blobs = {
+            digest
+            for digest in self.__sent_blobs
+            if digest in self.__blob_store
+        }
+        self.__sent_blobs.update(digests)
+
     def execute_remote(
             self,
             command: ICommand,
-            time_out_in_sec: Optional[int] = 600) \
+            time_out_in_sec: Optional[float] = 600,
+            min_responses: Optional[int] = None) \
             -> Optional[Tuple[object, ...]]:
         '''
         Execute a command on a remote ZeroMQ process and returns the result
@@ -38,25 +238,108 @@ class ZmqRpcClient(ZmqSender):
         the server. If none is received in the given time
         the system does not try again and will discard the message, never
         knowing if it was received by the server or not.
+        With several REQ endpoints, min_responses returns as soon as that
+        many servers responded, e.g. 1 for the first response of replicated
+        servers. The results of the other servers are None.
         '''
 
         command_class_name = type(command).__name__
 
         self._debug('sending command: "%s', command_class_name)
 
+        if min_responses is not None:
+            self._check_partial_responses()
+
+        try:
+            message, digests = self._prepare_message(command, time_out_in_sec)
+
+            try:
+                ret = self.send(
+                    message=message,
+                    time_out_in_sec=time_out_in_sec,
+                    min_responses=min_responses,
+                )
+            except Exception:
+                # A server may have evicted the blobs; check them again next
+                # time.
+                self.__sent_blobs.difference_update(digests)
+                raise
+        finally:
+            # Servers have mapped the segments of the command by now.
+            if self.__shared_memory is not None:
+                self.__shared_memory.release()
+
+        self._debug('execution result received')
+
+        return ret
+
+    def execute_remote_as_completed(
+            self,
+            command: ICommand,
+            time_out_in_sec: Optional[float] = 600) \
+            -> Iterator[Tuple[int, object]]:
+        '''
+        Executes a command like execute_remote() and yields the index of each
+        REQ endpoint with its result as soon as the server responded. Errors
+        are raised once all servers responded; stopping the iteration early
+        simply drops the results still to come.
+        '''
+
+        self._debug('sending command: "%s', type(command).__name__)
+
+        self._check_partial_responses()
+
+        message, digests = self._prepare_message(command, time_out_in_sec)
+
+        try:
+            yield from self.send_as_completed(
+                message=message,
+                time_out_in_sec=time_out_in_sec,
+            )
+        except Exception:
+            self.__sent_blobs.difference_update(digests)
+            raise
+
+    def _check_partial_responses(self) -> None:
+        # Segments are released on return, before slow servers mapped them.
+        if self.__shared_memory is not None:
+            raise RuntimeError(
+                'commands passed in shared memory need the responses of all '
+                'servers'
+            )
+
+    def _prepare_message(
+            self,
+            command: ICommand,
+            time_out_in_sec: Optional[float]) \
+            -> Tuple[Tuple[Frame, ...], Tuple[bytes, ...]]:
+        # Encodes the command and makes sure the servers have its blobs.
+        # Returns the message and the digests of its blobs.
         # Try to serialize. If it fails, throw an error and exit.
         try:
-            message = json_zip(command)
+            # Cached messages would refer to released segments.
+            if self.__message_cache is None or \
+                    self.__shared_memory is not None:
+                message = self._encode(command)
+            else:
+                message = self.__message_cache.get_message(
+                    command,
+                    self._encode,
+                )
         except Exception as e:
             raise RuntimeError(
                 'Cannot wrap parameters in json format.'
             ) from e
 
-        ret = self.send(
-            message=message,
-            time_out_in_sec=time_out_in_sec,
-        )
+        digests = read_blob_digests(message) \
+            if self.__blob_store is not None else ()
 
-        self._debug('execution result received')
+        unsent_digests = [
+            digest
+            for digest in digests
+            if digest not in self.__sent_blobs
+        ]
+        if unsent_digests:
+            self._send_blobs(unsent_digests, time_out_in_sec)
 
-        return ret
+        return message, digests
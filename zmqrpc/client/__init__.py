@@ -1,3 +1,7 @@
 
 
+from .AsyncZmqRpcClient import AsyncZmqRpcClient
+from .MessageCache import MessageCache
+from .PipelinedRpcClient import PipelinedRpcClient
+from .ThreadSafeRpcClient import ThreadSafeRpcClient
 from .ZmqRpcClient import ZmqRpcClient
@@ -0,0 +1,156 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import array
+from typing import (
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .ICommand import ICommand
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# A column is a one dimensional memoryview, or a NumPy array when the
+# sender used one.
+Column = Union[memoryview, 'numpy.ndarray']
+
+# Typecodes of array.array whose size is the same on every platform. Columns
+# travel as raw buffers, so the sizes of i, I, l and L, which depend on the
+# platform, are left out.
+_TYPECODES = frozenset('bBhHqQfd')
+
+
+class BatchCommand(ICommand):
+    '''
+    Base of commands that carry many records of the same fields, stored
+    column by column:
+
+        class SampleBatch(BatchCommand):
+            schema = (('time', 'd'), ('sensor', 'H'), ('value', 'f'))
+
+        SampleBatch(dict(time=times, sensor=sensors, value=values))
+
+    The schema names the columns and their array.array typecode, one of
+    bBhHqQfd whose size does not depend on the platform. A column
+    may be given as a NumPy array, an array.array, a memoryview or any
+    iterable of numbers. Every column travels as one contiguous buffer frame
+    and the receiving side gets the columns back over those frames.
+    '''
+
+    schema: ClassVar[Tuple[Tuple[str, str], ...]] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        for name, typecode in cls.schema:
+            if typecode not in _TYPECODES:
+                raise TypeError(
+                    'column "%s" of %s has the unsupported typecode "%s"' % (
+                        name,
+                        cls.__qualname__,
+                        typecode,
+                    )
+                )
+
+    def __init__(self, columns: Optional[Mapping[str, object]] = None):
+        super().__init__()
+
+        self.__columns: Dict[str, Column] = {}
+
+        columns = columns or {}
+        for name, typecode in self.schema:
+            self.__columns[name] = _as_column(
+                name,
+                columns.get(name, ()),
+                typecode,
+            )
+
+        if len({len(column) for column in self.__columns.values()}) > 1:
+            raise ValueError('columns of %s have different lengths' % (
+                type(self).__name__
+            ))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, object]]) \
+            -> 'BatchCommand':
+        records = tuple(records)
+
+        return cls({
+            name: array.array(typecode, (record[name] for record in records))
+            for name, typecode in cls.schema
+        })
+
+    @property
+    def columns(self) -> Mapping[str, Column]:
+        return self.__columns
+
+    def __len__(self) -> int:
+        return len(next(iter(self.__columns.values()), ()))
+
+    def __getitem__(self, name: str) -> Column:
+        return self.__columns[name]
+
+    def records(self) -> Iterator[Dict[str, object]]:
+        return iter_records(self.__columns)
+
+    def set_command_state(self, state: dict) -> None:
+        schema = tuple(tuple(field) for field in state['schema'])
+        if schema != tuple(self.schema):
+            raise RuntimeError('batch schema %s does not match %s' % (
+                schema,
+                type(self).__name__,
+            ))
+
+        self.__columns = dict(zip(
+            (name for name, _ in schema),
+            state['columns'],
+        ))
+
+    def get_command_state(self) -> dict:
+        return dict(
+            schema=[list(field) for field in self.schema],
+            columns=list(self.__columns.values()),
+        )
+
+
+def iter_records(columns: Mapping[str, Column]) \
+        -> Iterator[Dict[str, object]]:
+    names = tuple(columns)
+
+    for values in zip(*(column.tolist() for column in columns.values())):
+        yield dict(zip(names, values))
+
+
+def _as_column(name: str, values: object, typecode: str) -> Column:
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        if values.ndim != 1:
+            raise ValueError('column "%s" is not one dimensional' % name)
+
+        return numpy.ascontiguousarray(values, dtype=typecode)
+
+    if isinstance(values, array.array) and values.typecode == typecode:
+        return memoryview(values)
+
+    if isinstance(values, memoryview) and values.format == typecode:
+        if values.ndim != 1:
+            raise ValueError('column "%s" is not one dimensional' % name)
+
+        return values
+
+    return memoryview(array.array(typecode, values))
@@ -0,0 +1,173 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import hashlib
+import mmap
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple, Union
+
+Blob = Union[bytes, memoryview]
+
+# Bytes of blobs kept in memory by default.
+BLOB_CACHE_SIZE = 256 * 1024 * 1024
+
+# Length of the content hash that replaces a blob in a message.
+DIGEST_SIZE = 32
+
+
+def blob_digest(data: object) -> bytes:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+class MissingBlobsError(RuntimeError):
+    '''
+    Raised when a message refers to blobs that are not in the blob store.
+    '''
+
+    def __init__(self, digests: Iterable[bytes]):
+        self.digests: Tuple[bytes, ...] = tuple(digests)
+
+        super().__init__('missing blobs: %s' % ', '.join(
+            digest.hex() for digest in self.digests
+        ))
+
+
+class BlobStore:
+    '''
+    Keeps blobs by the hash of their content, evicting the least recently
+    used ones once they take more than max_size bytes.
+    Processes on the same host may share a directory: stored blobs are also
+    written there as files named by their hash, and blobs missing in memory
+    are mapped from those files. The file of an evicted blob is deleted, so
+    the directory does not grow beyond what the stores sharing it keep.
+    Another process that misses a deleted blob asks for it again.
+    '''
+
+    def __init__(
+            self,
+            max_size: int = BLOB_CACHE_SIZE,
+            directory: Optional[str] = None):
+        if max_size <= 0:
+            raise RuntimeError('the blob store size has to be positive')
+
+        self.__max_size = max_size
+        self.__directory = directory
+        self.__blobs: 'OrderedDict[bytes, Blob]' = OrderedDict()
+        self.__size = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def directory(self) -> Optional[str]:
+        return self.__directory
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def __len__(self) -> int:
+        return len(self.__blobs)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self.__blobs or (
+            self.__directory is not None and
+            os.path.exists(self._get_path(digest))
+        )
+
+    def _get_path(self, digest: bytes) -> str:
+        return os.path.join(self.__directory, digest.hex())
+
+    def put(self, data: object) -> bytes:
+        '''
+        Stores a blob and returns its digest.
+        '''
+
+        digest = blob_digest(data)
+
+        if digest in self.__blobs:
+            self.__blobs.move_to_end(digest)
+            return digest
+
+        blob = data if isinstance(data, bytes) else bytes(data)
+
+        if self.__directory is not None:
+            self._write_file(digest, blob)
+
+        self._add(digest, blob)
+
+        return digest
+
+    def get(self, digest: bytes) -> Optional[Blob]:
+        blob = self.__blobs.get(digest)
+
+        if blob is not None:
+            self.__blobs.move_to_end(digest)
+            return blob
+
+        if self.__directory is None:
+            return None
+
+        blob = self._read_file(digest)
+        if blob is not None:
+            self._add(digest, blob)
+
+        return blob
+
+    def _add(self, digest: bytes, blob: Blob) -> None:
+        self.__blobs[digest] = blob
+        self.__size += len(blob)
+
+        while self.__size > self.__max_size and len(self.__blobs) > 1:
+            evicted_digest, evicted = self.__blobs.popitem(last=False)
+            self.__size -= len(evicted)
+
+            if self.__directory is not None:
+                self._delete_file(evicted_digest)
+
+    def _write_file(self, digest: bytes, blob: bytes) -> None:
+        path = self._get_path(digest)
+        if os.path.exists(path):
+            return
+
+        # Readers never see a partially written blob.
+        fd, temp_path = tempfile.mkstemp(dir=self.__directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _delete_file(self, digest: bytes) -> None:
+        try:
+            os.unlink(self._get_path(digest))
+        except OSError:
+            # Deleted by another store already, or mapped on platforms that
+            # refuse to delete mapped files.
+            pass
+
+    def _read_file(self, digest: bytes) -> Optional[Blob]:
+        try:
+            with open(self._get_path(digest), 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b''
+
+                return memoryview(
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                )
+        except FileNotFoundError:
+            return None
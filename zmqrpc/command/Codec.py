@@ -0,0 +1,40 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from .Compressor import Compressor
+from .Serializer import Serializer
+
+
+class Codec:
+    '''
+    A serializer and compressor pair, named "<serializer>+<compressor>".
+    '''
+
+    def __init__(self, serializer: Serializer, compressor: Compressor):
+        self.__serializer = serializer
+        self.__compressor = compressor
+        self.__name = '{0}+{1}'.format(serializer.name, compressor.name)
+        self.__format_tag = \
+            serializer.serializer_id | compressor.compressor_id
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def serializer(self) -> Serializer:
+        return self.__serializer
+
+    @property
+    def compressor(self) -> Compressor:
+        return self.__compressor
+
+    @property
+    def format_tag(self) -> int:
+        return self.__format_tag
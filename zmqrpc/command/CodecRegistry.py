@@ -0,0 +1,130 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Dict, Tuple
+
+from .Codec import Codec
+from .Compressor import Compressor
+from .Serializer import Serializer
+
+
+class CodecRegistry:
+    '''
+    Holds every serializer and compressor that can appear on the wire, and
+    the codecs made of their combinations.
+    Register the faster serializers and compressors first; codec_names lists
+    the codecs in registration order. safe_codec_names leaves out the codecs
+    of serializers that are not safe against crafted input; servers accept
+    those codecs by default and the codec negotiation prefers them in this
+    order.
+    '''
+
+    def __init__(self):
+        self.__serializers: Dict[int, Serializer] = {}
+        self.__compressors: Dict[int, Compressor] = {}
+        self.__codecs: Dict[str, Codec] = {}
+        self.__formats: Dict[int, Codec] = {}
+
+    @property
+    def codec_names(self) -> Tuple[str, ...]:
+        return tuple(self.__codecs)
+
+    @property
+    def safe_codec_names(self) -> Tuple[str, ...]:
+        return tuple(
+            name
+            for name, codec in self.__codecs.items()
+            if codec.serializer.is_safe
+        )
+
+    def register_serializer(self, serializer: Serializer) -> None:
+        serializer_id = serializer.serializer_id
+
+        if serializer_id & 0x0F or not 0 < serializer_id <= 0xF0:
+            raise RuntimeError(
+                'serializer id of "%s" has to be in the high nibble' %
+                serializer.name
+            )
+
+        if serializer_id in self.__serializers:
+            raise RuntimeError(
+                'found a repeated serializer id: 0x%02x' % serializer_id
+            )
+
+        self.__serializers[serializer_id] = serializer
+
+        for compressor in self.__compressors.values():
+            self.__add_codec(Codec(serializer, compressor))
+
+    def register_compressor(self, compressor: Compressor) -> None:
+        compressor_id = compressor.compressor_id
+
+        if not 0 <= compressor_id <= 0x0F:
+            raise RuntimeError(
+                'compressor id of "%s" has to be in the low nibble' %
+                compressor.name
+            )
+
+        if compressor_id in self.__compressors:
+            raise RuntimeError(
+                'found a repeated compressor id: 0x%02x' % compressor_id
+            )
+
+        self.__compressors[compressor_id] = compressor
+
+        for serializer in self.__serializers.values():
+            self.__add_codec(Codec(serializer, compressor))
+
+    def __add_codec(self, codec: Codec) -> None:
+        self.__formats[codec.format_tag] = codec
+
+        # Keep the codec names ordered by serializer, then by compressor.
+        codecs = list(self.__codecs.values()) + [codec]
+        serializers = tuple(self.__serializers)
+        compressors = tuple(self.__compressors)
+        codecs.sort(key=lambda c: (
+            serializers.index(c.serializer.serializer_id),
+            compressors.index(c.compressor.compressor_id),
+        ))
+
+        self.__codecs = {c.name: c for c in codecs}
+
+    def get_serializer(self, serializer_id: int) -> Serializer:
+        if serializer_id in self.__serializers:
+            return self.__serializers[serializer_id]
+
+        raise RuntimeError('unknown serializer id 0x%02x' % serializer_id)
+
+    def get_compressor(self, compressor_id: int) -> Compressor:
+        if compressor_id in self.__compressors:
+            return self.__compressors[compressor_id]
+
+        raise RuntimeError('unknown compressor id 0x%02x' % compressor_id)
+
+    def find_compressor(self, name: str) -> Compressor:
+        for compressor in self.__compressors.values():
+            if compressor.name == name:
+                return compressor
+
+        raise RuntimeError('could not find compressor "%s"' % name)
+
+    def get_codec(self, name: str) -> Codec:
+        if name in self.__codecs:
+            return self.__codecs[name]
+
+        raise RuntimeError('could not find codec "%s"' % name)
+
+    def get_format(self, format_tag: int) -> Codec:
+        if format_tag in self.__formats:
+            return self.__formats[format_tag]
+
+        raise RuntimeError('unknown message format 0x%02x' % format_tag)
+
+
+codec_registry = CodecRegistry()
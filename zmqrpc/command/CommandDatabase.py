@@ -9,37 +9,77 @@ Created on Oct 2020
 '''
 
 
+from typing import Dict, List, Union
+
+
 class CommandDatabase:
+    '''
+    Maps the command ids used on the wire to the command classes.
+    Class names are only kept to decode messages of older clients, which
+    identify commands by name; the same name may be used by commands of
+    different modules.
+    '''
 
     def __init__(self):
-        self.__commands = {}
+        self.__commands: Dict[int, type] = {}
+        self.__names: Dict[str, List[type]] = {}
 
     @property
-    def commands(self) -> dict:
+    def commands(self) -> Dict[int, type]:
         return self.__commands
 
-    def register_command(self, name: str, command_class: object) -> None:
-        if name in self.commands:
-            raise RuntimeError('found a repeated command name: "%s"' % name)
+    def register_command(self, command_class: type) -> None:
+        command_id = command_class.command_id
+
+        if command_id in self.__commands:
+            other_class = self.__commands[command_id]
+            raise RuntimeError(
+                'command "%s.%s" has the same id %d as command "%s.%s". '
+                'Set a distinct command_id on one of them.' % (
+                    command_class.__module__,
+                    command_class.__qualname__,
+                    command_id,
+                    other_class.__module__,
+                    other_class.__qualname__,
+                )
+            )
+
+        self.__commands[command_id] = command_class
+        self.__names.setdefault(command_class.__name__, []).append(
+            command_class
+        )
+
+    def get_by_name(self, name: str) -> type:
+        command_classes = self.__names.get(name, ())
 
-        self.__commands[name] = command_class
+        if len(command_classes) == 1:
+            return command_classes[0]
 
-    def __getattr__(self, attrib: str) -> object:
-        if attrib in self.commands:
-            return self.commands[attrib]
+        if not command_classes:
+            raise RuntimeError(
+                'could not find command "%s" in the commands database' %
+                name
+            )
 
         raise RuntimeError(
-            'could not find command "%s" in the commands database' %
-            attrib
+            'command name "%s" is ambiguous; it is used in modules %s' % (
+                name,
+                ', '.join(c.__module__ for c in command_classes),
+            )
         )
 
-    def __getitem__(self, attrib: str) -> object:
-        if attrib in self.commands:
-            return self.commands[attrib]
+    def __getattr__(self, attrib: str) -> type:
+        return self.get_by_name(attrib)
+
+    def __getitem__(self, key: Union[int, str]) -> type:
+        if isinstance(key, str):
+            return self.get_by_name(key)
+
+        if key in self.__commands:
+            return self.__commands[key]
 
         raise RuntimeError(
-            'could not find command "%s" in the commands database' %
-            attrib
+            'could not find command id %s in the commands database' % key
         )
 
 
@@ -9,12 +9,149 @@ Created on Oct 2020
 '''
 
 
+import hashlib
+from typing import ClassVar, Dict, Tuple
+
 from .CommandDatabase import command_database
 
+# Class attribute that holds the ordered state fields of slots commands.
+FIELDS_KEY = '__command_fields__'
+
+# Module of the main script in processes that multiprocessing spawns.
+_MP_MAIN_MODULE = '__mp_main__'
+
+_RESERVED_FIELDS = frozenset((
+    'command_id',
+    'compression_level',
+    'immutable',
+))
+
+
+def _is_class_var(annotation: object) -> bool:
+    if isinstance(annotation, str):
+        return annotation.startswith(('ClassVar', 'typing.ClassVar'))
+
+    # typing.get_origin() needs Python 3.8; Python 3.6 makes ClassVar[...]
+    # an instance of its own _ClassVar class instead of an alias.
+    return annotation is ClassVar or \
+        getattr(annotation, '__origin__', None) is ClassVar or \
+        type(annotation).__name__ == '_ClassVar'
+
+
+def _own_fields(dct: dict) -> Tuple[str, ...]:
+    return tuple(
+        name
+        for name, annotation in dct.get('__annotations__', {}).items()
+        if not name.startswith('__') and
+        name not in _RESERVED_FIELDS and
+        not _is_class_var(annotation)
+    )
+
+
+def _compile(source: str, name: str, namespace: Dict[str, object]) \
+        -> object:
+    exec(source, namespace)
+    return namespace[name]
+
+
+def _make_state_functions(cls: type) -> None:
+    '''
+    Generates __init__, get_command_state and set_command_state of a slots
+    command. The state is a positional tuple in field order.
+    '''
+
+    fields = getattr(cls, FIELDS_KEY)
+    defaults = {
+        name: getattr(cls, '_default_' + name)
+        for name in fields
+        if hasattr(cls, '_default_' + name)
+    }
+
+    getter = _compile(
+        'def get_command_state(self):\n'
+        '    return ({0})\n'.format(
+            ''.join('self.{0}, '.format(name) for name in fields)
+        ),
+        'get_command_state',
+        {},
+    )
+
+    setter = _compile(
+        'def set_command_state(self, state):\n'
+        '    {0}\n'.format(
+            ''.join('self.{0}, '.format(name) for name in fields) + '= state'
+            if fields else 'pass'
+        ),
+        'set_command_state',
+        {},
+    )
+
+    if '__init__' not in cls.__dict__:
+        # Fields without a default become required arguments, hence fields
+        # with defaults must come last just like in dataclasses.
+        arguments = []
+        for name in fields:
+            if name in defaults:
+                arguments.append('{0}=_defaults[{0!r}]'.format(name))
+            elif arguments and '=' in arguments[-1]:
+                raise TypeError(
+                    'field "{0}" of {1} without a default follows a field '
+                    'with a default'.format(name, cls.__qualname__)
+                )
+            else:
+                arguments.append(name)
+
+        cls.__init__ = _compile(
+            'def __init__(self, {0}):\n'
+            '    {1}\n'.format(
+                ', '.join(arguments),
+                '\n    '.join(
+                    'self.{0} = {0}'.format(name) for name in fields
+                ) or 'pass',
+            ),
+            '__init__',
+            dict(_defaults=defaults),
+        )
+        cls.__init__.__qualname__ = cls.__qualname__ + '.__init__'
+
+    getter.__qualname__ = cls.__qualname__ + '.get_command_state'
+    setter.__qualname__ = cls.__qualname__ + '.set_command_state'
+
+    cls.get_command_state = getter
+    cls.set_command_state = setter
+
 
 class CommandMeta(type):
 
     def __new__(cls, name, parents, dct):
+        parent_fields = next(
+            (
+                getattr(parent, FIELDS_KEY)
+                for parent in parents
+                if hasattr(parent, FIELDS_KEY)
+            ),
+            None,
+        )
+
+        if parent_fields is not None and '__slots__' not in dct:
+            # Slots commands declare their state as annotated fields. The
+            # slots have to exist before the class is created, and a default
+            # value would clash with its slot, so it is kept aside.
+            fields = _own_fields(dct)
+
+            for field in fields:
+                if field in dct:
+                    default = dct.pop(field)
+                    if isinstance(default, (list, dict, set)):
+                        raise ValueError(
+                            'mutable default {0} for field "{1}" is not '
+                            'allowed'.format(type(default), field)
+                        )
+                    dct['_default_' + field] = default
+
+            dct['__slots__'] = fields
+            dct[FIELDS_KEY] = parent_fields + fields
+
         # we need to call type.__new__ to complete the initialization
         return super().__new__(cls, name, parents, dct)
 
@@ -30,4 +167,23 @@ class CommandMeta(type):
         if name == 'ICommand':
             return
 
-        command_database.register_command(name, cls)
+        if FIELDS_KEY in dct:
+            _make_state_functions(cls)
+
+        # The id identifies the command on the wire. It is derived from the
+        # full path of the class unless the class sets its own command_id,
+        # e.g. when the client and the server define it in different
+        # modules. Spawned processes import the main script as __mp_main__,
+        # which still names the same commands as __main__.
+        if 'command_id' not in dct:
+            module = cls.__module__
+            if module == _MP_MAIN_MODULE:
+                module = '__main__'
+
+            path = '{0}.{1}'.format(module, cls.__qualname__)
+            cls.command_id = int.from_bytes(
+                hashlib.blake2b(path.encode('utf-8'), digest_size=4).digest(),
+                'big',
+            )
+
+        command_database.register_command(cls)
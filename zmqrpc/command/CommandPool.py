@@ -0,0 +1,81 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Dict, List
+
+from .CommandMeta import FIELDS_KEY
+from .ICommand import ICommand
+
+
+def new_command(command_class: type) -> ICommand:
+    '''
+    Returns a command that only waits for its state to be set.
+    '''
+
+    if hasattr(command_class, FIELDS_KEY):
+        # Slots commands get their whole state right after, so the generated
+        # __init__ and its required fields are skipped.
+        return command_class.__new__(command_class)
+
+    return command_class()
+
+
+class CommandPool:
+    '''
+    Keeps decoded commands of the registered command classes for reuse, so
+    decoding a command resets a released one through set_command_state
+    instead of allocating a new one. Up to the registered size of commands
+    are kept per class; commands of other classes are allocated as usual.
+    A command may only be released once nothing refers to it anymore.
+    '''
+
+    def __init__(self):
+        self.__sizes: Dict[type, int] = {}
+        self.__pools: Dict[type, List[ICommand]] = {}
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def register(self, command_class: type, size: int) -> None:
+        if size <= 0:
+            self.__sizes.pop(command_class, None)
+            self.__pools.pop(command_class, None)
+            return
+
+        self.__sizes[command_class] = size
+        self.__pools.setdefault(command_class, [])
+
+    def acquire(self, command_class: type) -> ICommand:
+        pool = self.__pools.get(command_class)
+
+        if pool:
+            self.__hits += 1
+            return pool.pop()
+
+        if pool is not None:
+            self.__misses += 1
+
+        return new_command(command_class)
+
+    def release(self, command: ICommand) -> None:
+        command_class = type(command)
+        pool = self.__pools.get(command_class)
+
+        if pool is not None and len(pool) < self.__sizes[command_class]:
+            pool.append(command)
+
+    def __len__(self) -> int:
+        return sum(len(pool) for pool in self.__pools.values())
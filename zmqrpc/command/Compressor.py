@@ -0,0 +1,84 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Callable, Optional
+
+StreamFunction = Callable[..., bytes]
+
+
+class Compressor:
+    '''
+    Compresses serialized message bodies. The compressor id is the low nibble
+    of the format tag that heads every binary message.
+    A level of -1 selects the default level of the compressor.
+    Decompression stops with a RuntimeError as soon as the output grows
+    beyond max_size bytes, so a small compressed body cannot expand to an
+    unbounded amount of memory.
+    Compressors that can flush their state after every message also provide
+    stream factories. A stream compresses a sequence of messages with one
+    context, so later messages refer back to the earlier ones.
+    '''
+
+    def __init__(
+            self,
+            compressor_id: int,
+            name: str,
+            compress: Callable[[bytes, int], bytes],
+            decompress: Callable[[bytes, Optional[int]], bytes],
+            default_level: int,
+            compress_stream: Optional[Callable[[int], StreamFunction]] = None,
+            decompress_stream: Optional[Callable[[], StreamFunction]] = None):
+        self.__compressor_id = compressor_id
+        self.__name = name
+        self.__compress = compress
+        self.__decompress = decompress
+        self.__default_level = default_level
+        self.__compress_stream = compress_stream
+        self.__decompress_stream = decompress_stream
+
+    @property
+    def compressor_id(self) -> int:
+        return self.__compressor_id
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    def compress(self, data: bytes, level: int = -1) -> bytes:
+        if level < 0:
+            level = self.__default_level
+
+        return self.__compress(data, level)
+
+    def decompress(self, data: bytes, max_size: Optional[int] = None) \
+            -> bytes:
+        return self.__decompress(data, max_size)
+
+    @property
+    def can_stream(self) -> bool:
+        return self.__compress_stream is not None
+
+    def compress_stream(self, level: int = -1) -> StreamFunction:
+        if not self.can_stream:
+            raise RuntimeError(
+                'compressor "%s" does not support streams' % self.__name
+            )
+
+        if level < 0:
+            level = self.__default_level
+
+        return self.__compress_stream(level)
+
+    def decompress_stream(self) -> StreamFunction:
+        if not self.can_stream:
+            raise RuntimeError(
+                'compressor "%s" does not support streams' % self.__name
+            )
+
+        return self.__decompress_stream()
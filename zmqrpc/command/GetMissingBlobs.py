@@ -0,0 +1,33 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Optional, Sequence
+
+from .ICommand import ICommand
+
+
+class GetMissingBlobs(ICommand):
+    '''
+    Asks a server which of the blobs, given as hex digests, it does not have.
+    '''
+
+    def __init__(self, digests: Optional[Sequence[str]] = None):
+        super().__init__()
+
+        self.__digests = list(digests or ())
+
+    @property
+    def digests(self) -> Sequence[str]:
+        return self.__digests
+
+    def set_command_state(self, state: dict) -> None:
+        self.__digests = state['digests']
+
+    def get_command_state(self) -> dict:
+        return dict(digests=self.__digests)
@@ -0,0 +1,19 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from .ICommand import ICommand
+
+
+class GetServerCodecs(ICommand):
+
+    def set_command_state(self, state: dict) -> None:
+        pass
+
+    def get_command_state(self) -> dict:
+        return {}
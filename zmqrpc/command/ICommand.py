@@ -14,6 +14,21 @@ from .CommandMeta import CommandMeta
 
 class ICommand(metaclass=CommandMeta):
 
+    # Lets subclasses such as SlotsCommand do without an instance dict.
+    __slots__ = ()
+
+    # Set by CommandMeta for every concrete command class.
+    command_id: int = 0
+
+    # Level handed to the compressor of the codec when the encoded command is
+    # large enough to be compressed. Subclasses may override it; -1 selects
+    # the default level of the compressor and 0 disables compression.
+    compression_level: int = -1
+
+    # Commands whose state never changes after construction may set this to
+    # True; a client with a message cache then encodes them only once.
+    immutable: bool = False
+
     def set_command_state(self, state: dict) -> None:
         assert False
 
@@ -10,8 +10,11 @@ Created on Oct 2020
 
 
 from json import JSONEncoder
+from typing import List, Optional, Sequence
 
+from .buffers import BUFFER_KEY, dump_buffer, is_buffer, load_buffer
 from .CommandDatabase import command_database
+from .CommandPool import CommandPool, new_command
 from .ICommand import ICommand
 
 
@@ -19,29 +22,55 @@ class JsonEncoder(JSONEncoder):
 
     ICommandKey = '_icmd_'
 
+    def __init__(self, *args, buffers: Optional[List[object]] = None, **kw):
+        super().__init__(*args, **kw)
+
+        # Buffer objects are collected here to be sent out of band.
+        self.__buffers = buffers
+        self.__command_count = 0
+
+    @property
+    def command_count(self) -> int:
+        return self.__command_count
+
     def default(self, o):
         obj = o
 
         if isinstance(obj, ICommand):
+            self.__command_count += 1
             return {
                 self.ICommandKey: (
-                    type(obj).__name__,
+                    obj.command_id,
                     obj.get_command_state(),
                 ),
             }
 
+        if self.__buffers is not None and is_buffer(obj):
+            return dump_buffer(obj, self.__buffers)
+
         return super().default(obj)
 
-    @ staticmethod
-    def object_hook(d):
+    @staticmethod
+    def object_hook(
+            d,
+            buffers: Sequence[memoryview] = (),
+            command_pool: Optional[CommandPool] = None):
 
         if not isinstance(d, dict):
             return d
 
         if JsonEncoder.ICommandKey in d:
-            name, state = d[JsonEncoder.ICommandKey]
-            command = command_database.commands[name]()
+            # Older clients identify the command by its class name.
+            command_id, state = d[JsonEncoder.ICommandKey]
+            command_class = command_database[command_id]
+            if command_pool is not None:
+                command = command_pool.acquire(command_class)
+            else:
+                command = new_command(command_class)
             command.set_command_state(state=state)
             return command
 
+        if BUFFER_KEY in d:
+            return load_buffer(d[BUFFER_KEY], buffers)
+
         return d
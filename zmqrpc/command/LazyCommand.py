@@ -0,0 +1,92 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Container, Optional
+
+from ..base import Message
+from .BlobStore import BlobStore
+from .CommandDatabase import command_database
+from .CommandPool import CommandPool
+from .ICommand import ICommand
+from .json_io import json_unzip, read_header
+from .SharedMemoryReader import SharedMemoryReader
+
+
+class LazyCommand:
+    '''
+    A handle on a received command message. The command id is read from the
+    message header, so servers can reject or prioritize a command and proxies
+    can route it without decoding it. The body is only decompressed and
+    deserialized when the command is read.
+    Messages without a command id in their header (text messages of older
+    clients) are decoded to find their id.
+    '''
+
+    def __init__(
+            self,
+            message: Message,
+            formats: Optional[Container[int]] = None,
+            max_body_size: Optional[int] = None,
+            blob_store: Optional[BlobStore] = None,
+            shared_memory: Optional[SharedMemoryReader] = None,
+            command_pool: Optional[CommandPool] = None):
+        self.__message = message
+        self.__formats = formats
+        self.__max_body_size = max_body_size
+        self.__blob_store = blob_store
+        self.__shared_memory = shared_memory
+        self.__command_pool = command_pool
+        self.__command: Optional[ICommand] = None
+        self.__command_id: Optional[int] = None
+
+        if not isinstance(message, str):
+            self.__command_id = read_header(message[0])[2]
+
+    @property
+    def message(self) -> Message:
+        return self.__message
+
+    @property
+    def is_decoded(self) -> bool:
+        return self.__command is not None
+
+    @property
+    def command_id(self) -> Optional[int]:
+        if self.__command_id is None:
+            self.__command_id = getattr(self.command, 'command_id', None)
+
+        return self.__command_id
+
+    @property
+    def command_class(self) -> Optional[type]:
+        return command_database.commands.get(self.command_id)
+
+    @property
+    def command(self) -> ICommand:
+        if self.__command is None:
+            command = json_unzip(
+                self.__message,
+                formats=self.__formats,
+                max_body_size=self.__max_body_size,
+                blob_store=self.__blob_store,
+                shared_memory=self.__shared_memory,
+                command_pool=self.__command_pool,
+            )
+
+            # The service was chosen by the header, the body must agree.
+            if self.__command_id is not None and \
+                    getattr(command, 'command_id', None) != self.__command_id:
+                raise RuntimeError(
+                    'the command in the body does not match the command id '
+                    '%d of the header' % self.__command_id
+                )
+
+            self.__command = command
+
+        return self.__command
@@ -0,0 +1,66 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .CommandPool import CommandPool
+
+
+class Serializer:
+    '''
+    Turns a message object into bytes and back. The serializer id is the high
+    nibble of the format tag that heads every binary message.
+    Buffer objects found while dumping are appended to the buffers list and
+    travel as separate frames; loads gets those frames back.
+    dumps also tells whether the body is flat, i.e. holds no command below
+    the top level. Flat bodies are decoded without a per object callback.
+    loads takes the decoded commands from command_pool when one is given.
+    Serializers that are not safe against crafted input are left out of the
+    codecs servers accept and clients negotiate by default.
+    '''
+
+    def __init__(
+            self,
+            serializer_id: int,
+            name: str,
+            dumps: Callable[[object, List[object]], Tuple[bytes, bool]],
+            loads: Callable[
+                [bytes, Sequence[memoryview], bool, Optional[CommandPool]],
+                object,
+            ],
+            is_safe: bool = True):
+        self.__serializer_id = serializer_id
+        self.__name = name
+        self.__dumps = dumps
+        self.__loads = loads
+        self.__is_safe = is_safe
+
+    @property
+    def serializer_id(self) -> int:
+        return self.__serializer_id
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def is_safe(self) -> bool:
+        return self.__is_safe
+
+    def dumps(self, obj: object, buffers: List[object]) \
+            -> Tuple[bytes, bool]:
+        return self.__dumps(obj, buffers)
+
+    def loads(
+            self,
+            data: bytes,
+            buffers: Sequence[memoryview] = (),
+            flat: bool = False,
+            command_pool: Optional[CommandPool] = None) -> object:
+        return self.__loads(data, buffers, flat, command_pool)
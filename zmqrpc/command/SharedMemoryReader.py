@@ -0,0 +1,84 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import mmap
+import os
+import re
+from typing import List
+
+from .SharedMemoryWriter import HANDLE
+
+# Linux exposes POSIX shared memory segments as files in this directory.
+_SHM_DIRECTORY = '/dev/shm'
+
+# Names SharedMemory generates for new segments; handles come from the
+# network, so any other name is refused rather than opened.
+_SEGMENT_NAME = re.compile(r'(psm|wnsm)_[0-9a-f]{1,32}')
+
+
+class SharedMemoryReader:
+    '''
+    Maps the shared memory segments of received handles. The views over a
+    segment are read-only and the segment stays mapped as long as any view
+    over it, or over a buffer rebuilt from it, is alive.
+    '''
+
+    def __init__(self):
+        # Segments attached through SharedMemory, which has to be closed
+        # explicitly once nothing refers to its memory any more.
+        self.__segments: List[object] = []
+
+    def get(self, handle: memoryview) -> memoryview:
+        size, = HANDLE.unpack_from(handle)
+        name = bytes(handle[HANDLE.size:]).decode('ascii', 'replace')
+
+        if _SEGMENT_NAME.fullmatch(name) is None:
+            raise RuntimeError(
+                'invalid shared memory segment name "%s"' % name
+            )
+
+        if size == 0:
+            return memoryview(b'')
+
+        if os.path.isdir(_SHM_DIRECTORY):
+            # An mmap is unmapped by itself once its last view is released.
+            with open(os.path.join(_SHM_DIRECTORY, name), 'rb') as f:
+                return memoryview(
+                    mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+                )
+
+        # Only needed, and only available from Python 3.8 on, without the
+        # directory.
+        from multiprocessing import resource_tracker
+        from multiprocessing.shared_memory import SharedMemory
+
+        segment = SharedMemory(name=name)
+        if os.name == 'posix':
+            # Attaching registers the segment with the resource tracker,
+            # which would unlink it when this process exits. The sender
+            # owns the segment.
+            resource_tracker.unregister('/' + segment.name, 'shared_memory')
+
+        self.__segments.append(segment)
+
+        return segment.buf[:size].toreadonly()
+
+    def collect(self) -> None:
+        '''
+        Closes attached segments whose memory is no longer referenced.
+        '''
+
+        segments = self.__segments
+        self.__segments = []
+
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                self.__segments.append(segment)
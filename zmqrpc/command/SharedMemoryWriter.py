@@ -0,0 +1,66 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import struct
+from typing import List
+
+# A handle is the size of the buffer followed by the name of its segment.
+HANDLE = struct.Struct('!Q')
+
+
+class SharedMemoryWriter:
+    '''
+    Copies buffers into new shared memory segments and hands out the handles
+    that replace them in a message. The segments live until release() is
+    called, by which time the receiver has to have mapped them.
+    '''
+
+    def __init__(self):
+        # multiprocessing.shared_memory is only imported once shared memory
+        # is used, since Python 3.6 and 3.7 do not have it.
+        try:
+            from multiprocessing.shared_memory import SharedMemory
+        except ImportError as e:
+            raise RuntimeError(
+                'shared memory needs Python 3.8 or later'
+            ) from e
+
+        self.__shared_memory_class = SharedMemory
+        self.__segments: List[object] = []
+
+    def __len__(self) -> int:
+        return len(self.__segments)
+
+    def put(self, data: object) -> bytes:
+        view = memoryview(data).cast('B')
+
+        # Segments cannot be empty.
+        segment = self.__shared_memory_class(
+            create=True,
+            size=max(view.nbytes, 1),
+        )
+        segment.buf[:view.nbytes] = view
+        self.__segments.append(segment)
+
+        return HANDLE.pack(view.nbytes) + segment.name.encode('ascii')
+
+    def release(self) -> None:
+        '''
+        Unlinks the segments handed out so far. Receivers that mapped them
+        keep their mappings; the memory is freed once those are gone too.
+        '''
+
+        for segment in self.__segments:
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+        self.__segments.clear()
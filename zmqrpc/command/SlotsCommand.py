@@ -0,0 +1,29 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from .ICommand import ICommand
+
+
+class SlotsCommand(ICommand):
+    '''
+    Base of commands that declare their state as annotated fields:
+
+        class MoveCommand(SlotsCommand):
+            x: int
+            y: int = 0
+
+    CommandMeta turns the fields into __slots__ and generates __init__,
+    get_command_state and set_command_state for them when the class is
+    created. The state travels as a tuple in field order instead of a dict.
+    '''
+
+    __slots__ = ()
+
+    # Ordered names of the fields, filled in by CommandMeta.
+    __command_fields__ = ()
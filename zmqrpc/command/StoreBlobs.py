@@ -0,0 +1,34 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Optional, Sequence
+
+from .ICommand import ICommand
+
+
+class StoreBlobs(ICommand):
+    '''
+    Sends blobs to the blob store of a server. Each blob travels as its own
+    buffer frame.
+    '''
+
+    def __init__(self, blobs: Optional[Sequence[object]] = None):
+        super().__init__()
+
+        self.__blobs = list(blobs or ())
+
+    @property
+    def blobs(self) -> Sequence[object]:
+        return self.__blobs
+
+    def set_command_state(self, state: dict) -> None:
+        self.__blobs = state['blobs']
+
+    def get_command_state(self) -> dict:
+        return dict(blobs=self.__blobs)
@@ -0,0 +1,70 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Sequence, Tuple
+
+from ..base import Frame, frame_buffer, frame_bytes
+from .CodecRegistry import codec_registry
+from .compressors import COMPRESSOR_MASK, COMPRESSOR_NONE
+from .json_io import FLAG_STREAM, FLAG_STREAM_RESET
+
+
+class StreamCompressor:
+    '''
+    Compresses the messages sent over one PUB socket with a single
+    compression context, flushed after every message. Small and similar
+    messages compress far better than one by one.
+    Subscribers that join late or miss a message cannot follow the stream,
+    so a new stream is started every reset_interval messages.
+    Only messages with an uncompressed body are added to the stream; the
+    others and text messages are sent as they are.
+    '''
+
+    def __init__(self, compressor: str = 'zlib', reset_interval: int = 100):
+        self.__compressor = codec_registry.find_compressor(compressor)
+
+        if not self.__compressor.can_stream:
+            raise RuntimeError(
+                'compressor "%s" does not support streams' % compressor
+            )
+
+        if reset_interval <= 0:
+            raise RuntimeError('the reset interval has to be positive')
+
+        self.__reset_interval = reset_interval
+        self.__compress = None
+        self.__sequence = 0
+
+    def reset(self) -> None:
+        self.__compress = None
+
+    def compress(self, message: Sequence[Frame]) -> Tuple[Frame, ...]:
+        header = frame_bytes(message[0])
+
+        if len(header) < 2 or header[0] & COMPRESSOR_MASK != COMPRESSOR_NONE:
+            return tuple(message)
+
+        flags = header[1] | FLAG_STREAM
+
+        if self.__compress is None or \
+                self.__sequence % self.__reset_interval == 0:
+            self.__compress = self.__compressor.compress_stream()
+            self.__sequence = 0
+            flags |= FLAG_STREAM_RESET
+
+        body = self.__compress(frame_buffer(message[1]))
+
+        header = bytes((
+            header[0] | self.__compressor.compressor_id,
+            flags,
+        )) + header[2:] + self.__sequence.to_bytes(4, 'big')
+
+        self.__sequence += 1
+
+        return (header, body) + tuple(message[2:])
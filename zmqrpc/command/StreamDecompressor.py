@@ -0,0 +1,81 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Optional
+
+from ..base import Message, frame_buffer, frame_bytes
+from .CodecRegistry import codec_registry
+from .compressors import COMPRESSOR_MASK, COMPRESSOR_NONE
+from .json_io import FLAG_STREAM, FLAG_STREAM_RESET
+
+
+class StreamDecompressor:
+    '''
+    Follows the compression stream of the PUB socket one SUB socket is
+    connected to and turns its messages back into plain binary messages.
+    Messages of a stream that was joined late, or that lost a message, are
+    rejected until the publisher starts a new stream, as are bodies that
+    decompress to more than max_body_size bytes.
+    '''
+
+    def __init__(self, max_body_size: Optional[int] = None):
+        self.__max_body_size = max_body_size
+        self.__decompress = None
+        self.__compressor_id: Optional[int] = None
+        self.__sequence = 0
+
+    def reset(self) -> None:
+        self.__decompress = None
+
+    def decompress(self, message: Message) -> Message:
+        if isinstance(message, str):
+            return message
+
+        header = frame_bytes(message[0])
+
+        if len(header) < 2 or not header[1] & FLAG_STREAM:
+            return message
+
+        format_tag, flags = header[0], header[1]
+        compressor_id = format_tag & COMPRESSOR_MASK
+        sequence = int.from_bytes(header[-4:], 'big')
+
+        if flags & FLAG_STREAM_RESET:
+            self.__decompress = codec_registry.get_compressor(
+                compressor_id,
+            ).decompress_stream()
+            self.__compressor_id = compressor_id
+            self.__sequence = sequence
+
+        if self.__decompress is None or \
+                compressor_id != self.__compressor_id or \
+                sequence != self.__sequence:
+            self.__decompress = None
+            raise RuntimeError(
+                'missed a message of the compression stream; waiting for '
+                'the next stream'
+            )
+
+        self.__sequence += 1
+
+        try:
+            body = self.__decompress(
+                frame_buffer(message[1]),
+                self.__max_body_size,
+            )
+        except BaseException:
+            self.__decompress = None
+            raise
+
+        header = bytes((
+            format_tag & ~COMPRESSOR_MASK | COMPRESSOR_NONE,
+            flags & ~(FLAG_STREAM | FLAG_STREAM_RESET),
+        )) + header[2:-4]
+
+        return (header, body) + tuple(message[2:])
@@ -0,0 +1,67 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import struct
+from typing import ClassVar, Optional
+
+from .SlotsCommand import SlotsCommand
+
+
+class StructCommand(SlotsCommand):
+    '''
+    A slots command whose fields are packed with a fixed struct layout:
+
+        class Telemetry(StructCommand):
+            struct_format = '<dfi'
+
+            time: float
+            value: float
+            count: int
+
+    json_zip sends these commands as the packed bytes of their fields under
+    their own format tag, skipping the serializer and the compressor of the
+    codec. Servers accept them next to the commands of any codec.
+    '''
+
+    __slots__ = ()
+
+    struct_format: ClassVar[str] = ''
+
+    _struct: ClassVar[struct.Struct] = struct.Struct('')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls._struct = struct.Struct(cls.struct_format)
+
+        item_count = len(cls._struct.unpack(bytes(cls._struct.size)))
+        if item_count != len(cls.__command_fields__):
+            raise TypeError(
+                'struct format "%s" of %s packs %d items for %d fields' % (
+                    cls.struct_format,
+                    cls.__qualname__,
+                    item_count,
+                    len(cls.__command_fields__),
+                )
+            )
+
+    def pack(self) -> bytes:
+        return self._struct.pack(*self.get_command_state())
+
+    @classmethod
+    def unpack(
+            cls,
+            data: bytes,
+            command: Optional['StructCommand'] = None) -> 'StructCommand':
+        # A given command, e.g. one of a command pool, is refilled instead.
+        if command is None:
+            command = cls.__new__(cls)
+
+        command.set_command_state(cls._struct.unpack(data))
+        return command
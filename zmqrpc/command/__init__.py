@@ -1,4 +1,32 @@
 
+from .BatchCommand import BatchCommand
+from .BlobStore import BLOB_CACHE_SIZE, BlobStore, MissingBlobsError
+from .Codec import Codec
+from .CodecRegistry import codec_registry
+from .CommandPool import CommandPool
+from .Compressor import Compressor
+from .compressors import register_zlib_dictionary
+from .GetMissingBlobs import GetMissingBlobs
+from .GetServerCodecs import GetServerCodecs
 from .ICommand import ICommand
-from .json_io import json_unzip, json_zip
+from .json_io import (
+    BLOB_THRESHOLD,
+    COMPRESSION_THRESHOLD,
+    DEFAULT_CODEC,
+    SHARED_MEMORY_THRESHOLD,
+    FORMAT_STRUCT,
+    json_unzip,
+    json_zip,
+    read_blob_digests,
+    read_header,
+)
+from .LazyCommand import LazyCommand
+from .Serializer import Serializer
 from .ShutdownServer import ShutdownServer
+from .SharedMemoryReader import SharedMemoryReader
+from .SharedMemoryWriter import SharedMemoryWriter
+from .SlotsCommand import SlotsCommand
+from .StoreBlobs import StoreBlobs
+from .StreamCompressor import StreamCompressor
+from .StreamDecompressor import StreamDecompressor
+from .StructCommand import StructCommand
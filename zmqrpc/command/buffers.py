@@ -0,0 +1,90 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import List, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Buffers in a message are sent as separate frames after the body. The body
+# keeps a placeholder {BUFFER_KEY: [frame index, kind, ...]} in their place.
+BUFFER_KEY = '_buf_'
+
+_BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+
+def is_buffer(obj: object) -> bool:
+    return isinstance(obj, _BUFFER_TYPES) or (
+        numpy is not None and isinstance(obj, numpy.ndarray)
+    )
+
+
+def dump_buffer(obj: object, buffers: List[object]) -> dict:
+    '''
+    Appends the contents of a buffer object to buffers and returns the
+    placeholder to serialize instead.
+    '''
+
+    index = len(buffers)
+
+    if isinstance(obj, bytes):
+        buffers.append(obj)
+        return {BUFFER_KEY: [index, 'bytes']}
+
+    if isinstance(obj, bytearray):
+        buffers.append(obj)
+        return {BUFFER_KEY: [index, 'bytearray']}
+
+    if isinstance(obj, memoryview):
+        spec = [index, 'memoryview', obj.format, list(obj.shape)]
+        if not obj.c_contiguous:
+            obj = memoryview(obj.tobytes())
+        buffers.append(obj.cast('B'))
+        return {BUFFER_KEY: spec}
+
+    if obj.dtype.hasobject:
+        raise TypeError('arrays of python objects cannot be sent as buffers')
+
+    obj = numpy.ascontiguousarray(obj)
+    buffers.append(obj.reshape(-1).view(numpy.uint8))
+    return {BUFFER_KEY: [index, 'ndarray', obj.dtype.str, list(obj.shape)]}
+
+
+def load_buffer(spec: Sequence[object], buffers: Sequence[memoryview]) \
+        -> object:
+    '''
+    Rebuilds the object of a placeholder. Memory views and arrays share the
+    memory of the received frame, which makes them read-only.
+    '''
+
+    index, kind = spec[0], spec[1]
+    buffer = buffers[index]
+
+    if kind == 'bytes':
+        return bytes(buffer)
+
+    if kind == 'bytearray':
+        return bytearray(buffer)
+
+    if kind == 'memoryview':
+        # memoryview refuses a shape with zeros; a flat view needs no shape.
+        if len(spec[3]) == 1:
+            return buffer.cast('B').cast(spec[2])
+
+        return buffer.cast('B').cast(spec[2], spec[3])
+
+    if kind == 'ndarray':
+        if numpy is None:
+            raise RuntimeError('numpy is needed to decode array buffers')
+
+        return numpy.frombuffer(buffer, dtype=spec[2]).reshape(spec[3])
+
+    raise RuntimeError('unknown buffer kind "%s"' % kind)
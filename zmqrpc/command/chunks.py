@@ -0,0 +1,112 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+from .Compressor import Compressor
+
+# Bodies larger than this are cut into chunks of this size that are
+# compressed independently on a thread pool. The compressors release the
+# GIL, so the chunks are processed on all cores.
+CHUNK_SIZE = 4 * 1024 * 1024
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Process that created the pool. A forked child inherits the pool without its
+# worker threads, so chunks submitted there would never be processed.
+_executor_pid = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                thread_name_prefix='zmqrpc-chunks',
+            )
+            _executor_pid = os.getpid()
+
+    return _executor
+
+
+def _reset_executor() -> None:
+    global _executor, _executor_lock
+
+    # Another thread may have held the lock while the process forked.
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def compress_chunks(
+        compressor: Compressor,
+        body: bytes,
+        level: int = -1,
+        chunk_size: int = CHUNK_SIZE) -> List[bytes]:
+    view = memoryview(body)
+
+    return list(_get_executor().map(
+        lambda offset: compressor.compress(
+            view[offset:offset + chunk_size],
+            level,
+        ),
+        range(0, len(view), chunk_size),
+    ))
+
+
+def decompress_chunks(
+        compressor: Compressor,
+        chunks: Sequence[memoryview],
+        max_size: Optional[int] = None) -> bytes:
+    if max_size is None or len(chunks) <= 1:
+        return b''.join(_get_executor().map(
+            lambda chunk: compressor.decompress(chunk, max_size),
+            chunks,
+        ))
+
+    # compress_chunks cuts bodies in chunks of the same size but the last.
+    # The first chunk therefore tells the size of the others, which bounds
+    # each of them before they are decompressed in parallel, and the body
+    # as a whole to max_size.
+    first = compressor.decompress(chunks[0], max_size)
+    chunk_size = len(first)
+    last_size = max_size - chunk_size * (len(chunks) - 1)
+
+    if chunk_size == 0 or last_size <= 0:
+        raise RuntimeError(
+            'decompressed body of %d chunks exceeds %d bytes' % (
+                len(chunks),
+                max_size,
+            )
+        )
+
+    def decompress(index: int) -> bytes:
+        is_last = index == len(chunks) - 1
+        chunk = compressor.decompress(
+            chunks[index],
+            min(chunk_size, last_size) if is_last else chunk_size,
+        )
+
+        if not is_last and len(chunk) != chunk_size:
+            raise RuntimeError('chunk %d is shorter than the others' % index)
+
+        return chunk
+
+    return b''.join((
+        first,
+        *_get_executor().map(decompress, range(1, len(chunks))),
+    ))
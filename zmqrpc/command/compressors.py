@@ -0,0 +1,196 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import bz2
+import lzma
+import zlib
+from functools import partial
+from typing import Optional
+
+from .CodecRegistry import codec_registry
+from .Compressor import Compressor, StreamFunction
+
+COMPRESSOR_NONE = 0x00
+COMPRESSOR_ZLIB = 0x01
+COMPRESSOR_LZMA = 0x02
+COMPRESSOR_BZ2 = 0x03
+COMPRESSOR_ZDICT = 0x04
+
+COMPRESSOR_MASK = 0x0F
+
+# Every sync flush ends with this empty stored block. It is left out on the
+# wire and appended again before decompressing.
+_SYNC_FLUSH_TAIL = b'\x00\x00\xff\xff'
+
+
+def _check_size(data: bytes, max_size: Optional[int]) -> bytes:
+    if max_size is not None and len(data) > max_size:
+        raise RuntimeError(
+            'decompressed body exceeds %d bytes' % max_size
+        )
+
+    return data
+
+
+def _store(data: bytes, _: int) -> bytes:
+    return data
+
+
+def _load(data: bytes, max_size: Optional[int] = None) -> bytes:
+    return _check_size(bytes(data), max_size)
+
+
+def _decompress_bounded(
+        decompressor: object,
+        data: bytes,
+        max_size: Optional[int],
+        unlimited: int) -> bytes:
+    # Ask for one byte more than allowed to find out whether the body is
+    # too large without decompressing any further.
+    data = _check_size(
+        decompressor.decompress(
+            data,
+            unlimited if max_size is None else max_size + 1,
+        ),
+        max_size,
+    )
+
+    if not decompressor.eof:
+        raise RuntimeError('incomplete compressed data')
+
+    return data
+
+
+def _zlib_compress(data: bytes, level: int, zdict: bytes = b'') -> bytes:
+    compressor = zlib.compressobj(level, zdict=zdict) \
+        if zdict else zlib.compressobj(level)
+
+    return compressor.compress(data) + compressor.flush()
+
+
+def _zlib_decompress(
+        data: bytes,
+        max_size: Optional[int] = None,
+        zdict: bytes = b'') -> bytes:
+    decompressor = zlib.decompressobj(zdict=zdict) \
+        if zdict else zlib.decompressobj()
+
+    return _decompress_bounded(decompressor, data, max_size, 0)
+
+
+def _bz2_decompress(data: bytes, max_size: Optional[int] = None) -> bytes:
+    return _decompress_bounded(bz2.BZ2Decompressor(), data, max_size, -1)
+
+
+def _lzma_decompress(data: bytes, max_size: Optional[int] = None) -> bytes:
+    return _decompress_bounded(lzma.LZMADecompressor(), data, max_size, -1)
+
+
+def _zlib_compress_stream(level: int, zdict: bytes = b'') -> StreamFunction:
+    compressor = zlib.compressobj(level, zdict=zdict) \
+        if zdict else zlib.compressobj(level)
+
+    def compress(data: bytes) -> bytes:
+        return (
+            compressor.compress(data) +
+            compressor.flush(zlib.Z_SYNC_FLUSH)
+        )[:-len(_SYNC_FLUSH_TAIL)]
+
+    return compress
+
+
+def _zlib_decompress_stream(zdict: bytes = b'') -> StreamFunction:
+    decompressor = zlib.decompressobj(zdict=zdict) \
+        if zdict else zlib.decompressobj()
+
+    def decompress(data: bytes, max_size: Optional[int] = None) -> bytes:
+        data = _check_size(
+            decompressor.decompress(
+                bytes(data) + _SYNC_FLUSH_TAIL,
+                0 if max_size is None else max_size + 1,
+            ),
+            max_size,
+        )
+
+        if decompressor.unconsumed_tail:
+            raise RuntimeError('incomplete compressed data')
+
+        return data
+
+    return decompress
+
+
+def register_zlib_dictionary(
+        zdict: bytes,
+        compressor_id: int = COMPRESSOR_ZDICT,
+        name: str = 'zdict') -> Compressor:
+    '''
+    Registers a zlib compressor primed with a preset dictionary, e.g. one
+    trained from sample traffic with misc/zmqdict.py. Both peers have to
+    register the same dictionary under the same id; zlib rejects bodies
+    compressed with a different dictionary.
+    '''
+
+    compressor = Compressor(
+        compressor_id=compressor_id,
+        name=name,
+        compress=partial(_zlib_compress, zdict=zdict),
+        decompress=partial(_zlib_decompress, zdict=zdict),
+        default_level=6,
+        compress_stream=partial(_zlib_compress_stream, zdict=zdict),
+        decompress_stream=partial(_zlib_decompress_stream, zdict=zdict),
+    )
+
+    codec_registry.register_compressor(compressor)
+
+    return compressor
+
+
+# Registered from the cheapest to the most expensive in CPU time.
+codec_registry.register_compressor(
+    Compressor(
+        compressor_id=COMPRESSOR_NONE,
+        name='none',
+        compress=_store,
+        decompress=_load,
+        default_level=0,
+    )
+)
+
+codec_registry.register_compressor(
+    Compressor(
+        compressor_id=COMPRESSOR_ZLIB,
+        name='zlib',
+        compress=zlib.compress,
+        decompress=_zlib_decompress,
+        default_level=6,
+        compress_stream=_zlib_compress_stream,
+        decompress_stream=_zlib_decompress_stream,
+    )
+)
+
+codec_registry.register_compressor(
+    Compressor(
+        compressor_id=COMPRESSOR_BZ2,
+        name='bz2',
+        compress=bz2.compress,
+        decompress=_bz2_decompress,
+        default_level=9,
+    )
+)
+
+codec_registry.register_compressor(
+    Compressor(
+        compressor_id=COMPRESSOR_LZMA,
+        name='lzma',
+        compress=lambda data, level: lzma.compress(data, preset=level),
+        decompress=_lzma_decompress,
+        default_level=6,
+    )
+)
@@ -11,9 +11,68 @@ Created on Oct 2020
 
 import base64
 import json
-import zlib
+import struct
+from typing import Callable, Container, List, Optional, Tuple
 
+from ..base import Frame, Message, frame_buffer
+from .BlobStore import BlobStore, MissingBlobsError
+from .SharedMemoryReader import SharedMemoryReader
+from .SharedMemoryWriter import SharedMemoryWriter
+from .chunks import CHUNK_SIZE, compress_chunks, decompress_chunks
+from .CodecRegistry import codec_registry
+from .CommandDatabase import command_database
+from .CommandPool import CommandPool
+from .compressors import COMPRESSOR_NONE, COMPRESSOR_ZLIB
+from .ICommand import ICommand
 from .JsonEncoder import JsonEncoder
+from .serializers import SERIALIZER_JSON, SERIALIZER_STRUCT
+from .StructCommand import StructCommand
+
+# Binary messages travel as a header frame, the body frame and one frame per
+# buffer object found in the body (bytes, memory views, arrays...).
+# The first byte of the header is the format tag; its high nibble names the
+# serializer and its low nibble names the compressor of the body. The second
+# byte holds flags; older peers send a one byte header without them.
+FORMAT_JSON = SERIALIZER_JSON | COMPRESSOR_NONE
+FORMAT_JSON_ZLIB = SERIALIZER_JSON | COMPRESSOR_ZLIB
+# StructCommand bodies, packed with the struct layout of the command.
+FORMAT_STRUCT = SERIALIZER_STRUCT | COMPRESSOR_NONE
+
+# Every peer understands this codec; it is used until a client negotiates
+# a different one with its servers.
+DEFAULT_CODEC = 'json+zlib'
+
+# Bodies smaller than this many bytes are sent uncompressed. Compressors
+# make them larger and their fixed cost dominates the encoding time.
+COMPRESSION_THRESHOLD = 1024
+
+# Buffers of at least this many bytes are replaced by their content hash when
+# a blob store is given to json_zip.
+BLOB_THRESHOLD = 64 * 1024
+
+# Buffers of at least this many bytes are passed in shared memory segments
+# when a shared memory writer is given to json_zip.
+SHARED_MEMORY_THRESHOLD = 1024 * 1024
+
+# The body holds no command below the top level and no buffer placeholder.
+FLAG_FLAT = 0x01
+# The body belongs to a compression stream of a PUB socket. The header ends
+# with the 4 byte sequence number of the message in its stream.
+FLAG_STREAM = 0x02
+# The message starts a new compression stream.
+FLAG_STREAM_RESET = 0x04
+# The body is split into independently compressed chunks, one per frame.
+# The header holds their 4 byte count.
+FLAG_CHUNKED = 0x08
+# The body is a command whose 4 byte id follows the flags in the header, so
+# the command can be routed without decoding the body.
+FLAG_COMMAND_ID = 0x10
+# Some buffer frames hold the digest of a blob instead of the buffer. A frame
+# with their packed 4 byte indexes follows the body frames.
+FLAG_BLOBS = 0x20
+# Some buffer frames hold the handle of a shared memory segment instead of
+# the buffer. A frame with their indexes follows the frame of FLAG_BLOBS.
+FLAG_SHARED_MEMORY = 0x40
 
 
 def json_dump(
@@ -47,18 +106,239 @@ def json_load(j: str) -> object:
     )
 
 
-def json_zip(j: object) -> str:
-    return base64.b64encode(
-        zlib.compress(
-            json_dump(j).encode('utf-8')
+def _make_header(
+        format_tag: int,
+        flags: int,
+        command_id: Optional[int],
+        chunk_count: Optional[int] = None) -> bytes:
+    header = bytes((
+        format_tag,
+        flags |
+        (FLAG_COMMAND_ID if command_id is not None else 0) |
+        (FLAG_CHUNKED if chunk_count is not None else 0),
+    ))
+
+    if command_id is not None:
+        header += command_id.to_bytes(4, 'big')
+
+    if chunk_count is not None:
+        header += chunk_count.to_bytes(4, 'big')
+
+    return header
+
+
+def read_header(frame: Frame) -> Tuple[int, int, Optional[int], int]:
+    '''
+    Returns the format tag, the flags, the command id (if any) and the
+    number of body frames of a binary message.
+    '''
+
+    header = frame_buffer(frame)
+    format_tag = header[0]
+    flags = header[1] if len(header) > 1 else 0
+
+    offset = 2
+    command_id = None
+    if flags & FLAG_COMMAND_ID:
+        command_id = int.from_bytes(header[offset:offset + 4], 'big')
+        offset += 4
+
+    chunk_count = 1
+    if flags & FLAG_CHUNKED:
+        chunk_count = int.from_bytes(header[offset:offset + 4], 'big')
+
+    return format_tag, flags, command_id, chunk_count
+
+
+def _replace_buffers(
+        buffers: List[Frame],
+        threshold: int,
+        replace: Callable[[Frame], bytes]) -> Optional[bytes]:
+    # Replaces large buffers by what replace returns for them and returns
+    # the frame with their indexes, if any.
+    indexes = [
+        index
+        for index, buffer in enumerate(buffers)
+        if memoryview(buffer).nbytes >= threshold
+    ]
+
+    if not indexes:
+        return None
+
+    for index in indexes:
+        buffers[index] = replace(buffers[index])
+
+    return struct.pack('!%dI' % len(indexes), *indexes)
+
+
+def _unpack_indexes(frame: Frame) -> Tuple[int, ...]:
+    index_frame = frame_buffer(frame)
+    return struct.unpack('!%dI' % (len(index_frame) // 4), index_frame)
+
+
+def _load_shared_memory(
+        index_frame: Frame,
+        buffers: List[memoryview],
+        shared_memory: Optional[SharedMemoryReader]) -> None:
+    if shared_memory is None:
+        raise RuntimeError(
+            'the message refers to shared memory but shared memory is not '
+            'enabled'
+        )
+
+    for index in _unpack_indexes(index_frame):
+        buffers[index] = shared_memory.get(buffers[index])
+
+
+def _load_blobs(
+        index_frame: Frame,
+        buffers: List[memoryview],
+        blob_store: Optional[BlobStore]) -> None:
+    if blob_store is None:
+        raise RuntimeError(
+            'the message refers to blobs but there is no blob store'
+        )
+
+    missing = []
+    for index in _unpack_indexes(index_frame):
+        digest = bytes(buffers[index])
+        blob = blob_store.get(digest)
+
+        if blob is None:
+            missing.append(digest)
+        else:
+            buffers[index] = memoryview(blob)
+
+    if missing:
+        raise MissingBlobsError(missing)
+
+
+def read_blob_digests(j: Message) -> Tuple[bytes, ...]:
+    '''
+    Returns the digests of the blobs a message made by json_zip refers to.
+    '''
+
+    if isinstance(j, str):
+        return ()
+
+    _, flags, _, count = read_header(j[0])
+    if not flags & FLAG_BLOBS:
+        return ()
+
+    # The frame of FLAG_SHARED_MEMORY may follow the one of FLAG_BLOBS.
+    offset = 2 + count + (1 if flags & FLAG_SHARED_MEMORY else 0)
+
+    return tuple(
+        bytes(frame_buffer(j[offset + index]))
+        for index in _unpack_indexes(j[1 + count])
+    )
+
+
+def json_zip(
+        j: object,
+        compression_threshold: int = COMPRESSION_THRESHOLD,
+        codec: str = DEFAULT_CODEC,
+        chunk_size: int = CHUNK_SIZE,
+        blob_store: Optional[BlobStore] = None,
+        blob_threshold: int = BLOB_THRESHOLD,
+        shared_memory: Optional[SharedMemoryWriter] = None,
+        shared_memory_threshold: int = SHARED_MEMORY_THRESHOLD) \
+        -> Tuple[Frame, ...]:
+    '''
+    Encodes an object into the frames of a binary message. With a blob
+    store, buffers of at least blob_threshold bytes are put in the store and
+    only their digest is sent. With a shared memory writer, buffers of at
+    least shared_memory_threshold bytes are copied to shared memory segments
+    and only their handle is sent.
+    '''
+
+    if isinstance(j, StructCommand):
+        return (
+            _make_header(FORMAT_STRUCT, FLAG_FLAT, j.command_id),
+            j.pack(),
+        )
+
+    codec = codec_registry.get_codec(codec)
+    serializer = codec.serializer
+
+    buffers: List[Frame] = []
+    body, flat = serializer.dumps(j, buffers)
+    flags = FLAG_FLAT if flat else 0
+    command_id = j.command_id if isinstance(j, ICommand) else None
+
+    index_frames = []
+
+    if shared_memory is not None:
+        shared_memory_index = _replace_buffers(
+            buffers,
+            shared_memory_threshold,
+            shared_memory.put,
         )
-    ).decode('ascii')
+        if shared_memory_index is not None:
+            flags |= FLAG_SHARED_MEMORY
+            index_frames.append(shared_memory_index)
+
+    if blob_store is not None:
+        blob_index = _replace_buffers(buffers, blob_threshold, blob_store.put)
+        if blob_index is not None:
+            flags |= FLAG_BLOBS
+            index_frames.insert(0, blob_index)
+
+    buffers[:0] = index_frames
+
+    # Commands choose their own level. A level of 0 disables compression.
+    compression_level = getattr(j, 'compression_level', -1)
 
+    if len(body) < compression_threshold or compression_level == 0:
+        pass
+    elif len(body) > chunk_size:
+        chunks = compress_chunks(
+            codec.compressor,
+            body,
+            compression_level,
+            chunk_size,
+        )
+
+        if sum(len(chunk) for chunk in chunks) < len(body):
+            return (
+                _make_header(
+                    codec.format_tag,
+                    flags,
+                    command_id,
+                    len(chunks),
+                ),
+                *chunks,
+                *buffers,
+            )
+    else:
+        compressed_body = codec.compressor.compress(body, compression_level)
+
+        if len(compressed_body) < len(body):
+            return (
+                _make_header(codec.format_tag, flags, command_id),
+                compressed_body,
+                *buffers,
+            )
+
+    return (
+        _make_header(
+            serializer.serializer_id | COMPRESSOR_NONE,
+            flags,
+            command_id,
+        ),
+        body,
+        *buffers,
+    )
 
-def json_unzip(j: str) -> object:
 
+def _json_unzip_text(j: str, max_body_size: Optional[int]) -> object:
+    # Messages of clients that predate the binary format are base64 encoded
+    # text. Keep decoding them until all peers are upgraded.
     try:
-        j = zlib.decompress(base64.b64decode(j))
+        j = codec_registry.get_compressor(COMPRESSOR_ZLIB).decompress(
+            base64.b64decode(j),
+            max_body_size,
+        )
     except BaseException as e:
         raise RuntimeError('Could not decode/unzip the contents') from e
 
@@ -68,3 +348,115 @@ def json_unzip(j: str) -> object:
         raise RuntimeError('Could not interpret the unzipped contents') from e
 
     return j
+
+
+def _struct_unzip(
+        command_id: Optional[int],
+        body: memoryview,
+        command_pool: Optional[CommandPool]) -> object:
+    command_class = command_database[command_id]
+
+    if not issubclass(command_class, StructCommand):
+        raise RuntimeError(
+            'command "%s" is not a struct command' % command_class.__name__
+        )
+
+    if command_pool is not None:
+        return command_class.unpack(
+            body,
+            command=command_pool.acquire(command_class),
+        )
+
+    return command_class.unpack(body)
+
+
+def json_unzip(
+        j: Message,
+        formats: Optional[Container[int]] = None,
+        max_body_size: Optional[int] = None,
+        blob_store: Optional[BlobStore] = None,
+        shared_memory: Optional[SharedMemoryReader] = None,
+        command_pool: Optional[CommandPool] = None) -> object:
+    '''
+    Decodes a message made by json_zip. formats optionally restricts the
+    accepted format tags. Messages whose body decompresses to more than
+    max_body_size bytes are rejected before the excess is decompressed.
+    Blobs the message refers to are taken from blob_store; MissingBlobsError
+    lists those that are not there. Shared memory segments are mapped by
+    shared_memory. Commands are reused from command_pool when one is given.
+    '''
+
+    if isinstance(j, str):
+        return _json_unzip_text(j, max_body_size)
+
+    try:
+        format_tag, flags, command_id, count = read_header(j[0])
+        flat = bool(flags & FLAG_FLAT)
+
+        if flags & FLAG_STREAM:
+            raise RuntimeError(
+                'stream compressed messages are decompressed by their socket'
+            )
+
+        if formats is not None and format_tag not in formats:
+            raise RuntimeError(
+                'message format 0x%02x is not accepted' % format_tag
+            )
+
+        if format_tag == FORMAT_STRUCT:
+            return _struct_unzip(
+                command_id,
+                frame_buffer(j[1]),
+                command_pool,
+            )
+
+        codec = codec_registry.get_format(format_tag)
+
+        if flags & FLAG_CHUNKED:
+            if not 0 < count < len(j):
+                raise RuntimeError(
+                    'message announces %d chunks in %d frames' % (
+                        count,
+                        len(j) - 1,
+                    )
+                )
+
+            body = decompress_chunks(
+                codec.compressor,
+                tuple(frame_buffer(frame) for frame in j[1:1 + count]),
+                max_body_size,
+            )
+        else:
+            body = codec.compressor.decompress(
+                frame_buffer(j[1]),
+                max_body_size,
+            )
+
+        frames = j[1 + count:]
+
+        blob_index = None
+        if flags & FLAG_BLOBS:
+            blob_index, frames = frames[0], frames[1:]
+
+        shared_memory_index = None
+        if flags & FLAG_SHARED_MEMORY:
+            shared_memory_index, frames = frames[0], frames[1:]
+
+        buffers = [frame_buffer(frame) for frame in frames]
+
+        if shared_memory_index is not None:
+            _load_shared_memory(shared_memory_index, buffers, shared_memory)
+
+        if blob_index is not None:
+            _load_blobs(blob_index, buffers, blob_store)
+    except MissingBlobsError:
+        raise
+    except BaseException as e:
+        raise RuntimeError('Could not decode/unzip the contents') from e
+
+    try:
+        j = codec.serializer.loads(body, buffers, flat, command_pool)
+    except BaseException as e:
+        raise RuntimeError('Could not interpret the unzipped contents') from e
+
+    return j
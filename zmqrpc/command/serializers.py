@@ -0,0 +1,164 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import json
+import marshal
+from functools import partial
+from typing import List, Optional, Sequence, Tuple
+
+from .buffers import dump_buffer, is_buffer
+from .CodecRegistry import codec_registry
+from .CommandPool import CommandPool
+from .ICommand import ICommand
+from .JsonEncoder import JsonEncoder
+from .Serializer import Serializer
+
+SERIALIZER_STRUCT = 0x30
+SERIALIZER_MARSHAL = 0x20
+SERIALIZER_JSON = 0x10
+
+SERIALIZER_MASK = 0xF0
+
+
+def _is_flat(obj: object, command_count: int, buffers: List[object]) -> bool:
+    # Only the top level command, if any, needs to be rebuilt.
+    return not buffers and command_count <= int(isinstance(obj, ICommand))
+
+
+def _json_dumps(obj: object, buffers: List[object]) -> Tuple[bytes, bool]:
+    encoder = JsonEncoder(buffers=buffers)
+    body = encoder.encode(obj).encode('utf-8')
+
+    return body, _is_flat(obj, encoder.command_count, buffers)
+
+
+def _json_loads(
+        data: bytes,
+        buffers: Sequence[memoryview],
+        flat: bool,
+        command_pool: Optional[CommandPool]) -> object:
+    if flat:
+        # Plain nested data stays on the C decoder without any callback.
+        return JsonEncoder.object_hook(
+            json.loads(data),
+            command_pool=command_pool,
+        )
+
+    object_hook = JsonEncoder.object_hook
+    if buffers or command_pool is not None:
+        object_hook = partial(
+            object_hook,
+            buffers=buffers,
+            command_pool=command_pool,
+        )
+
+    return json.loads(data, object_hook=object_hook)
+
+
+def _to_marshal(
+        obj: object,
+        buffers: List[object],
+        commands: List[ICommand]) -> object:
+    # marshal only knows the builtin types. Commands and buffers are wrapped
+    # in the same envelopes the json serializer uses.
+    if isinstance(obj, ICommand):
+        commands.append(obj)
+        return {
+            JsonEncoder.ICommandKey: (
+                obj.command_id,
+                _to_marshal(obj.get_command_state(), buffers, commands),
+            ),
+        }
+
+    if isinstance(obj, dict):
+        return {
+            key: _to_marshal(value, buffers, commands)
+            for key, value in obj.items()
+        }
+
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(
+            _to_marshal(value, buffers, commands)
+            for value in obj
+        )
+
+    if is_buffer(obj):
+        return dump_buffer(obj, buffers)
+
+    return obj
+
+
+def _from_marshal(
+        obj: object,
+        buffers: Sequence[memoryview],
+        command_pool: Optional[CommandPool]) -> object:
+    if isinstance(obj, dict):
+        return JsonEncoder.object_hook(
+            {
+                key: _from_marshal(value, buffers, command_pool)
+                for key, value in obj.items()
+            },
+            buffers=buffers,
+            command_pool=command_pool,
+        )
+
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(
+            _from_marshal(value, buffers, command_pool)
+            for value in obj
+        )
+
+    return obj
+
+
+def _marshal_dumps(obj: object, buffers: List[object]) -> Tuple[bytes, bool]:
+    commands: List[ICommand] = []
+    body = marshal.dumps(_to_marshal(obj, buffers, commands))
+
+    return body, _is_flat(obj, len(commands), buffers)
+
+
+def _marshal_loads(
+        data: bytes,
+        buffers: Sequence[memoryview],
+        flat: bool,
+        command_pool: Optional[CommandPool]) -> object:
+    if flat:
+        return JsonEncoder.object_hook(
+            marshal.loads(data),
+            command_pool=command_pool,
+        )
+
+    return _from_marshal(marshal.loads(data), buffers, command_pool)
+
+
+# SERIALIZER_STRUCT is reserved for StructCommand bodies. It only encodes
+# those commands and is therefore not registered as a codec.
+
+# Registered from the cheapest to the most expensive in CPU time.
+# marshal is not hardened against crafted input, so servers only accept it
+# when it is listed in their codecs; only do so for trusted peers.
+codec_registry.register_serializer(
+    Serializer(
+        serializer_id=SERIALIZER_MARSHAL,
+        name='marshal',
+        dumps=_marshal_dumps,
+        loads=_marshal_loads,
+        is_safe=False,
+    )
+)
+
+codec_registry.register_serializer(
+    Serializer(
+        serializer_id=SERIALIZER_JSON,
+        name='json',
+        dumps=_json_dumps,
+        loads=_json_loads,
+    )
+)
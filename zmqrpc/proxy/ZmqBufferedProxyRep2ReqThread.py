@@ -33,7 +33,8 @@ class ZmqBufferedProxyRep2ReqThread(Thread):
             username_rep=None,
             password_rep=None,
             username_req=None,
-            password_req=None):
+            password_req=None,
+            max_message_size=None):
         super().__init__()
 
         self.__proxy0 = ZmqProxyRep2PubThread(
@@ -42,6 +43,7 @@ class ZmqBufferedProxyRep2ReqThread(Thread):
             recreate_timeout=100000,
             username_rep=username_rep,
             password_rep=password_rep,
+            max_message_size=max_message_size,
         )
 
         self.__proxy1 = ZmqProxySub2ReqThread(
@@ -11,11 +11,17 @@ Created on Oct 2020
 
 from typing import Optional, Tuple
 
+from ..base import Message
 from ..receiver import SubSocketAddress, ZmqReceiver
 from ..sender import ZmqSender
 
 
 class ZmqProxy(ZmqReceiver):
+    '''
+    Forwards the messages received over REP or SUB to REQ or PUB endpoints.
+    Messages are forwarded as they are, so recv_max_body_size only bounds the
+    messages that subscribers decompress from a compressed stream.
+    '''
 
     def __init__(
             self,
@@ -28,13 +34,17 @@ class ZmqProxy(ZmqReceiver):
             send_req_endpoints: Tuple[str, ...] = None,
             send_pub_endpoint: Optional[str] = None,
             send_username: Optional[str] = None,
-            send_password: Optional[str] = None):
+            send_password: Optional[str] = None,
+            recv_max_message_size: Optional[int] = None,
+            recv_max_body_size: Optional[int] = None):
         super().__init__(
             zmq_rep_bind_address=recv_rep_bind_address,
             zmq_sub_connect_addresses=recv_sub_connect_addresses,
             recreate_timeout=recv_recreate_timeout,
             username=recv_username,
             password=recv_password,
+            max_message_size=recv_max_message_size,
+            max_body_size=recv_max_body_size,
         )
 
         self.__proxy_timeout = proxy_timeout
@@ -45,21 +55,22 @@ class ZmqProxy(ZmqReceiver):
             password=send_password,
         )
 
-    def handle_incoming_message(self, message: str) -> Optional[str]:
+    def handle_incoming_message(self, message: Message) -> Optional[Message]:
         try:
             self._debug('marshaling proxy message')
             self.__sender.send(
                 message=message,
                 time_out_in_sec=self.__proxy_timeout,
             )
-            return self.create_response_message(
+            return self._create_response(
+                message=message,
                 status_code=self.STATUS_CODE_OK,
                 status_message=self.STATUS_MSG_OK,
             )
         except Exception as e:
             self._error(e)
-            return self.create_response_message(
+            return self._create_response(
+                message=message,
                 status_code=self.STATUS_CODE_PROXY_ERROR,
-                status_message='Error',
-                response_message=e,
+                status_message='Proxy error: {0}'.format(e),
             )
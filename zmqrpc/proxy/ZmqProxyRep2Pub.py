@@ -33,7 +33,8 @@ class ZmqProxyRep2Pub(ZmqProxy):
             username_rep: Optional[str] = None,
             password_rep: Optional[str] = None,
             username_pub: Optional[str] = None,
-            password_pub: Optional[str] = None):
+            password_pub: Optional[str] = None,
+            max_message_size: Optional[int] = None):
         super().__init__(
             recv_rep_bind_address=zmq_rep_bind_address,
             recv_recreate_timeout=recreate_timeout,
@@ -43,4 +44,5 @@ class ZmqProxyRep2Pub(ZmqProxy):
             send_pub_endpoint=zmq_pub_bind_address,
             send_username=username_pub,
             send_password=password_pub,
+            recv_max_message_size=max_message_size,
         )
@@ -28,7 +28,8 @@ class ZmqProxyRep2PubThread(ZmqProxyThread):
             username_rep: Optional[str] = None,
             password_rep: Optional[str] = None,
             username_pub: Optional[str] = None,
-            password_pub: Optional[str] = None):
+            password_pub: Optional[str] = None,
+            max_message_size: Optional[int] = None):
         super().__init__()
 
         self._set_proxy(
@@ -41,5 +42,6 @@ class ZmqProxyRep2PubThread(ZmqProxyThread):
                 password_rep=password_rep,
                 username_pub=username_pub,
                 password_pub=password_pub,
+                max_message_size=max_message_size,
             )
         )
@@ -33,7 +33,8 @@ class ZmqProxyRep2Req(ZmqProxy):
             username_rep: Optional[str] = None,
             password_rep: Optional[str] = None,
             username_req: Optional[str] = None,
-            password_req: Optional[str] = None):
+            password_req: Optional[str] = None,
+            max_message_size: Optional[int] = None):
         super().__init__(
             recv_rep_bind_address=zmq_rep_bind_address,
             recv_recreate_timeout=recreate_timeout,
@@ -43,4 +44,5 @@ class ZmqProxyRep2Req(ZmqProxy):
             send_req_endpoints=zmq_req_connect_addresses,
             send_username=username_req,
             send_password=password_req,
+            recv_max_message_size=max_message_size,
         )
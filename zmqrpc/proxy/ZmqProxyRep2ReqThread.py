@@ -28,7 +28,8 @@ class ZmqProxyRep2ReqThread(ZmqProxyThread):
             username_rep: Optional[str] = None,
             password_rep: Optional[str] = None,
             username_req: Optional[str] = None,
-            password_req: Optional[str] = None):
+            password_req: Optional[str] = None,
+            max_message_size: Optional[int] = None):
         super().__init__()
 
         self._set_proxy(
@@ -41,5 +42,6 @@ class ZmqProxyRep2ReqThread(ZmqProxyThread):
                 password_rep=password_rep,
                 username_req=username_req,
                 password_req=password_req,
+                max_message_size=max_message_size,
             )
         )
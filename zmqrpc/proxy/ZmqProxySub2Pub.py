@@ -35,7 +35,9 @@ class ZmqProxySub2Pub(ZmqProxy):
             username_sub: Optional[str] = None,
             password_sub: Optional[str] = None,
             username_pub: Optional[str] = None,
-            password_pub: Optional[str] = None):
+            password_pub: Optional[str] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None):
         super().__init__(
             recv_sub_connect_addresses=zmq_sub_connect_addresses,
             recv_recreate_timeout=recreate_timeout,
@@ -45,4 +47,6 @@ class ZmqProxySub2Pub(ZmqProxy):
             send_pub_endpoint=zmq_pub_bind_address,
             send_username=username_pub,
             send_password=password_pub,
+            recv_max_message_size=max_message_size,
+            recv_max_body_size=max_body_size,
         )
@@ -29,7 +29,9 @@ class ZmqProxySub2PubThread(ZmqProxyThread):
             username_sub: Optional[str] = None,
             password_sub: Optional[str] = None,
             username_pub: Optional[str] = None,
-            password_pub: Optional[str] = None):
+            password_pub: Optional[str] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None):
         super().__init__()
 
         self._set_proxy(
@@ -42,5 +44,7 @@ class ZmqProxySub2PubThread(ZmqProxyThread):
                 password_sub=password_sub,
                 username_pub=username_pub,
                 password_pub=password_pub,
+                max_message_size=max_message_size,
+                max_body_size=max_body_size,
             )
         )
@@ -34,7 +34,9 @@ class ZmqProxySub2Req(ZmqProxy):
             username_sub: Optional[str] = None,
             password_sub: Optional[str] = None,
             username_req: Optional[str] = None,
-            password_req: Optional[str] = None):
+            password_req: Optional[str] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None):
         super().__init__(
             recv_sub_connect_addresses=zmq_sub_connect_addresses,
             recv_recreate_timeout=recreate_timeout,
@@ -44,4 +46,6 @@ class ZmqProxySub2Req(ZmqProxy):
             send_req_endpoints=zmq_req_connect_addresses,
             send_username=username_req,
             send_password=password_req,
+            recv_max_message_size=max_message_size,
+            recv_max_body_size=max_body_size,
         )
@@ -28,7 +28,9 @@ class ZmqProxySub2ReqThread(ZmqProxyThread):
             username_sub: Optional[str] = None,
             password_sub: Optional[str] = None,
             username_req: Optional[str] = None,
-            password_req: Optional[str] = None):
+            password_req: Optional[str] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None):
         super().__init__()
 
         self._set_proxy(
@@ -41,5 +43,7 @@ class ZmqProxySub2ReqThread(ZmqProxyThread):
                 password_sub=password_sub,
                 username_req=username_req,
                 password_req=password_req,
+                max_message_size=max_message_size,
+                max_body_size=max_body_size,
             )
         )
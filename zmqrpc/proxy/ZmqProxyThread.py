@@ -14,6 +14,7 @@ Edited on Oct 2020
 from threading import Thread
 from typing import Optional
 
+from ..base import Message
 from .ZmqProxy import ZmqProxy
 
 
@@ -27,7 +28,7 @@ class ZmqProxyThread(Thread):
     def _set_proxy(self, proxy: ZmqProxy) -> None:
         self.__proxy = proxy
 
-    def get_last_received_message(self) -> Optional[str]:
+    def get_last_received_message(self) -> Optional[Message]:
         if self.__proxy is None:
             return None
 
@@ -17,21 +17,39 @@ from typing import Optional
 import zmq
 from zmq.auth.thread import ThreadAuthenticator
 
+from ..base import (
+    Message,
+    recv_message,
+    send_message,
+    send_routed_message,
+    split_envelope,
+)
 from ..logger import logger
 
 
 class RepSocket:
+    '''
+    The socket requests arrive on. With router it is a ROUTER socket that
+    keeps the envelope of the latest request for its response, so REQ
+    clients and pipelined DEALER clients with requests in flight are served
+    alike.
+    '''
 
     def __init__(
             self,
             ctx: zmq.Context,
             poller: zmq.Poller,
             address: str,
-            auth: Optional[ThreadAuthenticator]):
+            auth: Optional[ThreadAuthenticator],
+            max_message_size: Optional[int] = None,
+            router: bool = False):
         self.__ctx = ctx
         self.__poller = poller
         self.__address = address
         self.__auth = auth
+        self.__max_message_size = max_message_size
+        self.__router = router
+        self.__envelope = None
         self.__zmq_socket = None
 
         self.create()
@@ -40,10 +58,16 @@ class RepSocket:
         if self.__zmq_socket is not None:
             return
 
-        self.__zmq_socket = zmq_socket = self.__ctx.socket(zmq.REP)
+        self.__zmq_socket = zmq_socket = self.__ctx.socket(
+            zmq.ROUTER if self.__router else zmq.REP
+        )
 
         zmq_socket.setsockopt(zmq.LINGER, 0)
 
+        # ZMQ disconnects peers that send larger messages.
+        if self.__max_message_size is not None:
+            zmq_socket.setsockopt(zmq.MAXMSGSIZE, self.__max_message_size)
+
         if self.__auth:
             zmq_socket.plain_server = True
 
@@ -51,7 +75,11 @@ class RepSocket:
 
         self.__poller.register(zmq_socket, zmq.POLLIN)
 
-        logger.debug('Created REP socket bound to "%s"', self.__address)
+        logger.debug(
+            'Created %s socket bound to "%s"',
+            'ROUTER' if self.__router else 'REP',
+            self.__address,
+        )
 
     def destroy(self) -> None:
         if self.__zmq_socket is None:
@@ -75,14 +103,32 @@ class RepSocket:
 
         logger.debug('Destroyed REP socket bound to "%s"', self.__address)
 
-    def recv_string(self, socks: dict) -> Optional[str]:
-        if self.__zmq_socket is not None and (
-                socks.get(self.__zmq_socket) == zmq.POLLIN):
-            return self.__zmq_socket.recv_string()
-        return None
+    def recv_message(self, socks: dict) -> Optional[Message]:
+        if self.__zmq_socket is None or (
+                socks.get(self.__zmq_socket) != zmq.POLLIN):
+            return None
+
+        if not self.__router:
+            return recv_message(self.__zmq_socket)
+
+        frames = self.__zmq_socket.recv_multipart(copy=False)
+
+        try:
+            self.__envelope, message = split_envelope(frames)
+        except RuntimeError as e:
+            logger.warning('Dropped a message on "%s": %s', self.__address, e)
+            return None
 
-    def send(self, message: str) -> None:
+        return message
+
+    def send(self, message: Message) -> None:
         if self.__zmq_socket is None or message is None:
             return
 
-        self.__zmq_socket.send_string(message)
+        if not self.__router:
+            send_message(self.__zmq_socket, message)
+            return
+
+        envelope, self.__envelope = self.__envelope, None
+        if envelope is not None:
+            send_routed_message(self.__zmq_socket, envelope, message)
@@ -17,6 +17,8 @@ from typing import Optional, Tuple, Union
 import zmq
 import zmq.auth
 
+from ..base import Message, recv_message
+from ..command import StreamDecompressor
 from ..logger import logger
 
 SubSocketAddress = Union[str, Tuple[str, int]]
@@ -29,13 +31,17 @@ class SubSocket:
             ctx: zmq.Context,
             poller: zmq.Poller,
             address: SubSocketAddress,
-            timeout_in_sec: Optional[int] = None):
+            timeout_in_sec: Optional[int] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None):
         self.__ctx = ctx
         self.__poller = poller
         self.__address: str = None
         self.__timeout_in_sec: Optional[int] = timeout_in_sec
         self.__zmq_socket: Optional[zmq.Socket] = None
         self.__last_received_time = None
+        self.__max_message_size = max_message_size
+        self.__stream = StreamDecompressor(max_body_size=max_body_size)
 
         if isinstance(address, str):
             self.__address = str(address)
@@ -63,10 +69,15 @@ class SubSocket:
         zmq_socket.setsockopt(zmq.SUBSCRIBE, b'')
         zmq_socket.setsockopt(zmq.LINGER, 0)
 
+        # ZMQ disconnects publishers that send larger messages.
+        if self.__max_message_size is not None:
+            zmq_socket.setsockopt(zmq.MAXMSGSIZE, self.__max_message_size)
+
         zmq_socket.connect(self.__address)
 
         self.__poller.register(zmq_socket, zmq.POLLIN)
         self.__last_received_time = time.time()
+        self.__stream.reset()
         logger.debug('Created SubSocket to "%s"', self.__address)
 
     def destroy(self) -> None:
@@ -95,11 +106,18 @@ class SubSocket:
 
         logger.debug('Destroyed SubSocket bound to "%s"', self.__address)
 
-    def recv_string(self, socks: dict) -> Optional[str]:
+    def recv_message(self, socks: dict) -> Optional[Message]:
         if self.has_zmq_socket and (socks.get(self.zmq_socket) == zmq.POLLIN):
-            result = self.zmq_socket.recv_string()
+            result = recv_message(self.zmq_socket)
             self.__last_received_time = time.time()
-            return result
+
+            try:
+                return self.__stream.decompress(result)
+            except Exception as e:
+                logger.warning(
+                    'Dropped message from "%s": %s', self.__address, e,
+                )
+                return None
 
         if (self.__timeout_in_sec is not None) and time.time(
         ) > self.__last_received_time + self.__timeout_in_sec:
@@ -12,12 +12,32 @@ Edited on Oct 2020
 
 
 import json
-from typing import Optional, Tuple
+import time
+from typing import Dict, Optional, Tuple
 
 import zmq
 from zmq.auth.thread import ThreadAuthenticator
 
-from ..base import ZmqBase
+from ..base import (
+    MAX_TRANSFER_SIZE,
+    MAX_TRANSFERS,
+    TRANSFER_WINDOW,
+    IncomingTransfer,
+    Message,
+    OutgoingTransfer,
+    ZmqBase,
+    frame_buffer,
+)
+from ..base.transfer import (
+    CREDIT,
+    KIND_DATA,
+    TRANSFER_TIMEOUT,
+    is_transfer,
+    message_size,
+    read_transfer_header,
+)
+from ..command import DEFAULT_CODEC, codec_registry, json_zip
+from ..command.compressors import COMPRESSOR_NONE
 from .RepSocket import RepSocket
 from .SubSocket import SubSocket, SubSocketAddress
 
@@ -28,6 +48,21 @@ class ZmqReceiver(ZmqBase):
     and will call the 'handle_incoming_message()' method to process it.
     Subclasses should override that. A response must be implemented for
     REP sockets, but is useless for SUB sockets.
+    max_message_size limits the size of received messages as they travel on
+    the wire and max_body_size limits the size of their decompressed bodies,
+    which keeps the memory needed per message predictable.
+    With a positive transfer_chunk_size, large messages may arrive over REP
+    as a transfer of bounded data messages, each acknowledged with a credit
+    of transfer_window bytes for the next one. They are reassembled in
+    memory, or in a temporary file when larger than transfer_spill_size
+    bytes, and handled as a whole. Transfers announcing more than
+    transfer_max_size bytes, or max_message_size when smaller, are rejected,
+    and so are new ones while max_transfers are open. Responses larger than
+    transfer_chunk_size are sent back as a transfer the client pulls chunk by
+    chunk, so other requests are served in between.
+    With router the REP address is bound by a ROUTER socket instead, which
+    serves REQ clients as well as pipelined clients that keep many requests
+    in flight.
     '''
 
     def __init__(
@@ -36,8 +71,27 @@ class ZmqReceiver(ZmqBase):
             zmq_sub_connect_addresses: Tuple[SubSocketAddress, ...] = None,
             recreate_timeout: Optional[int] = 600,
             username: Optional[str] = None,
-            password: Optional[str] = None):
+            password: Optional[str] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None,
+            transfer_chunk_size: int = 0,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            transfer_max_size: int = MAX_TRANSFER_SIZE,
+            max_transfers: int = MAX_TRANSFERS,
+            router: bool = False):
         super().__init__()
+        self.__max_message_size = max_message_size
+        self.__max_body_size = max_body_size
+        self.__transfer_chunk_size = transfer_chunk_size
+        self.__transfer_window = transfer_window
+        self.__transfer_spill_size = transfer_spill_size
+        self.__transfer_max_size = transfer_max_size if \
+            max_message_size is None else \
+            min(transfer_max_size, max_message_size)
+        self.__max_transfers = max_transfers
+        self.__incoming_transfers: Dict[int, IncomingTransfer] = {}
+        self.__outgoing_transfers: Dict[int, OutgoingTransfer] = {}
         self.__context = zmq.Context()
         self.__poller = zmq.Poller()
 
@@ -47,6 +101,8 @@ class ZmqReceiver(ZmqBase):
                 poller=self.__poller,
                 address=address,
                 timeout_in_sec=recreate_timeout,
+                max_message_size=max_message_size,
+                max_body_size=max_body_size,
             )
             for address in (zmq_sub_connect_addresses or tuple())
         )
@@ -72,6 +128,8 @@ class ZmqReceiver(ZmqBase):
             poller=self.__poller,
             address=zmq_rep_bind_address,
             auth=self.__auth,
+            max_message_size=max_message_size,
+            router=router,
         ) if zmq_rep_bind_address else None
 
         self.__last_received_message = None
@@ -81,6 +139,10 @@ class ZmqReceiver(ZmqBase):
     def is_running(self) -> bool:
         return self.__is_running
 
+    @property
+    def max_body_size(self) -> Optional[int]:
+        return self.__max_body_size
+
     def stop(self) -> None:
         '''
         May take up to 60 seconds to actually stop since poller has timeout of
@@ -97,26 +159,137 @@ class ZmqReceiver(ZmqBase):
         if self.__rep_socket is None:
             return
 
-        incoming_message = self.__rep_socket.recv_string(socks)
+        incoming_message = self.__rep_socket.recv_message(socks)
         if incoming_message is None:
             return
 
-        if incoming_message != self.HEARTBEAT_MSG:
+        # Transfers may be large, their messages are not kept.
+        if incoming_message != self.HEARTBEAT_MSG and \
+                not is_transfer(incoming_message):
             self.__last_received_message = incoming_message
 
         self._debug('Got info from REP socket')
 
         try:
-            response_message = self.handle_incoming_message(
-                incoming_message,
-            )
-            self.__rep_socket.send(response_message)
+            if is_transfer(incoming_message):
+                response_message = self._handle_transfer(incoming_message)
+            else:
+                response_message = self.handle_incoming_message(
+                    incoming_message,
+                )
+
+            self.__rep_socket.send(self._start_transfer(response_message))
         except Exception as e:
             self._error(e)
 
+    def _drop_stale_transfers(self) -> None:
+        expire_time = time.monotonic() - TRANSFER_TIMEOUT
+
+        for transfers in (
+                self.__incoming_transfers,
+                self.__outgoing_transfers):
+            for transfer_id, transfer in tuple(transfers.items()):
+                if transfer.last_used < expire_time:
+                    self._warning('dropped stale transfer %016x', transfer_id)
+                    del transfers[transfer_id]
+
+    def _get_transfer(self, transfers: dict, transfer_id: int) -> object:
+        transfer = transfers.get(transfer_id)
+        if transfer is None:
+            raise RuntimeError('unknown transfer %016x' % transfer_id)
+
+        return transfer
+
+    def _handle_transfer(self, message: Message) -> Optional[Message]:
+        kind, _, transfer_id, sequence = read_transfer_header(message[0])
+
+        try:
+            if self.__transfer_chunk_size <= 0:
+                raise RuntimeError('transfers are not enabled')
+
+            if kind != KIND_DATA:
+                transfer = self._get_transfer(
+                    self.__outgoing_transfers,
+                    transfer_id,
+                )
+                if sequence != transfer.sequence:
+                    raise RuntimeError(
+                        'pulled message %d of transfer %016x, next is %d' % (
+                            sequence,
+                            transfer_id,
+                            transfer.sequence,
+                        )
+                    )
+
+                credit, = CREDIT.unpack(frame_buffer(message[1]))
+                response_message = transfer.next_message(credit)
+
+                if transfer.is_done:
+                    del self.__outgoing_transfers[transfer_id]
+
+                return response_message
+
+            if sequence == 0:
+                self._drop_stale_transfers()
+                if len(self.__incoming_transfers) >= self.__max_transfers:
+                    raise RuntimeError(
+                        '%d transfers are open already' % self.__max_transfers
+                    )
+
+                transfer = IncomingTransfer(
+                    message,
+                    max_size=self.__transfer_max_size,
+                    spill_size=self.__transfer_spill_size,
+                )
+                self.__incoming_transfers[transfer_id] = transfer
+            else:
+                transfer = self._get_transfer(
+                    self.__incoming_transfers,
+                    transfer_id,
+                )
+                transfer.add(message)
+        except Exception as e:
+            self.__incoming_transfers.pop(transfer_id, None)
+            self.__outgoing_transfers.pop(transfer_id, None)
+
+            status_message = 'Transfer failed. Exception: {0}'.format(e)
+            self._info(status_message)
+            return self._create_response(
+                message=message,
+                status_code=self.STATUS_CODE_BAD_SERIALIZATION,
+                status_message=status_message,
+            )
+
+        if not transfer.is_done:
+            return (
+                self.STATUS_FRAME.pack(self.STATUS_CODE_CONTINUE),
+                CREDIT.pack(self.__transfer_window),
+            )
+
+        del self.__incoming_transfers[transfer_id]
+
+        return self.handle_incoming_message(transfer.message())
+
+    def _start_transfer(self, message: Optional[Message]) \
+            -> Optional[Message]:
+        # Responses larger than a chunk are sent one chunk at a time, the
+        # client pulls the others.
+        if self.__transfer_chunk_size <= 0 or \
+                message is None or isinstance(message, str) or \
+                is_transfer(message) or \
+                message_size(message) <= self.__transfer_chunk_size:
+            return message
+
+        self._drop_stale_transfers()
+
+        transfer = OutgoingTransfer(message, self.__transfer_chunk_size)
+        self.__outgoing_transfers[transfer.transfer_id] = transfer
+
+        return transfer.next_message(self.__transfer_chunk_size)
+
     def _run_sub_sockets(self, socks) -> None:
         for sub_socket in self.__sub_sockets:
-            incoming_message = sub_socket.recv_string(socks)
+            incoming_message = sub_socket.recv_message(socks)
 
             if incoming_message is None:
                 continue
@@ -166,16 +339,57 @@ class ZmqReceiver(ZmqBase):
 
         return json.dumps(payload)
 
-    def handle_incoming_message(self, message: str) -> Optional[str]:
+    def _get_response_codec(self, message: Message) -> str:
+        # Respond with the serializer and the compressor of the request. A
+        # request too small to be compressed does not name a compressor, so
+        # fall back to the one of the default codec.
+        try:
+            codec = codec_registry.get_format(frame_buffer(message[0])[0])
+        except BaseException:
+            return DEFAULT_CODEC
+
+        compressor = codec.compressor
+        if compressor.compressor_id == COMPRESSOR_NONE:
+            compressor = codec_registry.get_codec(DEFAULT_CODEC).compressor
+
+        return '{0}+{1}'.format(codec.serializer.name, compressor.name)
+
+    def _create_response(
+            self,
+            message: Message,
+            status_code: int,
+            status_message: str,
+            response_message: Optional[object] = None) -> Message:
+        # Text requests come from clients that predate binary frames and get
+        # a text response.
+        if isinstance(message, str):
+            return self.create_response_message(
+                status_code=status_code,
+                status_message=status_message,
+                response_message=response_message,
+            )
+
+        status = self.STATUS_FRAME.pack(status_code)
+
+        if status_code != self.STATUS_CODE_OK:
+            return (status, status_message.encode('utf-8'))
+
+        return (status,) + json_zip(
+            response_message,
+            codec=self._get_response_codec(message),
+        )
+
+    def handle_incoming_message(self, message: Message) -> Optional[Message]:
         if message == self.HEARTBEAT_MSG:
             return None
 
-        return self.create_response_message(
+        return self._create_response(
+            message=message,
             status_code=self.STATUS_CODE_OK,
             status_message=self.STATUS_MSG_OK,
         )
 
-    def get_last_received_message(self) -> Optional[str]:
+    def get_last_received_message(self) -> Optional[Message]:
         return self.__last_received_message
 
     def get_sub_socket(self, idx: int) -> SubSocket:
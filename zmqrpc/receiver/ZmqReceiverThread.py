@@ -14,6 +14,7 @@ Edited on Oct 2020
 from threading import Thread
 from typing import Optional, Tuple
 
+from ..base import Message
 from .SubSocket import SubSocket, SubSocketAddress
 from .ZmqReceiver import ZmqReceiver
 
@@ -43,7 +44,7 @@ class ZmqReceiverThread(Thread):
     def run(self) -> None:
         self.__receiver.run()
 
-    def get_last_received_message(self) -> Optional[str]:
+    def get_last_received_message(self) -> Optional[Message]:
         return self.__receiver.get_last_received_message()
 
     def get_sub_socket(self, idx: int) -> SubSocket:
@@ -0,0 +1,121 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import random
+import time
+from typing import List
+
+# Endpoints take turns.
+ROUND_ROBIN = 'round_robin'
+# Endpoints are picked at random, weighted by the inverse of their moving
+# average response time.
+LATENCY = 'latency'
+
+POLICIES = (ROUND_ROBIN, LATENCY)
+
+# Weight of the latest response time in the moving average.
+LATENCY_SMOOTHING = 0.3
+
+# An endpoint that failed is left out for this many seconds, doubled with
+# every further failure in a row up to MAX_BACKOFF.
+BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+
+class LoadBalancer:
+    '''
+    Picks one of endpoint_count endpoints for each request according to its
+    policy. Endpoints are healthy unless their latest requests failed; those
+    are skipped until their backoff expires, unless no endpoint is healthy.
+    '''
+
+    def __init__(self, policy: str, endpoint_count: int):
+        if policy not in POLICIES:
+            raise RuntimeError(
+                'unknown load balancing policy "%s", use one of %s' % (
+                    policy,
+                    ', '.join(POLICIES),
+                )
+            )
+
+        if endpoint_count <= 0:
+            raise RuntimeError('load balancing needs REQ endpoints')
+
+        self.__policy = policy
+        self.__endpoint_count = endpoint_count
+        self.__next_index = 0
+        self.__latencies: List[float] = [0.0] * endpoint_count
+        self.__failures: List[int] = [0] * endpoint_count
+        self.__down_until: List[float] = [0.0] * endpoint_count
+
+    @property
+    def policy(self) -> str:
+        return self.__policy
+
+    @property
+    def latencies(self) -> List[float]:
+        return list(self.__latencies)
+
+    def is_healthy(self, index: int) -> bool:
+        return self.__down_until[index] <= time.monotonic()
+
+    def choose(self) -> int:
+        indexes = [
+            index
+            for index in range(self.__endpoint_count)
+            if self.is_healthy(index)
+        ]
+
+        if not indexes:
+            # Try the endpoint that is back first rather than none.
+            return min(
+                range(len(self.__down_until)),
+                key=self.__down_until.__getitem__,
+            )
+
+        if self.__policy == LATENCY:
+            # Endpoints without a response time yet are tried first.
+            untried = [
+                index
+                for index in indexes
+                if not self.__latencies[index]
+            ]
+            if untried:
+                return untried[0]
+
+            return random.choices(
+                indexes,
+                weights=[1 / self.__latencies[index] for index in indexes],
+            )[0]
+
+        # The first endpoint at or after the turn.
+        index = min(
+            indexes,
+            key=lambda index: (index - self.__next_index) %
+            self.__endpoint_count,
+        )
+        self.__next_index = (index + 1) % self.__endpoint_count
+
+        return index
+
+    def finish(self, index: int, is_success: bool, latency: float) -> None:
+        if not is_success:
+            self.__failures[index] += 1
+            self.__down_until[index] = time.monotonic() + min(
+                BACKOFF * 2 ** (self.__failures[index] - 1),
+                MAX_BACKOFF,
+            )
+            return
+
+        self.__failures[index] = 0
+        self.__down_until[index] = 0.0
+
+        average = self.__latencies[index]
+        self.__latencies[index] = latency if not average else \
+            average + LATENCY_SMOOTHING * (latency - average)
@@ -11,13 +11,26 @@ Edited on Oct 2020
 '''
 
 
-import json
 import time
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Sequence, Tuple
 
 import zmq
 
-from ..base import ZmqBase
+from ..base import (
+    TRANSFER_WINDOW,
+    Frame,
+    IncomingTransfer,
+    Message,
+    OutgoingTransfer,
+    ZmqBase,
+    frame_buffer,
+    recv_message,
+    send_message,
+)
+from ..base.transfer import CREDIT, is_transfer, make_pull, message_size
+from ..command import StreamCompressor
+from .LoadBalancer import LoadBalancer
+from .response_io import read_response
 
 
 class ZmqSender(ZmqBase):
@@ -28,6 +41,24 @@ class ZmqSender(ZmqBase):
     in the given timeout.
     The username/password can be used to provide 'simple' protection on
     the wire (only PLAIN has been implemented, so be aware of sniffers).
+    pub_stream_compressor names a compressor that compresses the small
+    messages sent over the PUB socket as one stream, restarted every
+    pub_stream_reset_interval messages for late joining subscribers.
+    Requests larger than a positive transfer_chunk_size are sent to each REQ
+    endpoint as a transfer: data messages of whole chunks, each sent once
+    the previous one is acknowledged and holding as many chunks as the
+    credit of the acknowledgement allows. Responses sent as a transfer are
+    pulled with a credit of transfer_window bytes and reassembled in memory,
+    or in a temporary file when larger than transfer_spill_size bytes.
+    send() may return once min_responses REQ endpoints responded, and
+    send_as_completed() yields the responses as they arrive. Replies that
+    arrive after the call returned are dropped by the next request on their
+    socket, so the socket is not recreated.
+    With a load_balancing policy (round_robin or latency) each message goes
+    to a single healthy REQ endpoint instead of all of them, and endpoints
+    whose latest requests failed are left out for a while.
+    Responses whose body decompresses to more than max_body_size bytes are
+    rejected.
     '''
 
     def __init__(
@@ -35,9 +66,15 @@ class ZmqSender(ZmqBase):
             zmq_req_endpoints: Tuple[str, ...] = None,
             zmq_pub_endpoint: Optional[str] = None,
             username: Optional[str] = None,
-            password: Optional[str] = None):
+            password: Optional[str] = None,
+            pub_stream_compressor: Optional[str] = None,
+            pub_stream_reset_interval: int = 100,
+            transfer_chunk_size: int = 0,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            load_balancing: Optional[str] = None,
+            max_body_size: Optional[int] = None):
         self.__context = zmq.Context()
-        self.__poller = zmq.Poller()
 
         self.__username = username
         self.__password = password
@@ -47,6 +84,21 @@ class ZmqSender(ZmqBase):
         )
         self.__zmq_pub_endpoint = zmq_pub_endpoint
 
+        self.__load_balancer = LoadBalancer(
+            policy=load_balancing,
+            endpoint_count=len(self.__zmq_req_endpoints),
+        ) if load_balancing else None
+
+        self.__pub_stream = StreamCompressor(
+            compressor=pub_stream_compressor,
+            reset_interval=pub_stream_reset_interval,
+        ) if pub_stream_compressor else None
+
+        self.__transfer_chunk_size = transfer_chunk_size
+        self.__transfer_window = transfer_window
+        self.__transfer_spill_size = transfer_spill_size
+        self.__max_body_size = max_body_size
+
         self.__pub_socket: zmq.Socket = None
         self.__req_sockets: Tuple[zmq.Socket, ...] = None
 
@@ -56,6 +108,10 @@ class ZmqSender(ZmqBase):
         self.create_pub_socket()
         self.create_req_socket()
 
+    @property
+    def load_balancer(self) -> Optional[LoadBalancer]:
+        return self.__load_balancer
+
     @property
     def has_username_and_password(self) -> bool:
         return self.__username and self.__password
@@ -72,6 +128,10 @@ class ZmqSender(ZmqBase):
         if pub_endpoint is None:
             return
 
+        # Subscribers of the new socket need a new stream.
+        if self.__pub_stream is not None:
+            self.__pub_stream.reset()
+
         self.__pub_socket = socket = self.__context.socket(zmq.PUB)
         if self.has_username_and_password:
             socket.plain_username = self.__username
@@ -152,6 +212,12 @@ class ZmqSender(ZmqBase):
                     self.__password,
                 )
 
+            # A new request may be sent before the reply to the previous one
+            # arrived, e.g. once enough other endpoints responded. The late
+            # reply is then dropped.
+            socket.setsockopt(zmq.REQ_RELAXED, 1)
+            socket.setsockopt(zmq.REQ_CORRELATE, 1)
+
             self._debug('Connect REQ socket to "%s"', end_point)
 
             try:
@@ -161,11 +227,6 @@ class ZmqSender(ZmqBase):
                     'Cannot connect REQ socket to {0}.'.format(end_point)
                 ) from e
 
-            try:
-                self.__poller.register(socket, zmq.POLLIN)
-            except Exception as e:
-                raise Exception('Cannot register REQ socket to poller.') from e
-
             socket_list.append(socket)
 
         self.__req_sockets = tuple(socket_list)
@@ -179,12 +240,6 @@ class ZmqSender(ZmqBase):
         for end_point, socket in zip(
                 self.__zmq_req_endpoints, self.__req_sockets):
 
-            try:
-                self.__poller.unregister(socket)
-            except Exception as e:
-                error_message += 'Cannot un-register REQ socket to poller. ' \
-                    'Exception: {0}\n'.format(e)
-
             try:
                 socket.setsockopt(zmq.LINGER, 0)
             except Exception as e:
@@ -209,12 +264,15 @@ class ZmqSender(ZmqBase):
         if error_message:
             self._error(error_message)
 
-    def _send_over_pub_socket(self, message: str) -> None:
+    def _send_over_pub_socket(self, message: Message) -> None:
         if self.__pub_socket is None:
             return
 
+        if self.__pub_stream is not None and not isinstance(message, str):
+            message = self.__pub_stream.compress(message)
+
         try:
-            self.__pub_socket.send_string(message)
+            send_message(self.__pub_socket, message)
         except Exception as e:
             self.__recreate_pub_socket = True
             raise RuntimeError(
@@ -222,104 +280,288 @@ class ZmqSender(ZmqBase):
                 'Mark PUB socket for renewal. Consider this message lost.'
             ) from e
 
-    def _handle_response(self, message: str) -> Tuple[bool, object]:
-        try:
-            payload: dict = json.loads(message)
-        except BaseException as e:
+    def _handle_response(self, message: Message) -> Tuple[bool, object]:
+        response = read_response(message, self.__max_body_size)
+
+        # The socket may be out of step after a failed response.
+        if not response[0]:
             self.__recreate_req_socket = True
-            return (
-                False,
-                Exception(
-                    'Marshalling error: Response is not a json message. '
-                    'Exception {0}'.format(e)
-                ),
+
+        return response
+
+    def _request(
+            self,
+            socket: zmq.Socket,
+            message: Message,
+            expire_time: float) -> Message:
+        # One round trip on a REQ socket.
+        send_message(socket, message)
+
+        while True:
+            time_left = expire_time - time.monotonic()
+            if time_left <= 0 or not socket.poll(time_left * 1000, zmq.POLLIN):
+                raise TimeoutError('no response received in time')
+
+            try:
+                return recv_message(socket, zmq.NOBLOCK)
+            except zmq.Again:
+                # Only a late reply to an earlier request was dropped.
+                continue
+
+    def _send_transfer(
+            self,
+            socket: zmq.Socket,
+            message: Tuple[Frame, ...],
+            expire_time: float) -> Message:
+        # Sends the data messages of a transfer and returns the response to
+        # the last one, or the error response that ended the transfer.
+        transfer = OutgoingTransfer(message, self.__transfer_chunk_size)
+        credit = self.__transfer_chunk_size
+
+        while True:
+            response_message = self._request(
+                socket,
+                transfer.next_message(credit),
+                expire_time,
             )
 
-        status_code: int = payload.get(self.STATUS_CODE, None)
+            if transfer.is_done or isinstance(response_message, str):
+                return response_message
 
-        if status_code is None:
-            self.__recreate_req_socket = True
-            return (
-                False,
-                Exception('No status_code in response.'),
+            status_code, = self.STATUS_FRAME.unpack(
+                frame_buffer(response_message[0])
             )
+            if status_code != self.STATUS_CODE_CONTINUE:
+                return response_message
+
+            credit, = CREDIT.unpack(frame_buffer(response_message[1]))
 
-        status_message = payload.get(self.STATUS_MSG, None)
+    def _pull_transfer(
+            self,
+            socket: zmq.Socket,
+            message: Message,
+            expire_time: float) -> Message:
+        # A response sent as a transfer carries its first data message; the
+        # others are pulled one by one.
+        if not is_transfer(message):
+            return message
+
+        transfer = IncomingTransfer(
+            message,
+            spill_size=self.__transfer_spill_size,
+        )
 
-        if status_code != self.STATUS_CODE_OK:
+        while not transfer.is_done:
+            response_message = self._request(
+                socket,
+                make_pull(
+                    transfer.transfer_id,
+                    transfer.sequence,
+                    self.__transfer_window,
+                ),
+                expire_time,
+            )
+
+            if not is_transfer(response_message):
+                return response_message
+
+            transfer.add(response_message)
+
+        return transfer.message()
+
+    def _transfer_over_req_socket(
+            self,
+            end_point: str,
+            socket: zmq.Socket,
+            message: Tuple[Frame, ...],
+            expire_time: float) -> Tuple[bool, object]:
+        try:
+            return self._handle_response(
+                self._pull_transfer(
+                    socket,
+                    self._send_transfer(socket, message, expire_time),
+                    expire_time,
+                )
+            )
+        except Exception as e:
             self.__recreate_req_socket = True
             return (
                 False,
                 Exception(
-                    status_message
-                    if status_message else
-                    'Error occurred with code {0}'.format(status_code)
+                    'Transfer over REQ socket {0} failed. Marking REQ socket '
+                    'to be recreated on next try. Exception: {1}'.format(
+                        end_point,
+                        e,
+                    )
                 ),
             )
 
-        return (
-            True,
-            payload.get(self.RESPONSE_MSG, None),
-        )
-
-    def _send_over_req_socket(
+    def _iter_over_req_socket(
             self,
-            message: str,
-            time_out_in_sec: int = 10) -> Optional[Tuple[object, ...]]:
-        if self.__req_sockets is None:
-            return None
+            message: Message,
+            expire_time: float,
+            indexes: Sequence[int]) \
+            -> Iterator[Tuple[int, Tuple[bool, object]]]:
+        # Yields the index of each of the REQ endpoints in indexes with its
+        # handled response as soon as it arrives, until all responded or the
+        # time is up.
+        load_balancer = self.__load_balancer
+        if load_balancer is None:
+            yield from self._iter_responses(message, expire_time, indexes)
+            return
 
-        response_list = [None] * len(self.__zmq_req_endpoints)
+        start_time = time.monotonic()
+        remaining = set(indexes)
+
+        try:
+            for idx, response in self._iter_responses(
+                    message,
+                    expire_time,
+                    indexes):
+                remaining.discard(idx)
+                load_balancer.finish(
+                    idx,
+                    response[0],
+                    time.monotonic() - start_time,
+                )
+
+                yield idx, response
+        finally:
+            # Endpoints that did not respond in time count as failed.
+            for idx in remaining:
+                load_balancer.finish(
+                    idx,
+                    False,
+                    time.monotonic() - start_time,
+                )
+
+    def _iter_responses(
+            self,
+            message: Message,
+            expire_time: float,
+            indexes: Sequence[int]) \
+            -> Iterator[Tuple[int, Tuple[bool, object]]]:
+        is_transfer_needed = self.__transfer_chunk_size > 0 and \
+            not isinstance(message, str) and \
+            message_size(message) > self.__transfer_chunk_size
+
+        poller = zmq.Poller()
+        pending = {}
+
+        for idx in indexes:
+            end_point = self.__zmq_req_endpoints[idx]
+            socket = self.__req_sockets[idx]
+
+            # Transfers go to one endpoint after the other.
+            if is_transfer_needed:
+                yield idx, self._transfer_over_req_socket(
+                    end_point,
+                    socket,
+                    message,
+                    expire_time,
+                )
+                continue
 
-        for idx, (end_point, socket) in enumerate(zip(
-                self.__zmq_req_endpoints, self.__req_sockets)):
             try:
-                socket.send_string(message)
+                send_message(socket, message)
             except Exception as e:
                 self.__recreate_req_socket = True
-                response_list[idx] = (
-                    False, Exception(
+                yield idx, (
+                    False,
+                    Exception(
                         'Cannot send message on REQ socket {0}. This is very '
                         'exceptional. Please check logs. Marking REQ socket '
-                        'to be recreated on next try. Message can be considered '
-                        'lost. Exception {1}'.format(
-                            end_point, e,), ))
-
-        # Wait for given time to receive response.
-        expire_time = time.time() + time_out_in_sec
-        while expire_time > time.time():
-            for idx, (end_point, socket) in enumerate(zip(
-                    self.__zmq_req_endpoints, self.__req_sockets)):
-                if response_list[idx] is not None:
-                    continue
+                        'to be recreated on next try. Message can be '
+                        'considered lost. Exception {1}'.format(end_point, e)
+                    ),
+                )
+                continue
 
-                # X seconds timeout before quiting on waiting for response
-                req_socks = dict(self.__poller.poll(1000))
-                if req_socks.get(socket) != zmq.POLLIN:
-                    continue
+            poller.register(socket, zmq.POLLIN)
+            pending[socket] = idx
+
+        # One poll waits on all pending sockets for what is left of the
+        # timeout, and each response is handled as soon as it arrives.
+        while pending:
+            time_left = expire_time - time.monotonic()
+            if time_left <= 0:
+                break
+
+            for socket, _ in poller.poll(time_left * 1000):
+                idx = pending[socket]
+                end_point = self.__zmq_req_endpoints[idx]
 
                 try:
-                    response_message = socket.recv_string()
+                    response_message = self._pull_transfer(
+                        socket,
+                        recv_message(socket, zmq.NOBLOCK),
+                        expire_time,
+                    )
+                except zmq.Again:
+                    # Only a late reply to an earlier request was dropped.
+                    continue
                 except Exception as e:
                     self.__recreate_req_socket = True
-                    response_list[idx] = (
+                    response_message = None
+                    response = (
                         False,
                         Exception(
-                            'Could not receive message from socket %s. '
+                            'Could not receive message from socket {0}. '
                             'Marking REQ socket to be recreated on next '
-                            'try. Exception: %s'.format(end_point, e)
+                            'try. Exception: {1}'.format(end_point, e)
                         ),
                     )
-                    continue
 
-                response_list[idx] = self._handle_response(response_message)
+                poller.unregister(socket)
+                del pending[socket]
+
+                if response_message is not None:
+                    response = self._handle_response(response_message)
 
-            if all(response_list):
+                yield idx, response
+
+    def _send_over_req_socket(
+            self,
+            message: Message,
+            time_out_in_sec: float = 10,
+            min_responses: Optional[int] = None) \
+            -> Optional[Tuple[object, ...]]:
+        if self.__req_sockets is None:
+            return None
+
+        indexes = self._get_endpoint_indexes()
+
+        endpoint_count = len(indexes)
+        required_count = endpoint_count if min_responses is None else \
+            max(min(min_responses, endpoint_count), 1)
+
+        response_list = [None] * len(self.__zmq_req_endpoints)
+        success_count = 0
+        failure_count = 0
+
+        # Stop as soon as enough endpoints responded, or too many failed.
+        for idx, response in self._iter_over_req_socket(
+                message,
+                time.monotonic() + time_out_in_sec,
+                indexes):
+            response_list[idx] = response
+
+            if response[0]:
+                success_count += 1
+            else:
+                failure_count += 1
+
+            if success_count >= required_count or \
+                    failure_count > endpoint_count - required_count:
                 break
 
-        # Some unexpected socket related error occurred. Recreate the
-        # REQ socket.
-        if not all(response_list):
+        if success_count < required_count:
+            for response in response_list:
+                if response is not None and not response[0]:
+                    raise response[1]
+
+            # Some unexpected socket related error occurred. Recreate the
+            # REQ socket.
             self.__recreate_req_socket = True
             raise Exception(
                 'No response received on ZMQ Request to end point'
@@ -330,21 +572,21 @@ class ZmqSender(ZmqBase):
                 )
             )
 
-        if self.__recreate_req_socket:
-            for response in response_list:
-                if not response or not isinstance(response[1], BaseException):
-                    continue
-                raise response[1]
-
+        # Endpoints that did not respond in time or failed get None.
         return tuple(
-            response[1] if response else None
-            for response in response_list
+            response_list[idx][1]
+            if response_list[idx] and response_list[idx][0] else None
+            for idx in indexes
         )
 
-    def send(
-            self,
-            message: str,
-            time_out_in_sec: int = 60) -> Optional[Tuple[object, ...]]:
+    def _get_endpoint_indexes(self) -> Sequence[int]:
+        # Balanced messages go to a single endpoint, others to all of them.
+        if self.__load_balancer is not None:
+            return (self.__load_balancer.choose(),)
+
+        return range(len(self.__zmq_req_endpoints))
+
+    def _recreate_sockets(self) -> None:
         # Create sockets if needed. Raise an exception if any problems are
         # encountered
         if self.__recreate_pub_socket:
@@ -357,6 +599,22 @@ class ZmqSender(ZmqBase):
             self.create_req_socket()
             self.__recreate_req_socket = False
 
+    def send(
+            self,
+            message: Message,
+            time_out_in_sec: float = 60,
+            min_responses: Optional[int] = None) \
+            -> Optional[Tuple[object, ...]]:
+        '''
+        Sends the message over PUB and REQ and returns the responses of the
+        REQ endpoints in their order. By default all endpoints have to
+        respond; with min_responses the call returns as soon as that many
+        responded and the others get None. A load balanced message returns
+        the one response of the endpoint it was sent to.
+        '''
+
+        self._recreate_sockets()
+
         # Sockets must exist otherwise we would not be here...
         # Any errors in the following lines will throw an error that must be
         # caught
@@ -364,8 +622,57 @@ class ZmqSender(ZmqBase):
         return self._send_over_req_socket(
             message,
             time_out_in_sec,
+            min_responses,
         )
 
+    def send_as_completed(
+            self,
+            message: Message,
+            time_out_in_sec: float = 60) -> Iterator[Tuple[int, object]]:
+        '''
+        Sends the message like send() and yields the index of each REQ
+        endpoint with its response as soon as it arrives. Once the others
+        responded, the first error is raised, or a timeout if some endpoints
+        did not respond in time. Stopping the iteration early leaves the late
+        replies to be dropped.
+        '''
+
+        self._recreate_sockets()
+        self._send_over_pub_socket(message)
+
+        if self.__req_sockets is None:
+            return
+
+        indexes = self._get_endpoint_indexes()
+
+        error: Optional[BaseException] = None
+        response_count = 0
+
+        for idx, (is_success, response) in self._iter_over_req_socket(
+                message,
+                time.monotonic() + time_out_in_sec,
+                indexes):
+            response_count += 1
+
+            if is_success:
+                yield idx, response
+            elif error is None:
+                error = response
+
+        if error is not None:
+            raise error
+
+        if response_count < len(indexes):
+            self.__recreate_req_socket = True
+            raise Exception(
+                'No response received on ZMQ Request to end point'
+                ' {0} in {1} seconds. Discarding message. Marking REQ '
+                'socket to be recreated on next try.'.format(
+                    self.__zmq_req_endpoints,
+                    time_out_in_sec,
+                )
+            )
+
     def send_heartbeat(self) -> None:
         self.send(self.HEARTBEAT_MSG)
 
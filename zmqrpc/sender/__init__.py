@@ -1,3 +1,4 @@
 
 
+from .LoadBalancer import LoadBalancer
 from .ZmqSender import ZmqSender
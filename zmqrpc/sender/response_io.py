@@ -0,0 +1,102 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+import json
+from typing import Optional, Tuple
+
+from ..base import Message, ZmqBase, frame_buffer, frame_bytes
+from ..command import json_unzip
+
+
+def read_response(
+        message: Message,
+        max_body_size: Optional[int] = None) -> Tuple[bool, object]:
+    '''
+    Reads the response of a server. Returns True and the decoded response,
+    or False and an exception that describes the failure, e.g. when the body
+    decompresses to more than max_body_size bytes.
+    '''
+
+    if isinstance(message, str):
+        return _read_text_response(message)
+
+    # Binary responses carry the packed status code in the first frame,
+    # followed by the encoded response or by the error message.
+    try:
+        status_code, = ZmqBase.STATUS_FRAME.unpack(frame_buffer(message[0]))
+    except BaseException as e:
+        return (
+            False,
+            Exception(
+                'Marshalling error: Response has no status. '
+                'Exception {0}'.format(e)
+            ),
+        )
+
+    if status_code != ZmqBase.STATUS_CODE_OK:
+        return (
+            False,
+            Exception(
+                frame_bytes(message[1]).decode('utf-8', 'replace')
+                if len(message) > 1 else
+                'Error occurred with code {0}'.format(status_code)
+            ),
+        )
+
+    try:
+        return (
+            True,
+            json_unzip(message[1:], max_body_size=max_body_size),
+        )
+    except BaseException as e:
+        return (
+            False,
+            Exception(
+                'Marshalling error: Cannot decode the response. '
+                'Exception {0}'.format(e)
+            ),
+        )
+
+
+def _read_text_response(message: str) -> Tuple[bool, object]:
+    try:
+        payload: dict = json.loads(message)
+    except BaseException as e:
+        return (
+            False,
+            Exception(
+                'Marshalling error: Response is not a json message. '
+                'Exception {0}'.format(e)
+            ),
+        )
+
+    status_code: int = payload.get(ZmqBase.STATUS_CODE, None)
+
+    if status_code is None:
+        return (
+            False,
+            Exception('No status_code in response.'),
+        )
+
+    status_message = payload.get(ZmqBase.STATUS_MSG, None)
+
+    if status_code != ZmqBase.STATUS_CODE_OK:
+        return (
+            False,
+            Exception(
+                status_message
+                if status_message else
+                'Error occurred with code {0}'.format(status_code)
+            ),
+        )
+
+    return (
+        True,
+        payload.get(ZmqBase.RESPONSE_MSG, None),
+    )
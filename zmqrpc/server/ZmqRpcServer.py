@@ -11,11 +11,34 @@ Edited on Oct 2020
 '''
 
 
-from typing import Dict, Optional, Tuple, Type
+from typing import Dict, Optional, Set, Tuple, Type
 
-from ..command import ICommand, ShutdownServer, json_unzip
+from ..base import MAX_TRANSFER_SIZE, MAX_TRANSFERS, TRANSFER_WINDOW, Message
+from ..command import (
+    BLOB_CACHE_SIZE,
+    DEFAULT_CODEC,
+    FORMAT_STRUCT,
+    BlobStore,
+    CommandPool,
+    GetMissingBlobs,
+    GetServerCodecs,
+    ICommand,
+    LazyCommand,
+    MissingBlobsError,
+    SharedMemoryReader,
+    ShutdownServer,
+    StoreBlobs,
+    codec_registry,
+)
+from ..command.CommandPool import new_command
 from ..receiver import SubSocketAddress, ZmqReceiver
-from ..service import IService, ShutdownServerService
+from ..service import (
+    GetMissingBlobsService,
+    GetServerCodecsService,
+    IService,
+    ShutdownServerService,
+    StoreBlobsService,
+)
 
 
 class ZmqRpcServer(ZmqReceiver):
@@ -32,8 +55,25 @@ class ZmqRpcServer(ZmqReceiver):
     Each service should be handeling a distinct command type.
     All commands inherit ICommand and all services inherit IService.
     Command types has to have a default constructor: i.e. it should be possible
-    to construct the command object without any arguments.
-    Out of the box, the server supports the command `ShutdownServer`.
+    to construct the command object without any arguments. Slots commands are
+    constructed without calling __init__, so their fields may be required.
+    A service registered with a positive pool_size gets its commands from a
+    pool of that many commands, which are reset with the state of the next
+    command instead of being allocated per message. Its service must not
+    keep the command after the call.
+    Out of the box, the server supports the commands `ShutdownServer` and
+    `GetServerCodecs`.
+    codecs restricts the codecs the server accepts (the codecs of safe
+    serializers by default, so marshal has to be listed). The default codec
+    is always accepted so that clients can negotiate.
+    Messages larger than max_message_size bytes on the wire, or whose body
+    decompresses to more than max_body_size bytes, are rejected.
+    A positive blob_cache_size keeps that many bytes of blobs sent by
+    clients, so large buffers that commands share travel only once; a
+    blob_directory shares the blobs with the processes on the same host.
+    With shared_memory, clients on the same host may pass large buffers in
+    shared memory segments.
+    With router, pipelined clients may keep many requests in flight.
     A username/password may be used for REQ/REP pairs (does not seem to be
     working for PUB/SUB sockets)
     '''
@@ -44,25 +84,89 @@ class ZmqRpcServer(ZmqReceiver):
             zmq_sub_connect_addresses: Tuple[SubSocketAddress, ...] = None,
             recreate_timeout: Optional[int] = 600,
             username: Optional[str] = None,
-            password: Optional[str] = None):
+            password: Optional[str] = None,
+            codecs: Optional[Tuple[str, ...]] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None,
+            blob_cache_size: int = 0,
+            blob_directory: Optional[str] = None,
+            shared_memory: bool = False,
+            transfer_chunk_size: int = 0,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            transfer_max_size: int = MAX_TRANSFER_SIZE,
+            max_transfers: int = MAX_TRANSFERS,
+            router: bool = False):
         super().__init__(
             zmq_rep_bind_address=zmq_rep_bind_address,
             zmq_sub_connect_addresses=zmq_sub_connect_addresses,
             recreate_timeout=recreate_timeout,
             username=username,
             password=password,
+            max_message_size=max_message_size,
+            max_body_size=max_body_size,
+            transfer_chunk_size=transfer_chunk_size,
+            transfer_window=transfer_window,
+            transfer_spill_size=transfer_spill_size,
+            transfer_max_size=transfer_max_size,
+            max_transfers=max_transfers,
+            router=router,
         )
-        self.__services: Dict[str, IService] = {}
+        self.__services: Dict[int, Tuple[Type[ICommand], IService]] = {}
+        self.__command_pool: Optional[CommandPool] = None
+
+        if codecs is None:
+            codecs = codec_registry.safe_codec_names
+        elif DEFAULT_CODEC not in codecs:
+            codecs = (DEFAULT_CODEC,) + tuple(codecs)
+
+        # Bodies below the compression threshold are sent uncompressed with
+        # the same serializer, so accept those formats as well. Struct
+        # commands do not depend on the codec and are always accepted.
+        self.__formats: Set[int] = {FORMAT_STRUCT}
+        for codec_name in codecs:
+            codec = codec_registry.get_codec(codec_name)
+            self.__formats.add(codec.format_tag)
+            self.__formats.add(codec.serializer.serializer_id)
 
         self.register_service(
             command_class=ShutdownServer,
             service=ShutdownServerService(server=self),
         )
+        self.register_service(
+            command_class=GetServerCodecs,
+            service=GetServerCodecsService(codecs=tuple(codecs)),
+        )
+
+        self.__shared_memory = SharedMemoryReader() if shared_memory else None
+
+        # Clients send the blobs of their commands ahead of the commands
+        # that refer to them, and only those the server is missing.
+        self.__blob_store: Optional[BlobStore] = None
+        if blob_cache_size > 0 or blob_directory is not None:
+            self.__blob_store = BlobStore(
+                max_size=blob_cache_size or BLOB_CACHE_SIZE,
+                directory=blob_directory,
+            )
+
+            self.register_service(
+                command_class=GetMissingBlobs,
+                service=GetMissingBlobsService(blob_store=self.__blob_store),
+            )
+            self.register_service(
+                command_class=StoreBlobs,
+                service=StoreBlobsService(blob_store=self.__blob_store),
+            )
+
+    @property
+    def command_pool(self) -> Optional[CommandPool]:
+        return self.__command_pool
 
     def register_service(
             self,
             command_class: Type[ICommand],
-            service: IService) -> None:
+            service: IService,
+            pool_size: int = 0) -> None:
         if command_class is ICommand:
             raise RuntimeError('command_class cannot be ICommand')
 
@@ -75,7 +179,7 @@ class ZmqRpcServer(ZmqReceiver):
             )
 
         try:
-            command_class()
+            new_command(command_class)
         except BaseException as e:
             raise RuntimeError(
                 'command "%s" does not have a default constructor' %
@@ -88,7 +192,9 @@ class ZmqRpcServer(ZmqReceiver):
                 'inherits IService'
             )
 
-        if command_class_name in self.__services:
+        command_id = command_class.command_id
+
+        if command_id in self.__services:
             raise RuntimeError(
                 'found a repeated service "%s" for command "%s"' % (
                     type(service).__name__,
@@ -96,40 +202,77 @@ class ZmqRpcServer(ZmqReceiver):
                 )
             )
 
-        self.__services[command_class_name] = service
+        self.__services[command_id] = (command_class, service)
 
-    def handle_incoming_message(self, message: str) -> Optional[str]:
+        if pool_size > 0:
+            if self.__command_pool is None:
+                self.__command_pool = CommandPool()
+
+            self.__command_pool.register(command_class, pool_size)
+
+    def handle_incoming_message(self, message: Message) -> Optional[Message]:
         if message == self.HEARTBEAT_MSG:
             return None
 
+        # Segments of earlier commands are closed once no longer used.
+        if self.__shared_memory is not None:
+            self.__shared_memory.collect()
+
+        # The service is looked up by the command id in the header; the body
+        # is only decoded once a service for the command is found.
         try:
-            command: ICommand = json_unzip(message)
+            lazy_command = LazyCommand(
+                message,
+                formats=self.__formats,
+                max_body_size=self.max_body_size,
+                blob_store=self.__blob_store,
+                shared_memory=self.__shared_memory,
+                command_pool=self.__command_pool,
+            )
+            command_class, service = self.__services.get(
+                lazy_command.command_id,
+                (None, None),
+            )
+
+            if service is not None:
+                command: ICommand = lazy_command.command
+        except MissingBlobsError as e:
+            status_message = 'Command refers to blobs the server does not ' \
+                'have. Exception: {0}'.format(e)
+            self._info(status_message)
+            return self._create_response(
+                message=message,
+                status_code=self.STATUS_CODE_MISSING_BLOBS,
+                status_message=status_message,
+            )
         except Exception as e:
             status_message = 'Incorrectly marshalled command. Incoming ' \
                 'message is no proper json formatted string. ' \
                 'Exception: {0}'.format(e)
             self._info(status_message)
-            return self.create_response_message(
+            return self._create_response(
+                message=message,
                 status_code=self.STATUS_CODE_BAD_SERIALIZATION,
                 status_message=status_message,
             )
 
-        command_class_name = type(command).__name__
-
-        service: Optional[IService] = self.__services.get(
-            command_class_name,
-            None,
-        )
-
         if service is None:
+            command_class = lazy_command.command_class
             status_message = 'No service on the server is registered for' \
-                ' command "%s".' % command_class_name
+                ' command "%s".' % (
+                    command_class.__name__
+                    if command_class is not None else
+                    lazy_command.command_id
+                )
             self._warning(status_message)
-            return self.create_response_message(
+            return self._create_response(
+                message=message,
                 status_code=self.STATUS_CODE_BAD_SERVICE,
                 status_message=status_message,
             )
 
+        command_class_name = command_class.__name__
+
         self._debug('executing command: "%s"' % command_class_name)
 
         try:
@@ -139,13 +282,21 @@ class ZmqRpcServer(ZmqReceiver):
                 '{0}. Exception: {1} '.format(type(service).__name__, e)
             self._warning(status_message)
             self._exception(e)
-            return self.create_response_message(
+            response = self._create_response(
+                message=message,
                 status_code=self.STATUS_CODE_EXCEPTION_RAISED,
                 status_message=status_message,
             )
+        else:
+            response = self._create_response(
+                message=message,
+                status_code=self.STATUS_CODE_OK,
+                status_message=self.STATUS_MSG_OK,
+                response_message=response_message,
+            )
 
-        return self.create_response_message(
-            status_code=self.STATUS_CODE_OK,
-            status_message=self.STATUS_MSG_OK,
-            response_message=response_message,
-        )
+        # Nothing refers to the command once its response is encoded.
+        if self.__command_pool is not None:
+            self.__command_pool.release(command)
+
+        return response
@@ -14,6 +14,7 @@ Edited on Oct 2020
 from threading import Thread
 from typing import Optional, Tuple, Type
 
+from ..base import MAX_TRANSFER_SIZE, MAX_TRANSFERS, TRANSFER_WINDOW, Message
 from ..command import ICommand
 from ..receiver import SubSocket, SubSocketAddress
 from ..service import IService
@@ -32,7 +33,19 @@ class ZmqRpcServerThread(Thread):
             zmq_sub_connect_addresses: Tuple[SubSocketAddress, ...] = None,
             recreate_timeout: Optional[int] = 60,
             username: Optional[str] = None,
-            password: Optional[str] = None):
+            password: Optional[str] = None,
+            codecs: Optional[Tuple[str, ...]] = None,
+            max_message_size: Optional[int] = None,
+            max_body_size: Optional[int] = None,
+            blob_cache_size: int = 0,
+            blob_directory: Optional[str] = None,
+            shared_memory: bool = False,
+            transfer_chunk_size: int = 0,
+            transfer_window: int = TRANSFER_WINDOW,
+            transfer_spill_size: Optional[int] = None,
+            transfer_max_size: int = MAX_TRANSFER_SIZE,
+            max_transfers: int = MAX_TRANSFERS,
+            router: bool = False):
         super().__init__()
 
         self.__server = ZmqRpcServer(
@@ -41,22 +54,36 @@ class ZmqRpcServerThread(Thread):
             recreate_timeout=recreate_timeout,
             username=username,
             password=password,
+            codecs=codecs,
+            max_message_size=max_message_size,
+            max_body_size=max_body_size,
+            blob_cache_size=blob_cache_size,
+            blob_directory=blob_directory,
+            shared_memory=shared_memory,
+            transfer_chunk_size=transfer_chunk_size,
+            transfer_window=transfer_window,
+            transfer_spill_size=transfer_spill_size,
+            transfer_max_size=transfer_max_size,
+            max_transfers=max_transfers,
+            router=router,
         )
 
     @property
     def is_running(self) -> bool:
         return self.__server.is_running
 
-    def get_last_received_message(self) -> Optional[str]:
+    def get_last_received_message(self) -> Optional[Message]:
         return self.__server.get_last_received_message()
 
     def register_service(
             self,
             command_class: Type[ICommand],
-            service: IService) -> None:
+            service: IService,
+            pool_size: int = 0) -> None:
         self.__server.register_service(
             command_class=command_class,
             service=service,
+            pool_size=pool_size,
         )
 
     def run(self) -> None:
@@ -0,0 +1,57 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Dict, Mapping, Optional
+
+from ..command import BatchCommand
+from ..command.BatchCommand import Column, iter_records
+from .IService import IService
+
+
+class BatchService(IService):
+    '''
+    Service of a BatchCommand. Services that process whole columns at once
+    override process_columns; services written for one record at a time
+    override process_record and get called for every record of the batch.
+    Subclasses that override neither are refused when they are defined.
+    '''
+
+    def __new__(cls, *args, **kwargs):
+        if cls is BatchService:
+            raise TypeError(
+                'BatchService has to be subclassed with process_columns or '
+                'process_record'
+            )
+
+        return super().__new__(cls)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if cls.process_columns is BatchService.process_columns and \
+                cls.process_record is BatchService.process_record:
+            raise TypeError(
+                '%s overrides neither process_columns nor process_record' %
+                cls.__qualname__
+            )
+
+    def __call__(self, command: BatchCommand) -> Optional[object]:
+        return self.process_columns(command.columns, len(command))
+
+    def process_columns(
+            self,
+            columns: Mapping[str, Column],
+            length: int) -> Optional[object]:
+        return [
+            self.process_record(record)
+            for record in iter_records(columns)
+        ]
+
+    def process_record(self, record: Dict[str, object]) -> Optional[object]:
+        pass
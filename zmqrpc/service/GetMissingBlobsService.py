@@ -0,0 +1,28 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Optional
+
+from ..command import BlobStore, GetMissingBlobs
+from .IService import IService
+
+
+class GetMissingBlobsService(IService):
+
+    def __init__(self, blob_store: BlobStore):
+        super().__init__()
+
+        self.__blob_store = blob_store
+
+    def __call__(self, command: GetMissingBlobs) -> Optional[object]:
+        return [
+            digest
+            for digest in command.digests
+            if bytes.fromhex(digest) not in self.__blob_store
+        ]
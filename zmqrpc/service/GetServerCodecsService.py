@@ -0,0 +1,24 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Optional, Tuple
+
+from ..command import GetServerCodecs
+from .IService import IService
+
+
+class GetServerCodecsService(IService):
+
+    def __init__(self, codecs: Tuple[str, ...]):
+        super().__init__()
+
+        self.__codecs = codecs
+
+    def __call__(self, command: GetServerCodecs) -> Optional[object]:
+        return self.__codecs
@@ -0,0 +1,27 @@
+
+
+'''
+Created on Oct 2026
+
+@copyright: MIT license, see http://opensource.org/licenses/MIT
+'''
+
+
+from typing import Optional
+
+from ..command import BlobStore, StoreBlobs
+from .IService import IService
+
+
+class StoreBlobsService(IService):
+
+    def __init__(self, blob_store: BlobStore):
+        super().__init__()
+
+        self.__blob_store = blob_store
+
+    def __call__(self, command: StoreBlobs) -> Optional[object]:
+        # The digests are computed here, a blob cannot be stored under the
+        # digest of another one.
+        for blob in command.blobs:
+            self.__blob_store.put(blob)
@@ -1,4 +1,6 @@
-
-
+from .BatchService import BatchService
+from .GetMissingBlobsService import GetMissingBlobsService
+from .GetServerCodecsService import GetServerCodecsService
 from .IService import IService
 from .ShutdownServerService import ShutdownServerService
+from .StoreBlobsService import StoreBlobsService